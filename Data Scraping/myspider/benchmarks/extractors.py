@@ -0,0 +1,93 @@
+"""Review page extractor throughput.
+
+Parses the saved HTML pages in ``benchmarks/fixtures`` with every backend in
+``myspider.extractors``, checks that they produce identical AirlineItem and
+ReviewItem output, and prints items/sec for each. ``--cache`` reads the
+pages of a crawl recorded with ``-s HTTPCACHE_MODE=record`` instead.
+
+    cd "Data Scraping/myspider"
+    python -m benchmarks.extractors --repeat 200
+    python -m benchmarks.extractors --cache --repeat 5
+"""
+import argparse
+import pathlib
+import time
+
+from scrapy.http import HtmlResponse
+from scrapy.utils.project import get_project_settings
+
+from myspider.extractors import EXTRACTORS
+from myspider.httpcache import ContentAddressedCacheStorage
+from myspider.items import AirlineItem, ReviewItem
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+BASE_URL = "https://www.airlinequality.com"
+
+def load_fixtures(directory):
+    responses = []
+    for path in sorted(directory.glob("*.html")):
+        url = f"{BASE_URL}/fixtures/{path.name}"
+        responses.append(HtmlResponse(url=url, body=path.read_bytes(), encoding="utf-8"))
+    return responses
+
+def load_cache(spider_name):
+    storage = ContentAddressedCacheStorage(get_project_settings())
+    return [
+        response for _, response in storage.iter_responses(spider_name)
+        if isinstance(response, HtmlResponse) and response.status == 200
+    ]
+
+def extract(extractor, response):
+    """Everything the spider would yield for ``response``, as plain dicts."""
+    if "a2z-ldr-" in response.text:
+        return [{"href": href} for href in extractor.airline_links(response)]
+
+    airline, reviews, next_href = extractor.airline_page(response)
+    items = [dict(AirlineItem(**airline))]
+    for data in reviews:
+        items.append(dict(ReviewItem(airlineName=airline["name"], **data)))
+    items.append({"next_href": next_href})
+    return items
+
+def check_identical(responses, extractors):
+    reference_name, reference = next(iter(extractors.items()))
+    for response in responses:
+        expected = extract(reference, response)
+        for name, extractor in extractors.items():
+            actual = extract(extractor, response)
+            assert actual == expected, (
+                f"{name} differs from {reference_name} on {response.url}:\n{actual}\n!=\n{expected}"
+            )
+    print(f"{len(extractors)} extractors agree on {len(responses)} fixtures")
+
+def timed(extractor, responses, repeat):
+    items = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for response in responses:
+            items += len(extract(extractor, response))
+    return items, time.perf_counter() - start
+
+def main(args):
+    responses = load_cache(args.spider) if args.cache else load_fixtures(args.fixtures)
+    if not responses:
+        raise SystemExit(f"No pages in {'the HTTP cache' if args.cache else args.fixtures}")
+
+    extractors = {name: EXTRACTORS[name]() for name in args.extractors}
+    check_identical(responses, extractors)
+
+    for name, extractor in extractors.items():
+        items, elapsed = timed(extractor, responses, args.repeat)
+        print(
+            f"{name:<9} pages={len(responses) * args.repeat:<7} items={items:<8} "
+            f"elapsed={elapsed:7.2f}s throughput={items / elapsed:10.1f} items/s"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=pathlib.Path, default=FIXTURES)
+    parser.add_argument("--cache", action="store_true", help="use pages recorded in the project's HTTP cache")
+    parser.add_argument("--spider", default="reviews", help="spider whose recorded pages --cache reads")
+    parser.add_argument("--extractors", nargs="+", choices=list(EXTRACTORS), default=list(EXTRACTORS))
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
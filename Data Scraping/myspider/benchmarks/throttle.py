@@ -0,0 +1,213 @@
+"""Crawl throughput against a local mock of the review site.
+
+Serves a synthetic airline index and review pages (same markup as the saved
+fixtures) from a local HTTP server with configurable latency, random 5xx
+errors and a concurrency limit above which requests get 429 + Retry-After,
+then runs ReviewSpider against it with the old fixed throttle and with
+AdaptiveThrottleMiddleware, and prints pages/min, error counts and the
+concurrency reached by each. Items are parsed but not stored.
+
+    cd "Data Scraping/myspider"
+    python -m benchmarks.throttle --airlines 20 --pages 10 --latency 0.2 --error-rate 0.02 --capacity 12
+"""
+import argparse
+import random
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scrapy.utils.reactor import install_reactor
+
+install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.log import configure_logging
+from scrapy.utils.project import get_project_settings
+from twisted.internet import defer, reactor
+
+from myspider.spiders.reviews import ReviewSpider
+
+INDEX_PATH = "/review-pages/a-z-airline-reviews/"
+AIRLINE_PATH = re.compile(r"^/airline-reviews/airline-(\d+)(?:/page/(\d+))?/?$")
+
+MODES = {
+    "fixed": {"ADAPTIVE_THROTTLE_ENABLED": False, "CONCURRENT_REQUESTS_PER_DOMAIN": 8, "DOWNLOAD_DELAY": 1},
+    "adaptive": {"ADAPTIVE_THROTTLE_ENABLED": True},
+}
+
+def render_index(airlines):
+    links = "".join(
+        f'<li><a href="/airline-reviews/airline-{n}">Airline {n}</a></li>' for n in range(1, airlines + 1)
+    )
+    return f'<html><body><div id="a2z-ldr-a"><ul class="items">{links}</ul></div></body></html>'
+
+def render_review(review_id, n):
+    stars = "".join(f'<span class="star{" fill" if i <= 3 else ""}">{i}</span>' for i in range(1, 6))
+    return f"""
+<article itemprop="review" class="comp comp_media-review-rated list-item media review-{review_id}">
+  <div class="rating-10"><span itemprop="ratingValue">{1 + review_id % 10}</span></div>
+  <h2 class="text_header">"Review {review_id}"</h2>
+  <h3 class="text_sub_header"><span itemprop="author"><span itemprop="name">Passenger {review_id}</span></span>
+    (United Kingdom) <time itemprop="datePublished" datetime="2025-09-{1 + review_id % 28:02d}">date</time></h3>
+  <div class="text_content" itemprop="reviewBody"><strong>Trip Verified</strong> | Flight with Airline {n}.</div>
+  <table class="review-ratings">
+    <tr><td class="review-rating-header">Route</td><td class="review-value">London to Madrid</td></tr>
+    <tr><td class="review-rating-header">Seat Comfort</td><td class="review-rating-stars stars">{stars}</td></tr>
+    <tr><td class="review-rating-header">Recommended</td><td class="review-value">yes</td></tr>
+  </table>
+</article>"""
+
+def render_airline(n, page, pages, per_page):
+    reviews = "".join(render_review((n * 1000 + page) * 100 + i, n) for i in range(per_page))
+    next_link = f'<li><a href="/airline-reviews/airline-{n}/page/{page + 1}/">&gt;&gt;</a></li>' if page < pages else ""
+    return f"""<html><body>
+<div class="review-info"><div class="logo"><img src="/logo-{n}.png"></div>
+<h1 itemprop="name">Airline {n}</h1>
+<div class="review-count"><span itemprop="reviewCount">{pages * per_page}</span></div></div>
+{reviews}
+<article class="querylist-pagination"><ul>{next_link}</ul></article>
+</body></html>"""
+
+class MockSite:
+    """Threaded HTTP server with injected latency, 5xx errors and a 429 concurrency limit."""
+
+    def __init__(self, args):
+        self.args = args
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.max_inflight = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, request):
+        with self.lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+            inflight = self.inflight
+        try:
+            if self.args.capacity and inflight > self.args.capacity:
+                self.respond(request, 429, "Too Many Requests", {"Retry-After": str(self.args.retry_after)})
+                return
+
+            # Latency grows with load, like a server nearing saturation.
+            time.sleep(self.args.latency * (1 + self.args.load_factor * inflight) + random.uniform(0, self.args.jitter))
+            if random.random() < self.args.error_rate:
+                self.respond(request, 503, "Service Unavailable")
+                return
+
+            path = request.path
+            match = AIRLINE_PATH.match(path)
+            if path == INDEX_PATH:
+                self.respond(request, 200, render_index(self.args.airlines))
+            elif match and int(match.group(1)) <= self.args.airlines:
+                page = int(match.group(2) or 1)
+                self.respond(request, 200, render_airline(int(match.group(1)), page, self.args.pages, self.args.per_page))
+            else:
+                self.respond(request, 404, "Not Found")
+        finally:
+            with self.lock:
+                self.inflight -= 1
+
+    @staticmethod
+    def respond(request, status, body, headers=None):
+        payload = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(payload)
+
+def report(mode, stats, elapsed, site):
+    pages = stats.get("downloader/response_status_count/200", 0)
+    print(
+        f"{mode:<9} pages={pages:<6} elapsed={elapsed:7.1f}s pages/min={pages / elapsed * 60 if elapsed else 0:8.0f} "
+        f"429={stats.get('downloader/response_status_count/429', 0):<5} "
+        f"503={stats.get('downloader/response_status_count/503', 0):<5} "
+        f"backoffs={stats.get('throttle/backoffs', 0):<4} "
+        f"max_concurrency={stats.get('throttle/max_concurrency', '-')!s:<4} "
+        f"server_max_inflight={site.max_inflight}"
+    )
+
+@defer.inlineCallbacks
+def run(args, site):
+    failed_urls = tempfile.NamedTemporaryFile(prefix="failed_urls_", suffix=".txt", delete=False).name
+    try:
+        for mode in args.modes:
+            settings = get_project_settings()
+            settings.setdict({
+                "ITEM_PIPELINES": {},
+                "LOG_LEVEL": args.log_level,
+                "FAILED_URLS_FILE": failed_urls,
+                "ADAPTIVE_THROTTLE_LOG_SECONDS": args.log_seconds,
+                **MODES[mode],
+            }, priority="cmdline")
+
+            site.max_inflight = 0
+            runner = CrawlerRunner(settings)
+            crawler = runner.create_crawler(ReviewSpider)
+            start = time.perf_counter()
+            yield runner.crawl(
+                crawler,
+                full="1",
+                start_urls=[site.url + INDEX_PATH],
+                allowed_domains=["127.0.0.1"],
+            )
+            report(mode, crawler.stats.get_stats(), time.perf_counter() - start, site)
+    finally:
+        reactor.stop()
+
+def main(args):
+    configure_logging({"LOG_LEVEL": args.log_level})
+    site = MockSite(args)
+    site.start()
+    print(
+        f"Mock site at {site.url}: {args.airlines} airlines x {args.pages} pages, latency={args.latency}s, "
+        f"error_rate={args.error_rate}, capacity={args.capacity or 'unlimited'}"
+    )
+    try:
+        reactor.callWhenRunning(run, args, site)
+        reactor.run()
+    finally:
+        site.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--airlines", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10, help="review pages per airline")
+    parser.add_argument("--per-page", type=int, default=10, help="reviews per page")
+    parser.add_argument("--latency", type=float, default=0.2, help="base response time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="random extra latency in seconds")
+    parser.add_argument("--load-factor", type=float, default=0.05, help="extra latency per in-flight request, as a fraction of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fraction of requests answered with 503")
+    parser.add_argument("--capacity", type=int, default=12, help="in-flight requests above this get 429; 0 disables")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--log-seconds", type=float, default=10)
+    parser.add_argument("--log-level", default="WARNING")
+    main(parser.parse_args())
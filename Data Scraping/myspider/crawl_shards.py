@@ -0,0 +1,127 @@
+"""Run the review crawl as N parallel, sharded spider processes.
+
+Each shard is a separate ``scrapy crawl reviews -a shard=i -a shards=n``
+process that only follows the airlines hashing to it, with its own
+PostgreSQL connection; reviews and airlines are written with idempotent
+upserts, so shards never conflict and a failed shard can simply be rerun.
+The per-domain concurrency budget is split between the shards. Logs, final
+stats and failed URLs are written per shard to --output-dir, and the merged
+stats to stats.json there.
+
+    cd "Data Scraping/myspider"
+    python crawl_shards.py --shards 4
+    python crawl_shards.py --shards 4 --full -s HTTPCACHE_MODE=replay
+"""
+import argparse
+import json
+import pathlib
+import subprocess
+import sys
+import time
+
+from scrapy.utils.project import get_project_settings
+
+PROJECT_DIR = pathlib.Path(__file__).resolve().parent
+
+def shard_command(args, shard, output_dir, overrides):
+    command = [
+        sys.executable, "-m", "scrapy", "crawl", args.spider,
+        "-a", f"shard={shard}", "-a", f"shards={args.shards}",
+        "-s", f"STATS_FILE={output_dir / f'shard-{shard}.stats.json'}",
+        "-s", f"FAILED_URLS_FILE={output_dir / f'shard-{shard}.failed_urls.txt'}",
+        "-s", f"LOG_FILE={output_dir / f'shard-{shard}.log'}",
+    ]
+    if args.full:
+        command += ["-a", "full=1"]
+    for key, value in overrides.items():
+        command += ["-s", f"{key}={value}"]
+    return command
+
+def split_concurrency(shards, overrides):
+    """Divide the per-domain concurrency budget so N shards together stay within it."""
+    settings = get_project_settings()
+    split = {}
+    for key in ("CONCURRENT_REQUESTS_PER_DOMAIN", "ADAPTIVE_THROTTLE_MAX_CONCURRENCY"):
+        if key not in overrides:
+            split[key] = max(1, settings.getint(key) // shards)
+    return {**split, **overrides}
+
+def merge_stats(shard_stats):
+    """Sum counters across shards; keep the extreme for times and max_* values."""
+    merged = {}
+    for stats in shard_stats:
+        for key, value in stats.items():
+            if key not in merged:
+                merged[key] = value
+            elif key == "start_time":
+                merged[key] = min(merged[key], value)
+            elif key in ("finish_time", "elapsed_time_seconds") or "max" in key:
+                merged[key] = max(merged[key], value)
+            elif key == "finish_reason":
+                merged[key] = ",".join(sorted(set(merged[key].split(",")) | {value}))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] += value
+    return merged
+
+def count_lines(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+    except FileNotFoundError:
+        return 0
+
+def main(args):
+    output_dir = pathlib.Path(args.output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    overrides = split_concurrency(args.shards, dict(setting.split("=", 1) for setting in args.set))
+
+    start = time.perf_counter()
+    processes = []
+    for shard in range(args.shards):
+        stats_file = output_dir / f"shard-{shard}.stats.json"
+        stats_file.unlink(missing_ok=True)
+        (output_dir / f"shard-{shard}.failed_urls.txt").unlink(missing_ok=True)
+        processes.append(subprocess.Popen(shard_command(args, shard, output_dir, overrides), cwd=PROJECT_DIR))
+    print(f"Started {args.shards} shards, logs in {output_dir}")
+
+    shard_stats = []
+    failed_shards = []
+    for shard, process in enumerate(processes):
+        code = process.wait()
+        stats_file = output_dir / f"shard-{shard}.stats.json"
+        stats = json.loads(stats_file.read_text(encoding="utf-8")) if stats_file.exists() else {}
+        failed_urls = count_lines(output_dir / f"shard-{shard}.failed_urls.txt")
+        if code != 0 or not stats:
+            failed_shards.append(shard)
+        shard_stats.append(stats)
+        print(
+            f"shard {shard}: exit={code} airlines={stats.get('shard/airlines', 0)} "
+            f"pages={stats.get('downloader/response_status_count/200', 0)} "
+            f"items={stats.get('item_scraped_count', 0)} failed_urls={failed_urls} "
+            f"finish_reason={stats.get('finish_reason', '-')}"
+        )
+
+    merged = merge_stats(shard_stats)
+    merged["shards"] = args.shards
+    merged["wall_time_seconds"] = round(time.perf_counter() - start, 1)
+    with open(output_dir / "stats.json", "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2, sort_keys=True, default=str)
+
+    pages = merged.get("downloader/response_status_count/200", 0)
+    print(
+        f"all shards: pages={pages} items={merged.get('item_scraped_count', 0)} "
+        f"reviews_written={merged.get('reviews/written', 0)} wall_time={merged['wall_time_seconds']}s "
+        f"pages/min={pages / merged['wall_time_seconds'] * 60 if merged['wall_time_seconds'] else 0:.0f}"
+    )
+    if failed_shards:
+        print(f"Shards {', '.join(map(str, failed_shards))} failed; rerun them with -a shard=i -a shards={args.shards}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--spider", default="reviews")
+    parser.add_argument("--full", action="store_true", help="recrawl every page instead of stopping at the last completed crawl")
+    parser.add_argument("--output-dir", default="shards")
+    parser.add_argument("-s", "--set", action="append", default=[], metavar="NAME=VALUE", help="scrapy setting for every shard")
+    main(parser.parse_args())
@@ -0,0 +1,30 @@
+# Define here your extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import json
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+class StatsFileExtension:
+    """Writes the final crawl stats to STATS_FILE as JSON, e.g. for crawl_shards.py to merge."""
+
+    def __init__(self, path, stats):
+        self.path = path
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("STATS_FILE")
+        if not path:
+            raise NotConfigured
+        ext = cls(path, crawler.stats)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_closed(self, spider, reason):
+        stats = dict(self.stats.get_stats())
+        stats["finish_reason"] = reason
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2, sort_keys=True, default=str)
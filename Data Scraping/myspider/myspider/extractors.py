@@ -0,0 +1,223 @@
+# Review page extractors.
+#
+# Both backends read the same fields off airlinequality.com pages and hand
+# them to the shared build_* helpers below, so the items they produce are
+# identical. PyQuery is the default; set REVIEW_EXTRACTOR = "selector" to opt in
+# to the precompiled lxml XPath backend.
+
+import re
+from lxml import etree
+from pyquery import PyQuery as PQ
+
+RATING_FIELDS = {
+    "Aircraft": "aircraft",
+    "Type Of Traveller": "typeOfTraveller",
+    "Seat Type": "seatType",
+    "Route": "route",
+    "Date Flown": "dateFlown",
+    "Seat Comfort": "seatComfort",
+    "Cabin Staff Service": "cabinStaffService",
+    "Food & Beverages": "foodBeverages",
+    "Inflight Entertainment": "inflightEntertainment",
+    "Ground Service": "groundService",
+    "Value For Money": "valueForMoney",
+    "Wifi & Connectivity": "wifiConnectivity",
+    "Recommended": "recommended",
+}
+
+def build_airline(name, image, review_text):
+    return {
+        "name": name,
+        "image": image or "",
+        "reviewCount": int(review_text) if review_text.isdigit() else None,
+    }
+
+def build_review(class_attr, title, user_name, date_review, score_text, header_text, raw_content, ratings):
+    """Review dict from the raw strings of one review block; ``ratings`` is a list of (label, value)."""
+    data = {}
+
+    match = re.search(r"review-(\d+)", class_attr or "")
+    data["reviewId"] = match.group(1) if match else ""
+
+    data["title"] = title.strip()
+    data["userName"] = user_name.strip()
+    data["dateReview"] = date_review or None
+    score_text = score_text.strip()
+    data["score"] = int(score_text) if score_text.isdigit() else None
+
+    user_country = re.search(r"\((.*?)\)", header_text.strip())
+    data["country"] = user_country.group(1) if user_country else ""
+
+    raw_content = raw_content.strip()
+    if " | " in raw_content:
+        parts = raw_content.split(" | ", 1)
+        data["verifiedType"] = parts[0].strip()
+        data["content"] = parts[1].strip()
+    else:
+        data["verifiedType"] = ""
+        data["content"] = raw_content
+
+    for label, value in ratings:
+        field = RATING_FIELDS.get(label.strip())
+        data[field] = value
+
+    return data
+
+class PyQueryExtractor:
+    name = "pyquery"
+
+    def airline_links(self, response):
+        doc = PQ(response.text)
+        return [a.attr("href") for a in doc('div[id^="a2z-ldr-"] ul li a').items()]
+
+    def airline_page(self, response):
+        doc = PQ(response.text)
+
+        airline = build_airline(
+            doc('div.review-info h1[itemprop="name"]').text().strip(),
+            doc('div.review-info div.logo img').attr("src"),
+            doc('div.review-info div.review-count span[itemprop=reviewCount]').text().strip(),
+        )
+        reviews = [self.review(block) for block in doc('article[itemprop="review"]').items()]
+
+        next_href = None
+        for a in doc("article.querylist-pagination ul li a").items():
+            if a.text().strip() == ">>":
+                next_href = a.attr("href")
+                break
+
+        return airline, reviews, next_href
+
+    def review(self, block):
+        ratings = []
+        for tr in block("table.review-ratings tr").items():
+            tds = list(tr("td").items())
+            value_td = tds[1]
+            if value_td.has_class("review-rating-stars"):
+                value = len(list(value_td("span.star.fill").items()))
+            else:
+                value = value_td.text().strip()
+            ratings.append((tds[0].text(), value))
+
+        return build_review(
+            block.attr("class"),
+            block("h2.text_header").text(),
+            block("span[itemprop='name']").text(),
+            block("time[itemprop='datePublished']").attr("datetime"),
+            block("div.rating-10 span[itemprop='ratingValue']").text(),
+            block("h3.text_sub_header").text(),
+            block("div.text_content[itemprop='reviewBody']").text(),
+            ratings,
+        )
+
+# Tags that put their text on its own line, as PyQuery's .text() does.
+LINE_BREAK_TAGS = {
+    "article", "blockquote", "br", "div", "h1", "h2", "h3", "h4", "h5", "h6",
+    "li", "ol", "p", "section", "table", "td", "th", "tr", "ul",
+}
+# HTML whitespace only; non-breaking spaces are kept, as PyQuery keeps them.
+WHITESPACE_RE = re.compile("[\x20\x09\x0a\x0c\x0d\u200b]+")
+
+def _text_pieces(element):
+    """Whitespace-collapsed text runs of ``element``, with a newline around each block."""
+    if not isinstance(element.tag, str):
+        return
+    if element.tag in LINE_BREAK_TAGS:
+        yield "\n"
+    yield WHITESPACE_RE.sub(" ", element.text or "")
+    for child in element:
+        yield from _text_pieces(child)
+        yield WHITESPACE_RE.sub(" ", child.tail or "")
+    if element.tag in LINE_BREAK_TAGS:
+        yield "\n"
+
+def element_text(element):
+    """Text of ``element`` with HTML whitespace collapsed and one line per block."""
+    lines = (line.strip(" ") for line in "".join(_text_pieces(element)).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+def nodes_text(nodes):
+    return " ".join(element_text(node) for node in nodes)
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+class SelectorExtractor:
+    """lxml XPath over ``response.selector``; every expression is compiled once at import."""
+
+    name = "selector"
+
+    AIRLINE_LINKS = etree.XPath("//div[starts-with(@id, 'a2z-ldr-')]//ul//li//a")
+    AIRLINE_NAME = etree.XPath(f"//div[{_has_class('review-info')}]//h1[@itemprop='name']")
+    AIRLINE_IMAGE = etree.XPath(f"//div[{_has_class('review-info')}]//div[{_has_class('logo')}]//img/@src")
+    AIRLINE_REVIEW_COUNT = etree.XPath(
+        f"//div[{_has_class('review-info')}]//div[{_has_class('review-count')}]//span[@itemprop='reviewCount']"
+    )
+    REVIEW_BLOCKS = etree.XPath("//article[@itemprop='review']")
+    PAGINATION_LINKS = etree.XPath(f"//article[{_has_class('querylist-pagination')}]//ul//li//a")
+
+    TITLE = etree.XPath(f".//h2[{_has_class('text_header')}]")
+    USER_NAME = etree.XPath(".//span[@itemprop='name']")
+    DATE_REVIEW = etree.XPath(".//time[@itemprop='datePublished']/@datetime")
+    SCORE = etree.XPath(f".//div[{_has_class('rating-10')}]//span[@itemprop='ratingValue']")
+    HEADER = etree.XPath(f".//h3[{_has_class('text_sub_header')}]")
+    CONTENT = etree.XPath(f".//div[{_has_class('text_content')}][@itemprop='reviewBody']")
+    RATING_ROWS = etree.XPath(f".//table[{_has_class('review-ratings')}]//tr")
+    RATING_CELLS = etree.XPath(".//td")
+    FILLED_STARS = etree.XPath(f".//span[{_has_class('star')}][{_has_class('fill')}]")
+
+    def airline_links(self, response):
+        return [a.get("href") for a in self.AIRLINE_LINKS(response.selector.root)]
+
+    def airline_page(self, response):
+        root = response.selector.root
+        images = self.AIRLINE_IMAGE(root)
+
+        airline = build_airline(
+            nodes_text(self.AIRLINE_NAME(root)),
+            images[0] if images else None,
+            nodes_text(self.AIRLINE_REVIEW_COUNT(root)),
+        )
+        reviews = [self.review(block) for block in self.REVIEW_BLOCKS(root)]
+
+        next_href = None
+        for a in self.PAGINATION_LINKS(root):
+            if element_text(a) == ">>":
+                next_href = a.get("href")
+                break
+
+        return airline, reviews, next_href
+
+    def review(self, block):
+        ratings = []
+        for tr in self.RATING_ROWS(block):
+            tds = self.RATING_CELLS(tr)
+            value_td = tds[1]
+            if "review-rating-stars" in (value_td.get("class") or "").split():
+                value = len(self.FILLED_STARS(value_td))
+            else:
+                value = element_text(value_td)
+            ratings.append((element_text(tds[0]), value))
+
+        dates = self.DATE_REVIEW(block)
+        return build_review(
+            block.get("class"),
+            nodes_text(self.TITLE(block)),
+            nodes_text(self.USER_NAME(block)),
+            dates[0] if dates else None,
+            nodes_text(self.SCORE(block)),
+            nodes_text(self.HEADER(block)),
+            nodes_text(self.CONTENT(block)),
+            ratings,
+        )
+
+EXTRACTORS = {
+    PyQueryExtractor.name: PyQueryExtractor,
+    SelectorExtractor.name: SelectorExtractor,
+}
+
+def get_extractor(name):
+    try:
+        return EXTRACTORS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown REVIEW_EXTRACTOR {name!r}; expected one of {', '.join(EXTRACTORS)}")
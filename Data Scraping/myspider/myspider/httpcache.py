@@ -0,0 +1,123 @@
+# Record / replay HTTP cache for development crawls.
+#
+#     scrapy crawl reviews -s HTTPCACHE_MODE=record   # fetch live, store every page
+#     scrapy crawl reviews -s HTTPCACHE_MODE=replay   # no network, cache misses are dropped
+#
+# Responses are stored under HTTPCACHE_DIR/<spider>/ as
+#     requests/<fp[:2]>/<fp>.json   one entry per request fingerprint (method + canonical URL + body)
+#     objects/<sha[:2]>/<sha>.gz    gzip-compressed bodies, addressed by SHA-256 so identical pages are kept once
+#
+# Entries older than HTTPCACHE_EXPIRATION_SECS are treated as misses; 0 keeps them forever.
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware as ScrapyHttpCacheMiddleware
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.misc import load_object
+from scrapy.utils.project import data_path
+
+HTTPCACHE_MODES = ("off", "record", "replay")
+
+class ContentAddressedCacheStorage:
+    """HTTPCACHE_STORAGE keyed by request fingerprint, with deduplicated gzipped bodies."""
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings["HTTPCACHE_DIR"])
+        self.mode = settings.get("HTTPCACHE_MODE", "off")
+        self.compresslevel = settings.getint("HTTPCACHE_COMPRESSLEVEL", 6)
+        self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS", 0)
+        self.fingerprinter = None
+
+    def open_spider(self, spider):
+        self.fingerprinter = spider.crawler.request_fingerprinter
+        spider.logger.info(f"HTTP cache in {self.mode} mode at {Path(self.cachedir, spider.name)}")
+
+    def close_spider(self, spider):
+        pass
+
+    def retrieve_response(self, spider, request):
+        if self.mode == "record":
+            return None
+        entry = self.read_entry(self.entry_path(spider.name, self.fingerprinter.fingerprint(request).hex()))
+        if entry is None:
+            return None
+        if 0 < self.expiration_secs < time.time() - entry["timestamp"]:
+            return None
+        return self.build_response(spider.name, entry)
+
+    def store_response(self, spider, request, response):
+        body = response.body
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self.object_path(spider.name, digest)
+        if not object_path.exists():
+            write_atomic(object_path, gzip.compress(body, compresslevel=self.compresslevel))
+
+        entry = {
+            "url": request.url,
+            "method": request.method,
+            "status": response.status,
+            "response_url": response.url,
+            "headers": {
+                key.decode("latin-1"): [value.decode("latin-1") for value in values]
+                for key, values in response.headers.items()
+            },
+            "body": digest,
+            "timestamp": time.time(),
+        }
+        fingerprint = self.fingerprinter.fingerprint(request).hex()
+        write_atomic(self.entry_path(spider.name, fingerprint), json.dumps(entry).encode("utf-8"))
+
+    def entry_path(self, spider_name, fingerprint):
+        return Path(self.cachedir, spider_name, "requests", fingerprint[:2], f"{fingerprint}.json")
+
+    def object_path(self, spider_name, digest):
+        return Path(self.cachedir, spider_name, "objects", digest[:2], f"{digest}.gz")
+
+    def read_entry(self, path):
+        try:
+            return json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def build_response(self, spider_name, entry):
+        body = gzip.decompress(self.object_path(spider_name, entry["body"]).read_bytes())
+        headers = Headers(entry["headers"])
+        url = entry["response_url"]
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=entry["status"], body=body)
+
+    def iter_responses(self, spider_name):
+        """Every stored (request url, response) pair for ``spider_name``, e.g. as benchmark fixtures."""
+        for path in sorted(Path(self.cachedir, spider_name, "requests").glob("*/*.json")):
+            entry = self.read_entry(path)
+            yield entry["url"], self.build_response(spider_name, entry)
+
+def write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+class HttpCacheMiddleware(ScrapyHttpCacheMiddleware):
+    """Scrapy's cache middleware switched by HTTPCACHE_MODE; replay never touches the network."""
+
+    def __init__(self, settings, stats):
+        mode = settings.get("HTTPCACHE_MODE", "off")
+        if mode not in HTTPCACHE_MODES:
+            raise ValueError(f"Unknown HTTPCACHE_MODE {mode!r}; expected one of {', '.join(HTTPCACHE_MODES)}")
+        if mode == "off":
+            raise NotConfigured
+
+        # Same state as the parent, which would also require HTTPCACHE_ENABLED.
+        self.policy = load_object(settings["HTTPCACHE_POLICY"])(settings)
+        self.storage = load_object(settings["HTTPCACHE_STORAGE"])(settings)
+        self.ignore_missing = mode == "replay"
+        self.stats = stats
+        self.mode = mode
@@ -4,6 +4,9 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from twisted.internet import task
+import time
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -120,3 +123,168 @@ class RecordFailedMiddleware:
         spider.logger.warning(f"Failed URL recorded: {url} ({reason})")
         with open(self.failed_file, "a", encoding="utf-8") as f:
             f.write(url + "\n")
+
+class SlotThrottle:
+    """Concurrency, delay and the current measurement window of one download slot."""
+
+    def __init__(self, concurrency, delay):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.responses = 0
+        self.errors = 0
+        self.latency = 0.0
+        self.cooldown = 0
+
+    def record(self, latency, error):
+        self.responses += 1
+        self.errors += error
+        self.latency += latency or 0.0
+        self.cooldown -= 1
+
+    def reset(self):
+        self.responses = 0
+        self.errors = 0
+        self.latency = 0.0
+
+class AdaptiveThrottleMiddleware:
+    """Latency- and error-aware per-domain concurrency control (AIMD).
+
+    Every ADAPTIVE_THROTTLE_WINDOW responses a slot is judged: if the mean
+    latency stayed under ADAPTIVE_THROTTLE_TARGET_LATENCY and the 429/5xx rate
+    under ADAPTIVE_THROTTLE_MAX_ERROR_RATE, any delay is halved and, once it
+    is gone, concurrency grows by one; otherwise the slot backs off. A 429, or
+    more errors than the window's budget allows, backs off at once without
+    waiting for the window to fill.
+
+    Backing off halves concurrency; a delay (doubling, or Retry-After) is only
+    added once concurrency is at ADAPTIVE_THROTTLE_MIN_CONCURRENCY, since any
+    delay serializes the slot. Errors from requests that were already in
+    flight do not back off again. Achieved pages/min are logged every
+    ADAPTIVE_THROTTLE_LOG_SECONDS.
+
+    Sits above RetryMiddleware so it sees every response before retries.
+    """
+
+    BACKOFF_STATUSES = {429, 500, 502, 503, 504, 520, 521, 522, 524}
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.min_concurrency = settings.getint("ADAPTIVE_THROTTLE_MIN_CONCURRENCY", 1)
+        self.max_concurrency = min(
+            settings.getint("ADAPTIVE_THROTTLE_MAX_CONCURRENCY", 32),
+            settings.getint("CONCURRENT_REQUESTS", 16),
+        )
+        self.start_concurrency = settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN", 8)
+        self.start_delay = settings.getfloat("DOWNLOAD_DELAY", 0.0)
+        self.min_delay_step = settings.getfloat("ADAPTIVE_THROTTLE_MIN_DELAY_STEP", 0.25)
+        self.max_delay = settings.getfloat("ADAPTIVE_THROTTLE_MAX_DELAY", 30.0)
+        self.target_latency = settings.getfloat("ADAPTIVE_THROTTLE_TARGET_LATENCY", 2.0)
+        self.max_error_rate = settings.getfloat("ADAPTIVE_THROTTLE_MAX_ERROR_RATE", 0.05)
+        self.window = settings.getint("ADAPTIVE_THROTTLE_WINDOW", 20)
+        self.log_seconds = settings.getfloat("ADAPTIVE_THROTTLE_LOG_SECONDS", 60.0)
+        self.slots = {}
+        self.logger = None
+        self.started_at = None
+        self.pages = 0
+        self.logged_pages = 0
+        self.logged_at = None
+        self.reporter = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("ADAPTIVE_THROTTLE_ENABLED"):
+            raise NotConfigured
+        if crawler.settings.getbool("AUTOTHROTTLE_ENABLED"):
+            raise NotConfigured("AdaptiveThrottleMiddleware and AutoThrottle both adjust slot delays; enable only one")
+        mw = cls(crawler)
+        crawler.signals.connect(mw.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def spider_opened(self, spider):
+        self.logger = spider.logger
+        self.started_at = self.logged_at = time.monotonic()
+        if self.log_seconds > 0:
+            self.reporter = task.LoopingCall(self.log_rate)
+            self.reporter.start(self.log_seconds, now=False)
+
+    def spider_closed(self, spider):
+        if self.reporter and self.reporter.running:
+            self.reporter.stop()
+        elapsed = time.monotonic() - self.started_at
+        rate = self.pages / elapsed * 60 if elapsed else 0
+        self.crawler.stats.set_value("throttle/pages_per_minute", round(rate, 1))
+        spider.logger.info(f"Adaptive throttle: {self.pages} pages in {elapsed:.0f}s, {rate:.0f} pages/min")
+
+    def log_rate(self):
+        now = time.monotonic()
+        elapsed = now - self.logged_at
+        rate = (self.pages - self.logged_pages) / elapsed * 60 if elapsed else 0
+        self.logged_pages, self.logged_at = self.pages, now
+        slots = ", ".join(
+            f"{key}: concurrency={state.concurrency} delay={state.delay:.2f}s"
+            for key, state in self.slots.items()
+        )
+        self.logger.info(f"Crawled {rate:.0f} pages/min ({slots or 'no slots'})")
+
+    def process_response(self, request, response, spider):
+        if response.status not in self.BACKOFF_STATUSES:
+            self.pages += 1
+        self.observe(request, request.meta.get("download_latency"), response.status, self.retry_after(response))
+        return response
+
+    def process_exception(self, request, exception, spider):
+        if isinstance(exception, IgnoreRequest):
+            return None
+        self.observe(request, request.meta.get("download_latency"))
+
+    def observe(self, request, latency, status=None, retry_after=None):
+        key = request.meta.get("download_slot")
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is None:
+            return
+
+        state = self.slots.get(key)
+        if state is None:
+            state = self.slots[key] = SlotThrottle(min(self.start_concurrency, self.max_concurrency), self.start_delay)
+
+        state.record(latency, status is None or status in self.BACKOFF_STATUSES)
+        if state.cooldown <= 0 and (status == 429 or state.errors > self.max_error_rate * self.window):
+            self.back_off(key, state, retry_after)
+        elif state.responses >= self.window:
+            if state.errors / state.responses > self.max_error_rate or state.latency / state.responses > self.target_latency:
+                self.back_off(key, state)
+            else:
+                self.speed_up(state)
+
+        # Idle slots are garbage-collected by the downloader, so re-apply on every response.
+        slot.concurrency = state.concurrency
+        slot.delay = state.delay
+        self.crawler.stats.max_value("throttle/max_concurrency", state.concurrency)
+
+    def speed_up(self, state):
+        if state.delay > 0:
+            state.delay = state.delay / 2 if state.delay / 2 >= self.min_delay_step else 0.0
+        else:
+            state.concurrency = min(self.max_concurrency, state.concurrency + 1)
+        state.reset()
+
+    def back_off(self, key, state, retry_after=None):
+        cooldown = state.concurrency
+        if state.concurrency > self.min_concurrency:
+            state.concurrency = max(self.min_concurrency, state.concurrency // 2)
+        else:
+            state.delay = min(self.max_delay, max(state.delay * 2, self.min_delay_step, retry_after or 0.0))
+        state.reset()
+        state.cooldown = cooldown
+        self.crawler.stats.inc_value("throttle/backoffs")
+        self.logger.debug(f"Throttling {key}: concurrency={state.concurrency} delay={state.delay:.2f}s")
+
+    @staticmethod
+    def retry_after(response):
+        value = response.headers.get(b"Retry-After")
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
@@ -7,27 +7,90 @@
 from itemadapter import ItemAdapter
 from myspider.items import *
 from postgres_db import PostgresClient
+from twisted.internet import task
+import time
 
 class MyspiderPipeline:
-    def __init__(self):
+    """Writes airlines immediately and buffers reviews for bulk COPY upserts."""
+
+    def __init__(self, batch_size=500, flush_seconds=5.0):
         self.db = None
+        self.stats = None
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.buffer = []
+        self.flusher = None
+        self.spider = None
+        self.flushed = 0
+        self.written = 0
+        self.failed = 0
+        self.flush_time = 0.0
 
     @classmethod
     def from_crawler(cls, crawler):
-        pipe = cls()
+        pipe = cls(
+            batch_size=crawler.settings.getint('REVIEW_BATCH_SIZE', 500),
+            flush_seconds=crawler.settings.getfloat('REVIEW_FLUSH_SECONDS', 5.0),
+        )
         pipe.db = PostgresClient(crawler.settings.get('POSTGRES_DSN'))
+        pipe.stats = crawler.stats
         return pipe
 
+    def open_spider(self, spider):
+        self.spider = spider
+        if self.flush_seconds > 0:
+            self.flusher = task.LoopingCall(self.flush)
+            self.flusher.start(self.flush_seconds, now=False)
+
     def process_item(self, item, spider):
         try:
             if isinstance(item, AirlineItem):
                 self.db.insert_airline(item)
             elif isinstance(item, ReviewItem):
-                self.db.insert_review(item)
+                self.buffer.append(item)
+                if len(self.buffer) >= self.batch_size:
+                    self.flush()
         except Exception as e:
             spider.logger.error(f"PostgreSQL Insert Error: {e}")
         return item
 
+    def flush(self):
+        if not self.buffer:
+            return
+
+        batch, self.buffer = self.buffer, []
+        start = time.perf_counter()
+        try:
+            written, failed = self.db.copy_reviews(batch)
+        except Exception as e:
+            self.spider.logger.error(f"PostgreSQL Insert Error: {e}")
+            written, failed = 0, [(item, e) for item in batch]
+        elapsed = time.perf_counter() - start
+
+        for item, error in failed:
+            self.spider.logger.error(f"Review {item.get('reviewId')} rejected: {error}")
+
+        self.flushed += len(batch)
+        self.written += written
+        self.failed += len(failed)
+        self.flush_time += elapsed
+        self.stats.inc_value('reviews/flushed', len(batch))
+        self.stats.inc_value('reviews/written', written)
+        self.stats.inc_value('reviews/failed', len(failed))
+        self.spider.logger.info(
+            f"Flushed {len(batch)} reviews ({written} written, {len(failed)} failed) "
+            f"in {elapsed:.2f}s, {len(batch) / elapsed if elapsed else 0:.0f} rows/s"
+        )
+
     def close_spider(self, spider):
+        if self.flusher and self.flusher.running:
+            self.flusher.stop()
+        self.flush()
+
+        if self.flush_time:
+            rate = self.flushed / self.flush_time
+            self.stats.set_value('reviews/rows_per_second', round(rate, 1))
+            spider.logger.info(f"Review ingestion: {self.flushed} flushed, {self.written} written, {self.failed} failed, {rate:.0f} rows/s")
+
         if self.db:
             self.db.close()
@@ -26,10 +26,23 @@ POSTGRES_DSN = os.getenv("POSTGRES_DSN")
 # Obey robots.txt rules
 ROBOTSTXT_OBEY = False
 
-# Concurrency and throttling settings
-CONCURRENT_REQUESTS = 16
+# Concurrency and throttling settings. With the adaptive throttle enabled,
+# CONCURRENT_REQUESTS_PER_DOMAIN and DOWNLOAD_DELAY are only starting points:
+# each domain's concurrency grows while latency and 429/5xx rates stay under
+# target and halves as soon as they don't; a delay is added only when
+# concurrency cannot go lower.
+CONCURRENT_REQUESTS = 32
 CONCURRENT_REQUESTS_PER_DOMAIN = 8
-DOWNLOAD_DELAY = 1
+DOWNLOAD_DELAY = 0
+
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_MIN_CONCURRENCY = 1
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 32
+ADAPTIVE_THROTTLE_MAX_DELAY = 30
+ADAPTIVE_THROTTLE_TARGET_LATENCY = 2.0
+ADAPTIVE_THROTTLE_MAX_ERROR_RATE = 0.05
+ADAPTIVE_THROTTLE_WINDOW = 20
+ADAPTIVE_THROTTLE_LOG_SECONDS = 60
 
 RETRY_ENABLED = True
 RETRY_TIMES = 3
@@ -60,13 +73,20 @@ DEFAULT_REQUEST_HEADERS = {
 DOWNLOADER_MIDDLEWARES = {
 #    'myspider.middlewares.MyspiderDownloaderMiddleware': 543,
      'myspider.middlewares.RecordFailedMiddleware': 544,
+     'myspider.middlewares.AdaptiveThrottleMiddleware': 585,
+     'scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware': None,
+     'myspider.httpcache.HttpCacheMiddleware': 900,
 }
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
+EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+    "myspider.extensions.StatsFileExtension": 500,
+}
+
+# Final crawl stats are written here as JSON when set (crawl_shards.py sets one per shard)
+STATS_FILE = None
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -74,7 +94,16 @@ ITEM_PIPELINES = {
    "myspider.pipelines.MyspiderPipeline": 300,
 }
 
-# Enable and configure the AutoThrottle extension (disabled by default)
+# Reviews are buffered and bulk-loaded with COPY once this many are queued,
+# or every REVIEW_FLUSH_SECONDS, whichever comes first
+REVIEW_BATCH_SIZE = 500
+REVIEW_FLUSH_SECONDS = 5
+
+# Page parser: "pyquery" or the opt-in "selector" (precompiled lxml XPath)
+REVIEW_EXTRACTOR = "pyquery"
+
+# Enable and configure the AutoThrottle extension (disabled by default;
+# superseded by AdaptiveThrottleMiddleware above, enable at most one)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
 # The initial download delay
@@ -87,13 +116,16 @@ ITEM_PIPELINES = {
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
-# Enable and configure HTTP caching (disabled by default)
-# See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# Record / replay HTTP cache (see myspider/httpcache.py). Off by default;
+# record a crawl with -s HTTPCACHE_MODE=record, then rerun it offline at full
+# speed with -s HTTPCACHE_MODE=replay. Stored under .scrapy/HTTPCACHE_DIR.
+HTTPCACHE_MODE = "off"
+HTTPCACHE_DIR = "httpcache"
+# Seconds a recorded page stays valid; 0 never expires it
+HTTPCACHE_EXPIRATION_SECS = 0
+HTTPCACHE_STORAGE = "myspider.httpcache.ContentAddressedCacheStorage"
+HTTPCACHE_POLICY = "scrapy.extensions.httpcache.DummyPolicy"
+HTTPCACHE_IGNORE_HTTP_CODES = [429, 500, 502, 503, 504]
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
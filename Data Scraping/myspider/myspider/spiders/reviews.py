@@ -1,114 +1,119 @@
 import scrapy
-from pyquery import PyQuery as PQ
+import hashlib
+from datetime import date
+from urllib.parse import urlparse
 from myspider.items import *
-import re
-from urllib.parse import urljoin
+from myspider.extractors import get_extractor
+from postgres_db import PostgresClient
 
-BASE_URL = 'https://www.airlinequality.com'
+def airline_shard(url, shards):
+    """Stable shard for an airline URL: SHA-1 of its path, so the host and a trailing slash don't matter."""
+    path = urlparse(url).path.strip("/")
+    return int.from_bytes(hashlib.sha1(path.encode("utf-8")).digest()[:8], "big") % shards
 
 class ReviewSpider(scrapy.Spider):
+    """Crawls every airline's review pages; incremental unless ``-a full=1``, one shard with ``-a shard=i -a shards=n``.
+
+    An incremental crawl pages back to the newest review date of each
+    airline's last completed crawl. Those marks are only saved when the whole
+    crawl finishes, so an interrupted run is picked up again next time.
+    """
     name = "reviews"
     allowed_domains = ["airlinequality.com"]
     start_urls = ["https://www.airlinequality.com/review-pages/a-z-airline-reviews/"]
 
-    def parse(self, response):
-        doc = PQ(response.text)
+    def __init__(self, full=None, shard=None, shards=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.full = str(full).lower() in ("1", "true", "yes") if full is not None else False
+        self.crawl_marks = {}
+        self.newest_reviews = {}
+        self.completed_airlines = set()
+
+        self.shards = int(shards) if shards is not None else 1
+        self.shard = int(shard) if shard is not None else 0
+        if self.shards < 1 or not 0 <= self.shard < self.shards:
+            raise ValueError(f"Invalid shard {self.shard} of {self.shards}; expected 0 <= shard < shards")
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if not spider.full:
+            db = PostgresClient(crawler.settings.get("POSTGRES_DSN"))
+            try:
+                spider.crawl_marks = db.get_crawl_marks()
+            finally:
+                db.close()
+        spider.extractor = get_extractor(crawler.settings.get("REVIEW_EXTRACTOR", "pyquery"))
+        spider.logger.info(
+            f"{'Full' if spider.full else 'Incremental'} crawl, {len(spider.crawl_marks)} airline marks, "
+            f"{spider.extractor.name} extractor, shard {spider.shard} of {spider.shards}"
+        )
+        return spider
 
-        for a in doc('div[id^="a2z-ldr-"] ul li a').items():
-            href = a.attr("href")
+    def parse(self, response):
+        for href in self.extractor.airline_links(response):
             if href and "airline-reviews" in href:
-                url = urljoin(BASE_URL, href)
+                url = response.urljoin(href)
+                if self.shards > 1 and airline_shard(url, self.shards) != self.shard:
+                    continue
+                self.crawler.stats.inc_value("shard/airlines")
                 yield scrapy.Request(url, callback=self.parse_airline, meta={"is_first_page": True})
 
     def parse_airline(self, response):
-        doc = PQ(response.text)
-        next_href = None
+        airline, reviews, next_href = self.extractor.airline_page(response)
 
         if response.meta.get("is_first_page"):
             airline_item = AirlineItem()
+            airline_item.update(airline)
+            yield airline_item
 
-            name = doc('div.review-info h1[itemprop="name"]').text().strip()
-            img = doc('div.review-info div.logo img').attr("src") or ""
-            review_text = doc('div.review-info div.review-count span[itemprop=reviewCount]').text().strip()
-            review_count = int(review_text) if review_text.isdigit() else None
+        airline_name = airline["name"]
+        key = airline_name.lower()
+        mark = self.crawl_marks.get(key)
 
-            airline_item["name"] = name
-            airline_item["image"] = img
-            airline_item["reviewCount"] = review_count
+        page_dates = []
+        for data in reviews:
+            review_date = date.fromisoformat(data["dateReview"]) if data.get("dateReview") else None
+            if review_date:
+                page_dates.append(review_date)
+            if mark and review_date and review_date < mark:
+                self.crawler.stats.inc_value("incremental/known_reviews_skipped")
+                continue
 
-            yield airline_item
-        
-        airline_name = doc('div.review-info h1[itemprop="name"]').text().strip()
-
-        for block in doc('article[itemprop="review"]').items():
             review_item = ReviewItem()
-            data = self.parse_one_review(block)
             data["airlineName"] = airline_name
             review_item.update(data)
             yield review_item
-    
-        for a in doc("article.querylist-pagination ul li a").items():
-            if a.text().strip() == ">>":
-                next_href = a.attr("href")
-                break
+
+        if page_dates:
+            newest = max(page_dates)
+            self.newest_reviews[key] = max(newest, self.newest_reviews.get(key, newest))
+
+        # Reviews are listed newest first, so once a page reaches past the
+        # mark every older page was ingested by the last completed crawl.
+        if mark and page_dates and min(page_dates) < mark:
+            self.logger.info(f"Stopping {airline_name} at {response.url}: reached the {mark} mark")
+            self.crawler.stats.inc_value("incremental/airlines_stopped")
+            self.completed_airlines.add(key)
+            return
 
         if next_href:
-            next_url = urljoin(BASE_URL, next_href)
+            next_url = response.urljoin(next_href)
             yield scrapy.Request(next_url, callback=self.parse_airline, meta={"is_first_page": False})
-
-    def parse_one_review(self, block):
-        data = {}
-        mapping = {
-            "Aircraft": "aircraft",
-            "Type Of Traveller": "typeOfTraveller",
-            "Seat Type": "seatType",
-            "Route": "route",
-            "Date Flown": "dateFlown",
-            "Seat Comfort": "seatComfort",
-            "Cabin Staff Service": "cabinStaffService",
-            "Food & Beverages": "foodBeverages",
-            "Inflight Entertainment": "inflightEntertainment",
-            "Ground Service": "groundService",
-            "Value For Money": "valueForMoney",
-            "Wifi & Connectivity": "wifiConnectivity",
-            "Recommended": "recommended",
-        }
-
-        class_attr = block.attr("class") or ""
-        match = re.search(r"review-(\d+)", class_attr)
-        data["reviewId"] = match.group(1) if match else ""
-
-        data["title"] = block("h2.text_header").text().strip()
-        data["userName"] = block("span[itemprop='name']").text().strip()
-        data["dateReview"] = block("time[itemprop='datePublished']").attr("datetime") or None
-        score_text = block("div.rating-10 span[itemprop='ratingValue']").text().strip()
-        data["score"] = int(score_text) if score_text.isdigit() else None
-
-        header_text = block("h3.text_sub_header").text().strip()
-        user_country = re.search(r"\((.*?)\)", header_text)
-        data["country"] = user_country.group(1) if user_country else ""
-
-        raw_content = block("div.text_content[itemprop='reviewBody']").text().strip()
-        if " | " in raw_content:
-            parts = raw_content.split(" | ", 1)
-            data["verifiedType"] = parts[0].strip()
-            data["content"] = parts[1].strip()
         else:
-            data["verifiedType"] = ""
-            data["content"] = raw_content
-
-        for tr in block("table.review-ratings tr").items():
-            tds = list(tr("td").items())
-            key_td = tds[0].text().strip()
-
-            value_td = tds[1]
-            if value_td.has_class("review-rating-stars"):
-                filled = list(value_td("span.star.fill").items())
-                value = len(filled)
-            else:
-                value = value_td.text().strip()
-
-            field = mapping.get(key_td)
-            data[field] = value
-        
-        return data
\ No newline at end of file
+            self.completed_airlines.add(key)
+
+    def closed(self, reason):
+        if reason != "finished":
+            self.logger.info(f"Crawl ended ({reason}); keeping the previous crawl marks")
+            return
+
+        marks = {key: self.newest_reviews[key] for key in self.completed_airlines if key in self.newest_reviews}
+        if not marks:
+            return
+        db = PostgresClient(self.settings.get("POSTGRES_DSN"))
+        try:
+            db.save_crawl_marks(marks)
+        finally:
+            db.close()
+        self.crawler.stats.set_value("incremental/marks_saved", len(marks))
@@ -1,10 +1,97 @@
 from dotenv import load_dotenv, find_dotenv
 import os
 import psycopg
+from datetime import date
 
 load_dotenv(find_dotenv())
 POSTGRES_DSN = os.getenv("POSTGRES_DSN")
 
+REVIEW_COLUMNS = [
+    "reviewId", "userName", "airlineName",
+    "title", "score", "content", "verifiedType",
+    "country", "dateReview",
+    "aircraft", "typeOfTraveller", "seatType", "route", "dateFlown",
+    "seatComfort", "cabinStaffService", "foodBeverages",
+    "inflightEntertainment", "groundService", "wifiConnectivity",
+    "valueForMoney", "recommended",
+]
+
+REVIEW_INT_COLUMNS = (
+    "score", "seatComfort", "cabinStaffService", "foodBeverages",
+    "inflightEntertainment", "groundService", "wifiConnectivity", "valueForMoney",
+)
+
+# Rows are COPYed here first, then merged into reviews in one statement.
+CREATE_REVIEWS_STAGING_SQL = f"""
+    CREATE TEMP TABLE IF NOT EXISTS reviews_staging
+    ON COMMIT DELETE ROWS
+    AS SELECT {", ".join(REVIEW_COLUMNS)} FROM reviews WITH NO DATA;
+"""
+
+COPY_REVIEWS_STAGING_SQL = f"COPY reviews_staging ({', '.join(REVIEW_COLUMNS)}) FROM STDIN"
+
+# Re-scraped reviews only rewrite the row (and fire the stats triggers) when
+# something actually changed.
+UPSERT_REVIEWS_SQL = f"""
+    INSERT INTO reviews ({", ".join(REVIEW_COLUMNS)})
+    SELECT DISTINCT ON (reviewId) {", ".join(REVIEW_COLUMNS)}
+    FROM reviews_staging
+    ORDER BY reviewId
+    ON CONFLICT (reviewId) DO UPDATE
+    SET {", ".join(f"{column} = EXCLUDED.{column}" for column in REVIEW_COLUMNS[1:])}
+    WHERE ({", ".join(f"reviews.{column}" for column in REVIEW_COLUMNS[1:])})
+        IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in REVIEW_COLUMNS[1:])});
+"""
+
+UPSERT_REVIEW_SQL = f"""
+    INSERT INTO reviews ({", ".join(REVIEW_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(REVIEW_COLUMNS))})
+    ON CONFLICT (reviewId) DO UPDATE
+    SET {", ".join(f"{column} = EXCLUDED.{column}" for column in REVIEW_COLUMNS[1:])}
+    WHERE ({", ".join(f"reviews.{column}" for column in REVIEW_COLUMNS[1:])})
+        IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in REVIEW_COLUMNS[1:])});
+"""
+
+CRAWL_MARKS_SQL = """
+    SELECT a.name, m.latest_review
+    FROM airline_crawl_marks m
+    JOIN airlines a ON a.airline_id = m.airline_id;
+"""
+
+# Marks only move forward, so a crawl that saw older pages never rewinds one.
+SAVE_CRAWL_MARK_SQL = """
+    INSERT INTO airline_crawl_marks (airline_id, latest_review)
+    SELECT airline_id, %s FROM airlines WHERE LOWER(name) = LOWER(%s)
+    ON CONFLICT (airline_id) DO UPDATE
+    SET latest_review = GREATEST(airline_crawl_marks.latest_review, EXCLUDED.latest_review),
+        crawled_at = NOW();
+"""
+
+def _to_int(value):
+    if value is None or value == "":
+        return None
+    return int(value)
+
+def review_row(item):
+    """Column tuple for one ReviewItem in REVIEW_COLUMNS order; raises ValueError for unusable rows."""
+    data = dict(item)
+    if not data.get("reviewId"):
+        raise ValueError("review has no reviewId")
+    if not data.get("airlineName"):
+        raise ValueError(f"review {data['reviewId']} has no airlineName")
+
+    row = []
+    for column in REVIEW_COLUMNS:
+        value = data.get(column)
+        if column in REVIEW_INT_COLUMNS:
+            value = _to_int(value)
+        elif column == "dateReview":
+            value = date.fromisoformat(value) if value else None
+        elif value is None:
+            value = ""
+        row.append(value)
+    return tuple(row)
+
 class PostgresClient:
     def __init__(self, dsn):
         self.conn = psycopg.connect(dsn)
@@ -20,7 +107,7 @@ class PostgresClient:
                 """
                 INSERT INTO airlines (name, image, reviewCount)
                 VALUES (%s, %s, %s)
-                ON CONFLICT (name) DO UPDATE
+                ON CONFLICT ((LOWER(name))) DO UPDATE
                 SET image = EXCLUDED.image,
                     reviewCount = EXCLUDED.reviewCount;
                 """, (name, image, review_count),
@@ -31,56 +118,60 @@ class PostgresClient:
         else:
             self.conn.commit()
 
-    def insert_review(self, item):
-        data = dict(item)
-        required_keys = [
-            "reviewId", "title", "score", "content", "verifiedType",
-            "airlineName", "userName", "country", "dateReview",
-            "aircraft", "typeOfTraveller", "seatType", "route", "dateFlown",
-            "seatComfort", "cabinStaffService", "foodBeverages",
-            "inflightEntertainment", "groundService", "wifiConnectivity",
-            "valueForMoney", "recommended",
-        ]
-
-        for key in required_keys:
-            if key not in data:
-                if key in (
-                    "score", "seatComfort", "cabinStaffService", "foodBeverages",
-                    "inflightEntertainment", "groundService", "wifiConnectivity",
-                    "valueForMoney", "dateReview",
-                ):
-                    data[key] = None
-                else:
-                    data[key] = ""
+    def get_crawl_marks(self):
+        """Lower-cased airline name -> newest review date of its last completed crawl."""
+        self.cur.execute(CRAWL_MARKS_SQL)
+        marks = {name.lower(): latest_review for name, latest_review in self.cur.fetchall()}
+        self.conn.commit()
+        return marks
 
+    def save_crawl_marks(self, marks):
+        """Record {airline name: newest review date} for airlines whose crawl completed."""
         try:
-            self.cur.execute(
-                """
-                INSERT INTO reviews (
-                    reviewId, userName, airlineName,
-                    title, score, content, verifiedType, 
-                    country, dateReview,
-                    aircraft, typeOfTraveller, seatType, route, dateFlown,
-                    seatComfort, cabinStaffService, foodBeverages,
-                    inflightEntertainment, groundService, wifiConnectivity,
-                    valueForMoney, recommended
-                ) VALUES (
-                    %(reviewId)s, %(userName)s, %(airlineName)s, 
-                    %(title)s, %(score)s, %(content)s, %(verifiedType)s,
-                    %(country)s, %(dateReview)s,
-                    %(aircraft)s, %(typeOfTraveller)s, %(seatType)s, %(route)s, %(dateFlown)s,
-                    %(seatComfort)s, %(cabinStaffService)s, %(foodBeverages)s,
-                    %(inflightEntertainment)s, %(groundService)s, %(wifiConnectivity)s,
-                    %(valueForMoney)s, %(recommended)s
-                );
-                """, data,
-            )
+            self.cur.executemany(SAVE_CRAWL_MARK_SQL, [(latest, name) for name, latest in marks.items()])
         except Exception as e:
-            print(f"Error inserting into reviews: {e}")
+            print(f"Error saving crawl marks: {e}")
             self.conn.rollback()
         else:
             self.conn.commit()
 
+    def copy_reviews(self, items):
+        """Bulk upsert ReviewItems via COPY; return (written, [(item, error)]), retrying row by row if the batch fails."""
+        rows = []
+        failed = []
+        for item in items:
+            try:
+                rows.append((item, review_row(item)))
+            except (TypeError, ValueError) as e:
+                failed.append((item, e))
+
+        if not rows:
+            return 0, failed
+
+        try:
+            self.cur.execute(CREATE_REVIEWS_STAGING_SQL)
+            with self.cur.copy(COPY_REVIEWS_STAGING_SQL) as copy:
+                for _, row in rows:
+                    copy.write_row(row)
+            self.cur.execute(UPSERT_REVIEWS_SQL)
+            written = self.cur.rowcount
+            self.conn.commit()
+            return written, failed
+        except Exception as e:
+            print(f"Error copying reviews, retrying row by row: {e}")
+            self.conn.rollback()
+
+        written = 0
+        with self.conn.transaction():
+            for item, row in rows:
+                try:
+                    with self.conn.transaction():
+                        self.cur.execute(UPSERT_REVIEW_SQL, row)
+                        written += self.cur.rowcount
+                except Exception as e:
+                    failed.append((item, e))
+        return written, failed
+
     def close(self):
         if self.conn:
             self.cur.close()
@@ -0,0 +1,17 @@
+from benchmarks.extractors import FIXTURES, check_identical, extract, load_fixtures
+from myspider.extractors import PyQueryExtractor, SelectorExtractor
+
+def test_extractors_agree_on_saved_pages():
+    responses = load_fixtures(FIXTURES)
+    assert responses
+    check_identical(responses, {"pyquery": PyQueryExtractor(), "selector": SelectorExtractor()})
+
+def test_review_text_keeps_line_breaks_and_collapses_whitespace():
+    responses = {response.url.rsplit("/", 1)[-1]: response for response in load_fixtures(FIXTURES)}
+    items = extract(SelectorExtractor(), responses["british-airways-page-1.html"])
+    contents = {item["reviewId"]: item["content"] for item in items if "reviewId" in item}
+
+    assert contents["918240"] == (
+        "Excellent flight overall.\nThe lounge in Singapore was busy,\n"
+        "but boarding was smooth. The new Club Suite is a big step up."
+    )
@@ -0,0 +1,85 @@
+import json
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.utils.request import RequestFingerprinter
+
+from myspider.httpcache import ContentAddressedCacheStorage
+
+URL = "https://www.airlinequality.com/airline-reviews/british-airways/page/2/?sortby=post_date%3ADesc&pagesize=100"
+BODY = b"<html><body><h1>British Airways</h1></body></html>"
+
+def make_storage(tmp_path, mode="replay", **settings):
+    storage = ContentAddressedCacheStorage(Settings({
+        "HTTPCACHE_DIR": str(tmp_path), "HTTPCACHE_MODE": mode, **settings,
+    }))
+    spider = SimpleNamespace(
+        name="reviews",
+        logger=logging.getLogger("test"),
+        crawler=SimpleNamespace(request_fingerprinter=RequestFingerprinter()),
+    )
+    storage.open_spider(spider)
+    return storage, spider
+
+def store(storage, spider, url=URL, body=BODY):
+    request = Request(url)
+    response = HtmlResponse(url=url, body=body, encoding="utf-8", headers={"Content-Type": "text/html; charset=utf-8"})
+    storage.store_response(spider, request, response)
+    return request
+
+def entry_paths(tmp_path):
+    return sorted((tmp_path / "reviews" / "requests").glob("*/*.json"))
+
+def test_key_ignores_query_order_but_not_the_url(tmp_path):
+    storage, spider = make_storage(tmp_path)
+    fingerprint = storage.fingerprinter.fingerprint
+
+    reordered = URL.replace("sortby=post_date%3ADesc&pagesize=100", "pagesize=100&sortby=post_date%3ADesc")
+    assert fingerprint(Request(reordered)) == fingerprint(Request(URL))
+    assert fingerprint(Request(URL.replace("page/2", "page/3"))) != fingerprint(Request(URL))
+
+    store(storage, spider)
+    store(storage, spider, reordered)
+    assert [path.stem for path in entry_paths(tmp_path)] == [fingerprint(Request(URL)).hex()]
+
+def test_stored_response_round_trips_and_bodies_are_deduplicated(tmp_path):
+    storage, spider = make_storage(tmp_path)
+    request = store(storage, spider)
+    store(storage, spider, URL.replace("page/2", "page/3"))
+
+    response = storage.retrieve_response(spider, request)
+
+    assert (response.url, response.status, response.body) == (URL, 200, BODY)
+    assert isinstance(response, HtmlResponse)
+    assert response.headers["Content-Type"] == b"text/html; charset=utf-8"
+    assert len(entry_paths(tmp_path)) == 2
+    assert len(list((tmp_path / "reviews" / "objects").glob("*/*.gz"))) == 1
+
+def test_record_mode_never_serves_from_the_cache(tmp_path):
+    storage, spider = make_storage(tmp_path, mode="record")
+    request = store(storage, spider)
+
+    assert storage.retrieve_response(spider, request) is None
+
+def age_entries(tmp_path, seconds):
+    for path in entry_paths(tmp_path):
+        entry = json.loads(path.read_bytes())
+        entry["timestamp"] = time.time() - seconds
+        path.write_text(json.dumps(entry))
+
+@pytest.mark.parametrize("expiration_secs, age, cached", [
+    (0, 10 ** 8, True),
+    (3600, 60, True),
+    (3600, 7200, False),
+])
+def test_entries_expire_after_httpcache_expiration_secs(tmp_path, expiration_secs, age, cached):
+    storage, spider = make_storage(tmp_path, HTTPCACHE_EXPIRATION_SECS=expiration_secs)
+    request = store(storage, spider)
+    age_entries(tmp_path, age)
+
+    assert (storage.retrieve_response(spider, request) is not None) is cached
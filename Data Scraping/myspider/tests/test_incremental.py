@@ -0,0 +1,92 @@
+from collections import Counter
+from datetime import date
+from types import SimpleNamespace
+
+import scrapy
+
+from benchmarks.extractors import FIXTURES, load_fixtures
+from myspider.extractors import PyQueryExtractor
+from myspider.items import ReviewItem
+from myspider.spiders import reviews
+from myspider.spiders.reviews import ReviewSpider
+
+class FakeStats(Counter):
+    def inc_value(self, key, count=1):
+        self[key] += count
+
+    def set_value(self, key, value):
+        self[key] = value
+
+class FakeClient:
+    saved = []
+
+    def __init__(self, dsn):
+        pass
+
+    def save_crawl_marks(self, marks):
+        self.saved.append(marks)
+
+    def close(self):
+        pass
+
+def fixture(name):
+    response = next(r for r in load_fixtures(FIXTURES) if r.url.endswith(name))
+    return response.replace(request=scrapy.Request(response.url, meta={"is_first_page": False}))
+
+def make_spider(crawl_marks=None):
+    spider = ReviewSpider()
+    spider.crawler = SimpleNamespace(stats=FakeStats())
+    spider.settings = {"POSTGRES_DSN": "unused"}
+    spider.extractor = PyQueryExtractor()
+    spider.crawl_marks = crawl_marks or {}
+    return spider
+
+def crawl(spider, name):
+    output = list(spider.parse_airline(fixture(name)))
+    review_ids = [item["reviewId"] for item in output if isinstance(item, ReviewItem)]
+    next_urls = [item.url for item in output if isinstance(item, scrapy.Request)]
+    return review_ids, next_urls
+
+def test_first_crawl_follows_every_page():
+    spider = make_spider()
+
+    review_ids, next_urls = crawl(spider, "british-airways-page-1.html")
+
+    assert review_ids == ["918273", "918240", "918201", "918188"]
+    assert next_urls == ["https://www.airlinequality.com/airline-reviews/british-airways/page/2/"]
+    assert spider.completed_airlines == set()
+
+def test_crawl_stops_once_it_passes_the_mark():
+    spider = make_spider({"british airways": date(2025, 9, 26)})
+
+    review_ids, next_urls = crawl(spider, "british-airways-page-1.html")
+
+    assert review_ids == ["918273", "918240"]
+    assert next_urls == []
+    assert spider.completed_airlines == {"british airways"}
+    assert spider.crawler.stats["incremental/known_reviews_skipped"] == 2
+
+def test_interrupted_crawl_keeps_the_old_mark(monkeypatch):
+    monkeypatch.setattr(reviews, "PostgresClient", FakeClient)
+    FakeClient.saved = []
+    spider = make_spider({"british airways": date(2025, 9, 1)})
+
+    # Page 1 is newer than the mark, so the crawl goes on to page 2 before
+    # being stopped; the gap down to the old mark must be crawled next time.
+    review_ids, next_urls = crawl(spider, "british-airways-page-1.html")
+    spider.closed("shutdown")
+
+    assert len(review_ids) == 4
+    assert next_urls
+    assert FakeClient.saved == []
+
+def test_finished_crawl_saves_the_newest_review_of_completed_airlines(monkeypatch):
+    monkeypatch.setattr(reviews, "PostgresClient", FakeClient)
+    FakeClient.saved = []
+    spider = make_spider()
+
+    crawl(spider, "british-airways-page-1.html")
+    crawl(spider, "british-airways-page-3.html")
+    spider.closed("finished")
+
+    assert FakeClient.saved == [{"british airways": date(2025, 9, 28)}]
@@ -0,0 +1,82 @@
+import os
+from datetime import date
+
+import pytest
+
+from postgres_db import REVIEW_COLUMNS, PostgresClient, review_row
+
+# Point at a disposable, migrated database; the copy tests write to it.
+TEST_DSN = os.getenv("TEST_POSTGRES_DSN")
+
+AIRLINE = "Copy Test Air"
+
+def review(review_id, **fields):
+    return {"reviewId": review_id, "airlineName": AIRLINE, "title": "Fine", **fields}
+
+def test_review_row_converts_columns():
+    row = dict(zip(REVIEW_COLUMNS, review_row(review(
+        "101", score="7", seatComfort=4, dateReview="2024-05-01", valueForMoney="",
+    ))))
+
+    assert row["reviewId"] == "101"
+    assert row["score"] == 7
+    assert row["seatComfort"] == 4
+    assert row["valueForMoney"] is None
+    assert row["dateReview"] == date(2024, 5, 1)
+    assert row["content"] == ""
+    assert row["groundService"] is None
+
+@pytest.mark.parametrize("item", [
+    {"airlineName": AIRLINE},
+    {"reviewId": "", "airlineName": AIRLINE},
+    {"reviewId": "102"},
+])
+def test_review_row_rejects_unkeyed_reviews(item):
+    with pytest.raises(ValueError):
+        review_row(item)
+
+def test_review_row_rejects_bad_values():
+    with pytest.raises(ValueError):
+        review_row(review("103", score="ten"))
+    with pytest.raises(ValueError):
+        review_row(review("104", dateReview="yesterday"))
+
+@pytest.fixture
+def db():
+    if not TEST_DSN:
+        pytest.skip("TEST_POSTGRES_DSN is not set")
+    client = PostgresClient(TEST_DSN)
+    client.insert_airline({"name": AIRLINE, "image": "", "reviewCount": 3})
+
+    yield client
+
+    client.cur.execute("DELETE FROM reviews WHERE airlineName = %s;", (AIRLINE,))
+    client.cur.execute("DELETE FROM airlines WHERE name = %s;", (AIRLINE,))
+    client.conn.commit()
+    client.close()
+
+def stored_titles(db):
+    db.cur.execute("SELECT reviewId, title FROM reviews WHERE airlineName = %s ORDER BY reviewId;", (AIRLINE,))
+    return db.cur.fetchall()
+
+def test_copy_reviews_upserts_only_changed_rows(db):
+    assert db.copy_reviews([review("9001"), review("9002")]) == (2, [])
+
+    written, failed = db.copy_reviews([review("9001"), review("9002", title="Better")])
+
+    assert (written, failed) == (1, [])
+    assert stored_titles(db) == [("9001", "Fine"), ("9002", "Better")]
+
+def test_copy_reviews_stores_one_row_per_duplicate_review(db):
+    db.copy_reviews([review("9003", title="First"), review("9003", title="Second")])
+
+    assert len(stored_titles(db)) == 1
+
+def test_copy_reviews_skips_unusable_items(db):
+    bad = review("9004", score="ten")
+
+    written, failed = db.copy_reviews([review("9005"), bad])
+
+    assert written == 1
+    assert [item for item, _ in failed] == [bad]
+    assert stored_titles(db) == [("9005", "Fine")]
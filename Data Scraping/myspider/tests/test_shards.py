@@ -0,0 +1,28 @@
+from collections import Counter
+
+import pytest
+
+from myspider.spiders.reviews import ReviewSpider, airline_shard
+
+URL = "https://www.airlinequality.com/airline-reviews/british-airways"
+
+def test_shard_ignores_host_scheme_and_trailing_slash():
+    shard = airline_shard(URL, 8)
+    assert airline_shard(URL + "/", 8) == shard
+    assert airline_shard("/airline-reviews/british-airways", 8) == shard
+    assert airline_shard("http://airlinequality.com/airline-reviews/british-airways/", 8) == shard
+
+def test_shard_is_stable_across_runs():
+    # Pinned so a change to the hash (which would move airlines between shards) is deliberate.
+    assert airline_shard(URL, 4) == 3
+    assert airline_shard("https://www.airlinequality.com/airline-reviews/emirates", 1000) == 905
+
+def test_shards_cover_every_airline_roughly_evenly():
+    counts = Counter(airline_shard(f"/airline-reviews/airline-{i}", 4) for i in range(4000))
+    assert set(counts) == {0, 1, 2, 3}
+    assert all(800 < count < 1200 for count in counts.values())
+
+@pytest.mark.parametrize("shard, shards", [(4, 4), (-1, 4), (0, 0)])
+def test_spider_rejects_invalid_shards(shard, shards):
+    with pytest.raises(ValueError):
+        ReviewSpider(shard=shard, shards=shards)
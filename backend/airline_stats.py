@@ -0,0 +1,89 @@
+"""Incremental maintenance of the per-airline statistics in airline_stats.
+
+Triggers on reviews mark the affected airlines in airline_stats_dirty; a
+refresh recomputes only those airlines and copies score, review count and
+sub-score means onto airlines. The API runs ``AirlineStatsRefresher`` in the
+background; the CLI refreshes once, e.g. after a crawl.
+
+    cd backend
+    python airline_stats.py          # refresh dirty airlines
+    python airline_stats.py --all    # recompute every airline
+"""
+import argparse
+import asyncio
+import os
+import time
+
+REFRESH_SECONDS = float(os.getenv("AIRLINE_STATS_REFRESH_SECONDS", "30"))
+
+class AirlineStatsRefresher:
+    """Periodically folds dirty airlines into airline_stats; the refresh lock lets one worker run each round."""
+
+    def __init__(self, db, interval=REFRESH_SECONDS):
+        self.db = db
+        self.interval = interval
+        self.task = None
+        self.refreshes = 0
+        self.airlines_refreshed = 0
+        self.last_refresh_at = None
+        self.last_refresh_seconds = None
+
+    async def start(self):
+        await self.refresh()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def refresh(self):
+        start = time.perf_counter()
+        airline_ids = await self.db.refresh_airline_stats()
+
+        self.refreshes += 1
+        self.airlines_refreshed += len(airline_ids)
+        self.last_refresh_at = time.time()
+        self.last_refresh_seconds = time.perf_counter() - start
+        return airline_ids
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing airline stats: {e}")
+
+    def metrics(self):
+        return {
+            "interval_seconds": self.interval,
+            "refreshes": self.refreshes,
+            "airlines_refreshed": self.airlines_refreshed,
+            "last_refresh_at": self.last_refresh_at,
+            "last_refresh_seconds": self.last_refresh_seconds,
+        }
+
+if __name__ == "__main__":
+    from migrations import migrate
+    from postgres_db import POSTGRES_DSN, PostgresClient
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=POSTGRES_DSN)
+    parser.add_argument("--all", action="store_true", help="mark every airline dirty before refreshing")
+    args = parser.parse_args()
+
+    migrate(args.dsn)
+    db = PostgresClient(args.dsn)
+    try:
+        if args.all:
+            db.mark_all_airline_stats_dirty()
+        start = time.perf_counter()
+        refreshed = db.refresh_airline_stats()
+        print(f"Refreshed {len(refreshed)} airlines in {time.perf_counter() - start:.2f}s")
+    finally:
+        db.close()
@@ -0,0 +1,103 @@
+"""Offline sentiment scoring of the whole reviews table.
+
+Pages through the reviews that have no review_sentiment row yet, scores them
+with sentModel across a pool of worker processes and bulk-loads label, score
+and LIME token attributions into review_sentiment with COPY, then folds the
+new attributions into the per-airline word-cloud aggregates. Each batch is
+committed on its own, so an interrupted run resumes where it stopped. Reviews
+that fail to score are recorded in review_sentiment_failures and skipped by
+later runs unless --retry-failed is given.
+
+    cd backend
+    python batch_score.py --workers 8 --batch-size 256
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from itertools import islice
+
+from migrations import migrate
+from postgres_db import POSTGRES_DSN, PostgresClient
+from sentiment_backend import SENTIMENT_TORCH_THREADS, init_worker, worker_run_score
+from sentModel import model_name
+
+def _score_review(args):
+    """(review_id, review_sentiment row, None), or (review_id, None, error) when the review cannot be scored."""
+    review_id, airline_name, content, num_features = args
+    try:
+        score, sent_lab, pos_dict, neg_dict = worker_run_score(content, num_features)
+    except Exception as e:
+        return review_id, None, f"{type(e).__name__}: {e}"
+    return review_id, (review_id, airline_name, model_name, sent_lab, score, pos_dict, neg_dict), None
+
+def score_batch(pool, batch, num_features, workers):
+    """Score (reviewId, airlineName, content) tuples; return (rows, [(review_id, error)])."""
+    tasks = [(review_id, airline_name, content, num_features) for review_id, airline_name, content in batch]
+    rows = []
+    failures = []
+    for review_id, row, error in pool.map(_score_review, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+        if error is None:
+            rows.append(row)
+        else:
+            print(f"Could not score review {review_id}: {error}")
+            failures.append((review_id, error))
+    return rows, failures
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def run(dsn, workers, batch_size, num_features, torch_threads, limit=None, retry_failed=False):
+    migrate(dsn)
+    reader = PostgresClient(dsn)
+    writer = PostgresClient(dsn)
+    scored = 0
+    failed = 0
+    start = time.perf_counter()
+
+    try:
+        if retry_failed:
+            writer.clear_sentiment_failures()
+
+        reviews = reader.stream_unscored_reviews(page_size=batch_size * 4)
+        if limit:
+            reviews = islice(reviews, limit)
+
+        with multiprocessing.get_context("spawn").Pool(
+            workers, initializer=init_worker, initargs=(torch_threads,)
+        ) as pool:
+            for batch in batched(reviews, batch_size):
+                rows, failures = score_batch(pool, batch, num_features, workers)
+                if rows:
+                    writer.copy_review_sentiment(rows)
+                    writer.refresh_wordcloud_aggregates()
+                if failures:
+                    writer.insert_sentiment_failures(failures)
+
+                scored += len(rows)
+                failed += len(failures)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"Scored {scored} reviews ({failed} failed) up to reviewId {batch[-1][0]} "
+                    f"({scored / elapsed:.1f} reviews/s)"
+                )
+    finally:
+        reader.close()
+        writer.close()
+
+    return scored
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=POSTGRES_DSN)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--num-features", type=int, default=10)
+    parser.add_argument("--torch-threads", type=int, default=SENTIMENT_TORCH_THREADS)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--retry-failed", action="store_true", help="score reviews that failed in earlier runs again")
+    args = parser.parse_args()
+
+    run(args.dsn, args.workers, args.batch_size, args.num_features, args.torch_threads, args.limit, args.retry_failed)
@@ -0,0 +1,74 @@
+"""Concurrency load test for the query layer.
+
+Compares the old per-request ``PostgresClient`` (blocking connect + query
+inside a coroutine) with ``AsyncPostgresClient`` on the shared pool and
+prints p50/p99 latency for each.
+
+    cd backend
+    python -m benchmarks.db_load --airline "British Airways" --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import time
+
+from db_pool import POSTGRES_DSN, create_pool
+from postgres_db import AsyncPostgresClient, PostgresClient
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def report(label, latencies, elapsed):
+    print(
+        f"{label:<8} requests={len(latencies):<6} "
+        f"p50={percentile(latencies, 50) * 1000:8.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:8.2f}ms "
+        f"throughput={len(latencies) / elapsed:8.1f} req/s"
+    )
+
+async def run_load(call, concurrency, total):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, time.perf_counter() - start
+
+async def main(args):
+    async def sync_call():
+        db = PostgresClient(args.dsn)
+        try:
+            db.get_airline_key_data(args.airline)
+        finally:
+            db.close()
+
+    latencies, elapsed = await run_load(sync_call, args.concurrency, args.requests)
+    report("before", latencies, elapsed)
+
+    pool = create_pool(args.dsn)
+    await pool.open(wait=True)
+    try:
+        db = AsyncPostgresClient(pool)
+
+        async def async_call():
+            await db.get_airline_key_data(args.airline)
+
+        latencies, elapsed = await run_load(async_call, args.concurrency, args.requests)
+        report("after", latencies, elapsed)
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=POSTGRES_DSN)
+    parser.add_argument("--airline", default="British Airways")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
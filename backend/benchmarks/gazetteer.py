@@ -0,0 +1,51 @@
+"""Per-request cost of resolving route cities to coordinates.
+
+Compares the old approach (parse worldcities.csv with csv.DictReader on every
+request) with lookups against the in-memory Gazetteer.
+
+    cd backend
+    python -m benchmarks.gazetteer --requests 20
+"""
+import argparse
+import csv
+import time
+
+from gazetteer import CITIES_CSV, Gazetteer
+
+ROUTE_CITIES = [
+    "London", "New York", "Paris", "Dubai", "Singapore", "Hong Kong", "Frankfurt",
+    "Los Angeles", "Sydney", "Tokyo", "Doha", "Amsterdam", "Madrid", "São Paulo",
+    "Istanbul", "Bangkok", "Toronto", "Zurich", "Mumbai", "Johannesburg",
+]
+
+def old_request(path, cities):
+    city_coords = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            city_coords[row['city']] = {'lng': float(row['lng']), 'lat': float(row['lat'])}
+    return [city_coords.get(city) for city in cities]
+
+def new_request(gazetteer, cities):
+    return [gazetteer.get(city) for city in cities]
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main(args):
+    gazetteer = Gazetteer(args.path).load()
+    print(f"Gazetteer load: {gazetteer.load_seconds * 1000:.1f}ms for {gazetteer.metrics()['cities']} cities")
+
+    old = timed(lambda: old_request(args.path, ROUTE_CITIES), args.requests)
+    new = timed(lambda: new_request(gazetteer, ROUTE_CITIES), args.requests * 1000)
+    print(f"old per request: {old * 1000:10.3f}ms")
+    print(f"new per request: {new * 1000:10.3f}ms")
+    print(f"speedup:         {old / new:10.0f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default=CITIES_CSV)
+    parser.add_argument("--requests", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,59 @@
+"""CPU throughput benchmark for sentModel.predict_proba.
+
+Runs LIME-sized sets of review-like texts through the old path (one tensor,
+every text padded to ``max_length``) and through the batched, dynamically
+padded path, and prints samples/sec for each text length.
+
+    cd backend
+    python -m benchmarks.inference --samples 500 --batch-size 32
+"""
+import argparse
+import random
+import time
+
+import torch
+
+from sentModel import MAX_LENGTH, WARMUP_TEXT, sentModel
+
+WORDS = (
+    "flight crew seat legroom delayed friendly boarding lounge meal staff "
+    "cabin comfortable rude late luggage lost excellent terrible service "
+    "value entertainment wifi clean cramped smooth landing connection"
+).split()
+
+def make_texts(n_words, count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(max(1, n_words // 2), n_words))) for _ in range(count)]
+
+def predict_padded(sm, texts):
+    inputs = sm.tokenizer(texts, truncation=True, max_length=MAX_LENGTH, padding='max_length', return_tensors="pt")
+    inputs.to(sm.device)
+    with torch.no_grad():
+        logits = sm.model(**inputs).logits
+        return torch.nn.functional.softmax(logits, dim=-1).cpu().numpy()
+
+def throughput(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(texts)
+    return len(texts) * repeat / (time.perf_counter() - start)
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    sm = sentModel(batch_size=args.batch_size).warm_up(WARMUP_TEXT)
+
+    print(f"{'words':>6} {'padded/s':>12} {'batched/s':>12} {'speedup':>8}")
+    for n_words in args.lengths:
+        texts = make_texts(n_words, args.samples)
+        old = throughput(lambda t: predict_padded(sm, t), texts, args.repeat)
+        new = throughput(sm.predict_proba, texts, args.repeat)
+        print(f"{n_words:>6} {old:>12.1f} {new:>12.1f} {new / old:>7.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 40, 80])
+    main(parser.parse_args())
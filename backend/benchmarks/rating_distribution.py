@@ -0,0 +1,71 @@
+"""Rating distribution query cost.
+
+Compares the old 42-column ``COUNT(*) FILTER`` query, run once per airline,
+with the grouped unnest query that serves one or many airlines in a single
+pass, and prints p50/p99 latency for each.
+
+    cd backend
+    python -m benchmarks.rating_distribution --airlines 1 10 50 --repeat 50
+"""
+import argparse
+import time
+
+import psycopg
+
+from benchmarks.db_load import percentile
+from postgres_db import POSTGRES_DSN, RATING_DISTRIBUTION_SQL, RATING_VALUES, SUB_SCORE_COLUMNS
+
+OLD_RATING_DISTRIBUTION_SQL = f"""
+    SELECT
+        {", ".join(
+            f"COUNT(*) FILTER (WHERE {column} = {value})"
+            for column, _ in SUB_SCORE_COLUMNS
+            for value in RATING_VALUES
+        )}
+    FROM reviews
+    WHERE airline_id = %s;
+"""
+
+def timed(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(label, airlines, latencies):
+    print(
+        f"{label:<7} airlines={airlines:<5} "
+        f"p50={percentile(latencies, 50) * 1000:8.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:8.2f}ms"
+    )
+
+def main(args):
+    with psycopg.connect(args.dsn) as conn:
+        airline_ids = [
+            row[0] for row in conn.execute(
+                "SELECT airline_id FROM airlines ORDER BY calculatedReviewCount DESC NULLS LAST LIMIT %s;",
+                (max(args.airlines),)
+            )
+        ]
+
+        for count in args.airlines:
+            ids = airline_ids[:count]
+
+            def old():
+                for airline_id in ids:
+                    conn.execute(OLD_RATING_DISTRIBUTION_SQL, (airline_id,)).fetchone()
+
+            def new():
+                conn.execute(RATING_DISTRIBUTION_SQL, (ids,)).fetchall()
+
+            report("before", len(ids), timed(old, args.repeat))
+            report("after", len(ids), timed(new, args.repeat))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=POSTGRES_DSN)
+    parser.add_argument("--airlines", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,136 @@
+"""Review text search on a synthetic corpus.
+
+Builds a reviews table of ``--rows`` synthetic reviews (one million by
+default) in a scratch schema, then compares the old ILIKE keyword scan with
+the ranked tsvector/GIN search behind /reviews/search and prints p50/p99
+latency for each query.
+
+    cd backend
+    python -m benchmarks.search --rows 1000000 --repeat 20
+"""
+import argparse
+import time
+
+import psycopg
+
+from benchmarks.db_load import percentile
+from postgres_db import POSTGRES_DSN, build_review_search_query
+
+SCHEMA = "review_search_bench"
+
+VOCABULARY = [
+    "flight", "crew", "seat", "legroom", "delayed", "delay", "cancelled", "luggage",
+    "baggage", "lost", "friendly", "rude", "helpful", "meal", "food", "drinks",
+    "entertainment", "screen", "wifi", "boarding", "gate", "check-in", "queue",
+    "lounge", "business", "economy", "premium", "upgrade", "comfortable", "cramped",
+    "clean", "dirty", "toilet", "blanket", "pillow", "landing", "takeoff", "turbulence",
+    "pilot", "captain", "attendant", "service", "refund", "compensation", "connection",
+    "transfer", "terminal", "hours", "minutes", "late", "early", "punctual", "price",
+    "value", "expensive", "cheap", "recommend", "never", "again", "excellent", "terrible",
+]
+
+QUERIES = ["delayed", "lost luggage", "friendly crew -rude", '"excellent service"']
+
+CREATE_SQL = f"""
+    DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+    CREATE SCHEMA {SCHEMA};
+    CREATE TABLE {SCHEMA}.reviews (
+        reviewId TEXT PRIMARY KEY,
+        airline_id INTEGER,
+        airlineName TEXT,
+        title TEXT,
+        content TEXT,
+        dateReview DATE,
+        score INTEGER,
+        search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+            setweight(to_tsvector('english', COALESCE(content, '')), 'B')
+        ) STORED
+    );
+"""
+
+# The correlated "WHERE i > 0" keeps Postgres from evaluating each text subquery only once.
+FILL_SQL = f"""
+    INSERT INTO {SCHEMA}.reviews (reviewId, airline_id, airlineName, title, content, dateReview, score)
+    SELECT
+        i::text,
+        1 + i %% %(airlines)s,
+        'Airline ' || (1 + i %% %(airlines)s),
+        (SELECT string_agg((%(words)s::text[])[1 + floor(random() * %(vocabulary)s)::int], ' ')
+         FROM generate_series(1, 6) WHERE i > 0),
+        (SELECT string_agg((%(words)s::text[])[1 + floor(random() * %(vocabulary)s)::int], ' ')
+         FROM generate_series(1, 60) WHERE i > 0),
+        DATE '2015-01-01' + i %% 3650,
+        1 + i %% 10
+    FROM generate_series(1, %(rows)s) AS i;
+"""
+
+INDEX_SQL = f"""
+    CREATE INDEX ON {SCHEMA}.reviews USING GIN (search_vector);
+    CREATE INDEX ON {SCHEMA}.reviews (airline_id, dateReview DESC NULLS LAST, reviewId DESC);
+    ANALYZE {SCHEMA}.reviews;
+"""
+
+ILIKE_SQL = """
+    SELECT reviewId, title, dateReview, score
+    FROM reviews
+    WHERE content ILIKE %s OR title ILIKE %s
+    ORDER BY dateReview DESC NULLS LAST, reviewId DESC
+    LIMIT %s;
+"""
+
+def build_corpus(conn, rows, airlines):
+    start = time.perf_counter()
+    conn.execute(CREATE_SQL)
+    conn.execute(FILL_SQL, {"airlines": airlines, "words": VOCABULARY, "vocabulary": len(VOCABULARY), "rows": rows})
+    conn.execute(INDEX_SQL)
+    conn.commit()
+    print(f"Built {rows} synthetic reviews in {time.perf_counter() - start:.1f}s")
+
+def timed(conn, query, params, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(label, text, latencies):
+    print(
+        f"{label:<7} {text!r:<24} "
+        f"p50={percentile(latencies, 50) * 1000:9.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:9.2f}ms"
+    )
+
+def main(args):
+    with psycopg.connect(args.dsn) as conn:
+        if not args.reuse:
+            build_corpus(conn, args.rows, args.airlines)
+        conn.execute(f"SET search_path = {SCHEMA};")
+
+        try:
+            for text in QUERIES:
+                # ILIKE has no query syntax; match on the first word.
+                pattern = "%" + text.strip('"').split()[0] + "%"
+                report("ilike", text, timed(conn, ILIKE_SQL, (pattern, pattern, args.limit), args.repeat))
+
+                query, params = build_review_search_query(text, args.limit)
+                report("fts", text, timed(conn, query, params, args.repeat))
+
+                query, params = build_review_search_query(text, args.limit, airline_id=1)
+                report("fts+id", text, timed(conn, query, params, args.repeat))
+        finally:
+            if not args.keep:
+                conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE;")
+                conn.commit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=POSTGRES_DSN)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--airlines", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="leave the synthetic schema in place")
+    parser.add_argument("--reuse", action="store_true", help="reuse a corpus left by --keep")
+    main(parser.parse_args())
@@ -0,0 +1,47 @@
+from dotenv import load_dotenv, find_dotenv
+import os
+from psycopg_pool import AsyncConnectionPool
+
+load_dotenv(find_dotenv())
+POSTGRES_DSN = os.getenv("POSTGRES_DSN")
+
+POOL_MIN_SIZE = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("POSTGRES_POOL_TIMEOUT", "30"))
+POOL_MAX_IDLE = float(os.getenv("POSTGRES_POOL_MAX_IDLE", "600"))
+POOL_MAX_LIFETIME = float(os.getenv("POSTGRES_POOL_MAX_LIFETIME", "3600"))
+POOL_HEALTH_CHECK = os.getenv("POSTGRES_POOL_HEALTH_CHECK", "true").lower() in ("1", "true", "yes")
+
+def create_pool(dsn=POSTGRES_DSN):
+    """Build the application-wide connection pool (not opened yet)."""
+    return AsyncConnectionPool(
+        dsn,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        timeout=POOL_TIMEOUT,
+        max_idle=POOL_MAX_IDLE,
+        max_lifetime=POOL_MAX_LIFETIME,
+        check=AsyncConnectionPool.check_connection if POOL_HEALTH_CHECK else None,
+        name="airline-dashboard",
+        open=False,
+    )
+
+def get_pool_stats(pool):
+    """Return the pool configuration together with its wait/usage counters."""
+    stats = pool.get_stats()
+    return {
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests_num": stats.get("requests_num", 0),
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_wait_ms": stats.get("requests_wait_ms", 0),
+        "requests_errors": stats.get("requests_errors", 0),
+        "requests_timeouts": stats.get("requests_timeouts", 0),
+        "usage_ms": stats.get("usage_ms", 0),
+        "connections_num": stats.get("connections_num", 0),
+        "connections_errors": stats.get("connections_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
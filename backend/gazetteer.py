@@ -0,0 +1,132 @@
+import csv
+import os
+import threading
+import time
+import unicodedata
+from array import array
+
+CITIES_CSV = os.getenv("WORLD_CITIES_CSV", os.path.join(os.path.dirname(os.path.abspath(__file__)), "worldcities.csv"))
+RELOAD_CHECK_SECONDS = float(os.getenv("WORLD_CITIES_RELOAD_CHECK_SECONDS", "30"))
+
+def normalize_city(name):
+    """Case- and accent-insensitive key: 'São Paulo' and 'sao paulo' map to the same entry."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+def _parse_population(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+class _CityTable:
+    """Column-oriented city data plus a normalized-name -> row index."""
+
+    def __init__(self, path):
+        self.names = []
+        self.lngs = array("d")
+        self.lats = array("d")
+        self.populations = array("q")
+        self.index = {}
+
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    lng = float(row["lng"])
+                    lat = float(row["lat"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+                position = len(self.names)
+                self.names.append(row["city"])
+                self.lngs.append(lng)
+                self.lats.append(lat)
+                self.populations.append(_parse_population(row.get("population")))
+
+                for name in (row["city"], row.get("city_ascii")):
+                    if name:
+                        self._index(normalize_city(name), position)
+
+    def _index(self, key, position):
+        # Ambiguous names ("London", "Paris", ...) resolve to the most populous city.
+        current = self.index.get(key)
+        if current is None or self.populations[position] > self.populations[current]:
+            self.index[key] = position
+
+class Gazetteer:
+    """City name -> coordinates lookup from worldcities.csv, swapped whole on reload."""
+
+    def __init__(self, path=CITIES_CSV, reload_check_seconds=RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.reload_check_seconds = reload_check_seconds
+        self.table = None
+        self.mtime = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self.reloads = 0
+        self.last_check = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        start = time.perf_counter()
+        mtime = os.path.getmtime(self.path)
+        table = _CityTable(self.path)
+
+        with self.lock:
+            if self.table is not None:
+                self.reloads += 1
+            self.table = table
+            self.mtime = mtime
+            self.loaded_at = time.time()
+            self.load_seconds = time.perf_counter() - start
+
+        return self
+
+    def try_load(self):
+        """``load``, logging a missing or unreadable CSV and keeping the current (possibly empty) table."""
+        try:
+            return self.load()
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Error loading world cities from {self.path}: {e}")
+            return self
+
+    def needs_reload(self):
+        now = time.monotonic()
+        if now - self.last_check < self.reload_check_seconds:
+            return False
+        self.last_check = now
+
+        try:
+            return os.path.getmtime(self.path) != self.mtime
+        except OSError:
+            return False
+
+    def get(self, name):
+        table = self.table
+        if table is None:
+            return None
+        position = table.index.get(normalize_city(name))
+        if position is None:
+            return None
+        return {'lng': table.lngs[position], 'lat': table.lats[position]}
+
+    def metrics(self):
+        table = self.table
+        return {
+            "path": self.path,
+            "cities": len(table.names) if table else 0,
+            "names_indexed": len(table.index) if table else 0,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+        }
+
+_gazetteer = None
+
+def get_gazetteer(path=CITIES_CSV):
+    """Return the process-wide Gazetteer; it starts empty without the CSV and loads it once it appears."""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(path).try_load()
+    return _gazetteer
@@ -0,0 +1,132 @@
+import asyncio
+import concurrent.futures
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WAIT_MS = float(os.getenv("SENTIMENT_BATCH_MAX_WAIT_MS", "5"))
+MAX_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_MAX_SIZE", "256"))
+PREDICT_TIMEOUT_SECONDS = float(os.getenv("SENTIMENT_PREDICT_TIMEOUT_SECONDS", "60"))
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, float("inf"))
+
+class InferenceBatcher:
+    """Coalesces predict_proba calls from concurrent requests into one forward pass."""
+
+    def __init__(self, sent_model, max_wait_ms=MAX_WAIT_MS, max_batch_size=MAX_BATCH_SIZE):
+        self.sent_model = sent_model
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.queue = None
+        self.loop = None
+        self.task = None
+        self.executor = None
+        self.batches = 0
+        self.items = 0
+        self.max_queue_depth = 0
+        self.batch_size_histogram = {bucket: 0 for bucket in HISTOGRAM_BUCKETS}
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        # Not the default executor: LIME threads blocked in predict_threadsafe would starve it.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference-batcher")
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+        # Fail whatever is still queued so callers don't wait forever.
+        while self.queue is not None and not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference batcher stopped"))
+
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def predict(self, texts):
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        future = self.loop.create_future()
+        await self.queue.put((texts, future))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return await future
+
+    def predict_threadsafe(self, texts):
+        """Blocking entry point for code running outside the event loop (e.g. LIME in a thread)."""
+        future = asyncio.run_coroutine_threadsafe(self.predict(texts), self.loop)
+        try:
+            return future.result(timeout=PREDICT_TIMEOUT_SECONDS)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Sentiment inference did not finish within {PREDICT_TIMEOUT_SECONDS:g}s")
+
+    async def _collect(self):
+        pending = [await self.queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            pending.append(request)
+            size += len(request[0])
+
+        return pending
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            texts = [text for request_texts, _ in pending for text in request_texts]
+
+            try:
+                probabilities = await self.loop.run_in_executor(self.executor, self.sent_model.predict_proba, texts)
+            except asyncio.CancelledError:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Inference batcher stopped"))
+                raise
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._record(len(texts))
+
+            offset = 0
+            for request_texts, future in pending:
+                if not future.done():
+                    future.set_result(probabilities[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def _record(self, size):
+        self.batches += 1
+        self.items += size
+        for bucket in HISTOGRAM_BUCKETS:
+            if size <= bucket:
+                self.batch_size_histogram[bucket] += 1
+                return
+
+    def metrics(self):
+        return {
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0,
+            "batch_size_histogram": {f"<={bucket:g}": count for bucket, count in self.batch_size_histogram.items()},
+        }
@@ -1,17 +1,58 @@
-from fastapi import Body, FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from postgres_db import PostgresClient
+from fastapi.responses import JSONResponse, StreamingResponse
+from postgres_db import DEFAULT_REVIEW_FIELDS, REVIEWS_MAX_LIMIT, REVIEWS_PAGE_SIZE, WORDCLOUD_MAX_LIMIT, AsyncPostgresClient, parse_review_fields
+from db_pool import create_pool, get_pool_stats
+from migrations import migrate
 from dotenv import load_dotenv
 import os
-from datetime import datetime
-from sentModel import sentModel
+import csv
+import io
+import json
+import time
+from datetime import date, datetime
+from typing import List, Optional
+from sentiment_backend import create_sentiment_backend
+from sentiment_cache import CachedSentimentBackend, SentimentCache
+from gazetteer import get_gazetteer
+from airline_stats import AirlineStatsRefresher
+from response_cache import GLOBAL_SCOPE, CacheInvalidationListener, ResponseCache, etag_matches
 import numpy as np
 from sklearn.linear_model import LinearRegression
 
 load_dotenv()
 POSTGRES_DSN = os.getenv("POSTGRES_DSN")
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MIGRATE_ON_STARTUP:
+        await asyncio.to_thread(migrate, POSTGRES_DSN)
+    pool = create_pool(POSTGRES_DSN)
+    await pool.open()
+    app.state.pool = pool
+    app.state.gazetteer = await asyncio.to_thread(get_gazetteer)
+    app.state.sentiment = CachedSentimentBackend(
+        create_sentiment_backend(),
+        SentimentCache(AsyncPostgresClient(pool))
+    )
+    await app.state.sentiment.start()
+    app.state.response_cache = ResponseCache()
+    app.state.cache_invalidation = CacheInvalidationListener(POSTGRES_DSN, app.state.response_cache)
+    await app.state.cache_invalidation.start()
+    app.state.airline_stats = AirlineStatsRefresher(AsyncPostgresClient(pool))
+    await app.state.airline_stats.start()
+    try:
+        yield
+    finally:
+        await app.state.airline_stats.stop()
+        await app.state.cache_invalidation.stop()
+        await app.state.sentiment.stop()
+        await pool.close()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -22,131 +63,414 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def get_db(request: Request):
+    return AsyncPostgresClient(request.app.state.pool)
+
+def get_sentiment(request: Request):
+    return request.app.state.sentiment
+
+async def cached_response(request: Request, key, scopes, compute):
+    """Serve the body from compute() through the response cache, answering a matching If-None-Match with 304"""
+    entry = await request.app.state.response_cache.get_or_compute(key, scopes, compute)
+    if entry is None:
+        return None
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(entry.body, headers=headers)
+
 @app.get("/")
 async def welcome():
     return {"message": "Welcome to the Airline Review API 👋"}
 
+@app.get("/metrics/db-pool")
+async def get_db_pool_metrics(request: Request):
+    """Get connection pool usage and wait statistics"""
+    return {"status": "success", "data": get_pool_stats(request.app.state.pool)}
+
+@app.get("/metrics/sentiment")
+async def get_sentiment_metrics(request: Request):
+    """Get sentiment backend, model, batching and cache statistics"""
+    return {"status": "success", "data": await request.app.state.sentiment.metrics()}
+
+@app.get("/metrics/gazetteer")
+async def get_gazetteer_metrics(request: Request):
+    """Get world cities index size and reload statistics"""
+    return {"status": "success", "data": request.app.state.gazetteer.metrics()}
+
+@app.get("/metrics/airline-stats")
+async def get_airline_stats_metrics(request: Request):
+    """Get airline statistics refresh counters"""
+    return {"status": "success", "data": request.app.state.airline_stats.metrics()}
+
+@app.get("/metrics/response-cache")
+async def get_response_cache_metrics(request: Request):
+    """Get response cache hit, miss and invalidation statistics"""
+    data = request.app.state.response_cache.metrics()
+    data["notifications"] = request.app.state.cache_invalidation.notifications
+    return {"status": "success", "data": data}
+
 @app.get("/airlines/top-rated")
-async def get_top_rated_airlines():
+async def get_top_rated_airlines(request: Request, db: AsyncPostgresClient = Depends(get_db)):
     """Get top rated airlines"""
-    db = PostgresClient(POSTGRES_DSN)
     try:
-        airlines = db.get_top_rated_airlines()
-        return {"status": "success", "data": airlines}
+        async def compute():
+            airlines = await db.get_top_rated_airlines()
+            return {"status": "success", "data": airlines}
+
+        return await cached_response(request, ("top-rated",), {GLOBAL_SCOPE}, compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
-@app.get("/airlines/{airline_name}/key-data")
-async def get_airline_key_data(airline_name: str):
-    """Get key data for a specific airline"""
-    db = PostgresClient(POSTGRES_DSN)
+@app.get("/airlines/rating-distribution")
+async def compare_rating_distributions(airlines: List[str] = Query(..., min_length=1), db: AsyncPostgresClient = Depends(get_db)):
+    """Get rating distributions for several airlines in one query, for comparison views"""
     try:
-        data = db.get_airline_key_data(airline_name)
-        
-        if not data:
+        distributions = await db.get_rating_distributions(airlines)
+
+        if not distributions:
             raise HTTPException(status_code=404, detail="Airline not found")
-        
-        return {"status": "success", "data": data}
+
+        return {
+            "status": "success",
+            "data": {name: distribution["fractions"] for name, distribution in distributions.items()},
+            "counts": {name: distribution["counts"] for name, distribution in distributions.items()}
+        }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
-@app.get("/airlines/{airline_name}/rating-distribution")
-async def get_rating_distribution(airline_name: str):
-    """Get rating distribution for a specific airline"""
-    db = PostgresClient(POSTGRES_DSN)
+async def key_data_body(request: Request, db: AsyncPostgresClient, airline_name: str):
+    data = await db.get_airline_key_data(airline_name)
+    return {"status": "success", "data": data} if data else None
+
+async def rating_distribution_body(request: Request, db: AsyncPostgresClient, airline_name: str):
+    distribution = await db.get_rating_distribution(airline_name)
+    if not distribution:
+        return None
+    return {"status": "success", "data": distribution["fractions"], "counts": distribution["counts"]}
+
+async def sub_item_scoring_body(request: Request, db: AsyncPostgresClient, airline_name: str):
+    data = await db.get_sub_item_scoring(airline_name)
+    return {"status": "success", "data": data} if data else None
+
+async def city_distribution_body(request: Request, db: AsyncPostgresClient, airline_name: str):
+    gazetteer = request.app.state.gazetteer
+    if gazetteer.needs_reload():
+        await asyncio.to_thread(gazetteer.try_load)
+    data = await db.get_airline_city_distribution(airline_name, gazetteer)
+    return {"status": "success", "data": data}
+
+async def info_body(request: Request, db: AsyncPostgresClient, airline_name: str):
+    data = await db.get_airline_info(airline_name)
+    return {"status": "success", "data": data} if data else None
+
+FEATURE_NAMES = [
+    'seatComfort', 'cabinStaffService', 'foodBeverages',
+    'inflightEntertainment', 'groundService', 'wifiConnectivity', 'valueForMoney'
+]
+
+def fit_feature_importance(reviews):
+    """Linear regression coefficients of the overall score on each sub-score"""
+    X = np.array([[review.get(name, 0) or 0 for name in FEATURE_NAMES] for review in reviews])
+    y = np.array([review.get('score', 0) or 0 for review in reviews])
+
+    model = LinearRegression()
+    model.fit(X, y)
+
+    return {
+        FEATURE_NAMES[i]: float(model.coef_[i])
+        for i in range(len(FEATURE_NAMES))
+    }
+
+async def feature_importance_body(request: Request, db: AsyncPostgresClient, airline_name: str):
+    reviews = await db.get_reviews_for_regression(airline_name)
+    if not reviews or len(reviews) < 10:
+        return None
+    coefficients = await asyncio.to_thread(fit_feature_importance, reviews)
+    return {"status": "success", "data": coefficients}
+
+# panel -> (body builder, 404 detail, cache scope). Scope "airline" entries are
+# evicted when that airline changes, "global" ones when any airline does and
+# None panels are computed on every request.
+DASHBOARD_PANELS = {
+    "info": (info_body, "Airline not found", "airline"),
+    "key-data": (key_data_body, "Airline not found", "global"),
+    "rating-distribution": (rating_distribution_body, "Airline not found", "airline"),
+    "sub-item-scoring": (sub_item_scoring_body, "Airline not found", "global"),
+    "city-distribution": (city_distribution_body, "Airline not found", "airline"),
+    "feature-importance": (feature_importance_body, "Not enough reviews for regression analysis", None),
+}
+
+def panel_cache(request: Request, panel: str, airline_id):
+    """(cache key, scopes) of a panel, or None when it is not cached"""
+    scope = DASHBOARD_PANELS[panel][2]
+    if scope is None or airline_id is None:
+        return None
+
+    key = (panel, airline_id)
+    if panel == "city-distribution":
+        # A reloaded gazetteer changes loaded_at and so starts a fresh key.
+        key = (panel, airline_id, request.app.state.gazetteer.loaded_at)
+    scopes = {airline_id, GLOBAL_SCOPE} if scope == "global" else {airline_id}
+    return key, scopes
+
+async def panel_body(request: Request, db: AsyncPostgresClient, panel: str, airline_name: str, airline_id):
+    """Build one panel's response body, through the response cache when the panel is cacheable"""
+    build = DASHBOARD_PANELS[panel][0]
+    cache = panel_cache(request, panel, airline_id)
+    if cache is None:
+        return await build(request, db, airline_name)
+
+    entry = await request.app.state.response_cache.get_or_compute(*cache, lambda: build(request, db, airline_name))
+    return entry.body if entry else None
+
+async def panel_response(request: Request, db: AsyncPostgresClient, panel: str, airline_name: str):
+    """Serve a single panel endpoint, answering a matching If-None-Match with 304 for cached panels"""
     try:
-        data = db.get_rating_distribution(airline_name)
+        build, not_found, _ = DASHBOARD_PANELS[panel]
+        airline_id = await db.get_airline_id(airline_name)
+        if airline_id is None and panel != "city-distribution":
+            raise HTTPException(status_code=404, detail=not_found)
+
+        cache = panel_cache(request, panel, airline_id)
+        if cache is None:
+            response = await build(request, db, airline_name)
+        else:
+            response = await cached_response(request, *cache, lambda: build(request, db, airline_name))
         
-        if not data:
-            raise HTTPException(status_code=404, detail="Airline not found")
+        if response is None:
+            raise HTTPException(status_code=404, detail=not_found)
         
-        return {"status": "success", "data": data}
+        return response
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+
+@app.get("/airlines/{airline_name}/key-data")
+async def get_airline_key_data(airline_name: str, request: Request, db: AsyncPostgresClient = Depends(get_db)):
+    """Get key data for a specific airline"""
+    return await panel_response(request, db, "key-data", airline_name)
+
+@app.get("/airlines/{airline_name}/rating-distribution")
+async def get_rating_distribution(airline_name: str, request: Request, db: AsyncPostgresClient = Depends(get_db)):
+    """Get rating distribution for a specific airline"""
+    return await panel_response(request, db, "rating-distribution", airline_name)
 
 @app.get("/airlines/{airline_name}/sub-item-scoring")
-async def get_sub_item_scoring(airline_name: str):
+async def get_sub_item_scoring(airline_name: str, request: Request, db: AsyncPostgresClient = Depends(get_db)):
     """Get sub-item scoring comparison for a specific airline"""
-    db = PostgresClient(POSTGRES_DSN)
+    return await panel_response(request, db, "sub-item-scoring", airline_name)
+
+@app.get("/airlines/{airline_name}/city-distribution")
+async def get_airline_city_distribution(airline_name: str, request: Request, db: AsyncPostgresClient = Depends(get_db)):
+    """Get city distribution for airline routes"""
+    return await panel_response(request, db, "city-distribution", airline_name)
+
+@app.get("/airlines/{airline_name}/info")
+async def get_airline_info(airline_name: str, request: Request, db: AsyncPostgresClient = Depends(get_db)):
+    """Get airline name and image"""
+    return await panel_response(request, db, "info", airline_name)
+
+@app.get("/airlines/{airline_name}/feature-importance")
+async def get_airline_feature_importance(airline_name: str, request: Request, db: AsyncPostgresClient = Depends(get_db)):
+    """Get feature importance from linear regression on airline reviews"""
+    return await panel_response(request, db, "feature-importance", airline_name)
+
+@app.get("/airlines/{airline_name}/dashboard")
+async def get_airline_dashboard(
+    airline_name: str,
+    request: Request,
+    panels: Optional[str] = None,
+    db: AsyncPostgresClient = Depends(get_db)
+):
+    """Get several dashboard panels for an airline in one round trip; panels run concurrently on pooled connections"""
+    selected = [panel.strip() for panel in panels.split(",") if panel.strip()] if panels else list(DASHBOARD_PANELS)
+    unknown = [panel for panel in selected if panel not in DASHBOARD_PANELS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown panels: {', '.join(unknown)}")
+
     try:
-        data = db.get_sub_item_scoring(airline_name)
-        
-        if not data:
-            raise HTTPException(status_code=404, detail="Airline not found")
-        
-        return {"status": "success", "data": data}
-    except HTTPException:
-        raise
+        airline_id = await db.get_airline_id(airline_name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+    if airline_id is None:
+        raise HTTPException(status_code=404, detail="Airline not found")
 
-@app.get("/airlines/{airline_name}/city-distribution")
-async def get_airline_city_distribution(airline_name: str, cities_csv: str = "worldcities.csv"):
-    """Get city distribution for airline routes"""
-    db = PostgresClient(POSTGRES_DSN)
+    async def run(panel):
+        start = time.perf_counter()
+        try:
+            body = await panel_body(request, db, panel, airline_name, airline_id)
+            if body is None:
+                result = {"error": DASHBOARD_PANELS[panel][1]}
+            else:
+                result = {key: value for key, value in body.items() if key != "status"}
+        except Exception as e:
+            result = {"error": str(e)}
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return panel, result
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run(panel) for panel in dict.fromkeys(selected)))
+
+    return {
+        "status": "success",
+        "data": dict(results),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+def review_filter_params(
+    keyword: Optional[str] = None,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    seat_type: Optional[str] = None,
+    traveller_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    return {
+        "keyword": keyword,
+        "min_score": min_score,
+        "max_score": max_score,
+        "seat_type": seat_type,
+        "traveller_type": traveller_type,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+
+@app.get("/airlines/{airline_name}/reviews")
+async def get_airline_reviews(
+    airline_name: str,
+    limit: Optional[int] = Query(None, ge=1, le=REVIEWS_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: dict = Depends(review_filter_params),
+    db: AsyncPostgresClient = Depends(get_db)
+):
+    """Get airline reviews, newest first, paginated when limit or cursor is given"""
+    if limit is None and cursor:
+        limit = REVIEWS_PAGE_SIZE
     try:
-        data = db.get_airline_city_distribution(airline_name, cities_csv)
-        return {"status": "success", "data": data}
+        data, next_cursor = await db.get_reviews_by_airline(
+            airline_name,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+            **filters
+        )
+        return {"status": "success", "data": data, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
-@app.get("/airlines/{airline_name}/info")
-async def get_airline_info(airline_name: str):
-    """Get airline name and image"""
-    db = PostgresClient(POSTGRES_DSN)
+@app.get("/reviews/search")
+async def search_reviews(
+    q: str = Query(..., min_length=1),
+    airline: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=REVIEWS_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    filters: dict = Depends(review_filter_params),
+    db: AsyncPostgresClient = Depends(get_db)
+):
+    """Full-text search over review titles and content, best matches first, with highlighted snippets"""
     try:
-        data = db.get_airline_info(airline_name)
-        
-        if not data:
-            raise HTTPException(status_code=404, detail="Airline not found")
-        
-        return {"status": "success", "data": data}
-    except HTTPException:
-        raise
+        data, next_cursor = await db.search_reviews(q, airline_name=airline, limit=limit, cursor=cursor, **filters)
+        return {"status": "success", "data": data, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
-@app.get("/airlines/{airline_name}/reviews")
-async def get_airline_reviews(airline_name: str):
-    """Get airline reviews with optional keyword filtering in content"""
-    db = PostgresClient(POSTGRES_DSN)
+EXPORT_FLUSH_ROWS = 500
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+async def export_chunks(rows, fields, export_format):
+    """Encode streamed review dicts as NDJSON or CSV, flushing every EXPORT_FLUSH_ROWS rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields) if export_format == "csv" else None
+    if writer:
+        writer.writeheader()
+
+    count = 0
+    async for row in rows:
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        count += 1
+        if count % EXPORT_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_response(db, fields, export_format, filename, airline_id=None, **filters):
+    return StreamingResponse(
+        export_chunks(db.stream_reviews(fields, airline_id=airline_id, **filters), fields, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+@app.get("/airlines/{airline_name}/reviews/export")
+async def export_airline_reviews(
+    airline_name: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = None,
+    filters: dict = Depends(review_filter_params),
+    db: AsyncPostgresClient = Depends(get_db)
+):
+    """Stream every matching review of an airline as NDJSON or CSV"""
     try:
-        data = db.get_reviews_by_airline(airline_name)
-        return {"status": "success", "data": data}
+        fields = parse_review_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        airline_id = await db.get_airline_id(airline_name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+    if airline_id is None:
+        raise HTTPException(status_code=404, detail="Airline not found")
+
+    filename = f"{airline_name.replace(' ', '_')}_reviews"
+    return export_response(db, fields, format, filename, airline_id=airline_id, **filters)
+
+@app.get("/reviews/export")
+async def export_all_reviews(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = None,
+    filters: dict = Depends(review_filter_params),
+    db: AsyncPostgresClient = Depends(get_db)
+):
+    """Stream matching reviews of every airline as NDJSON or CSV"""
+    try:
+        fields = parse_review_fields(fields, default=["airlineName"] + DEFAULT_REVIEW_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return export_response(db, fields, format, "reviews", **filters)
 
 @app.post("/sentiment-tool/submit")
-async def submit_sentiment_text(text: str = Body(...)):
+async def submit_sentiment_text(text: str = Body(...), db: AsyncPostgresClient = Depends(get_db), sentiment = Depends(get_sentiment)):
     """Submit text for sentiment analysis"""
-    db = PostgresClient(POSTGRES_DSN)
     try:
         if not text:
             raise HTTPException(status_code=404, detail="Text field is required")
         
-        sm = sentModel()
-        score, sent_lab, pos_dict, neg_dict = sm.run_score(text, num_features=50)
+        score, sent_lab, pos_dict, neg_dict = await sentiment.run_score(text, num_features=50)
         submit_time = datetime.utcnow()
         
-        db.insert_sentiment(text, submit_time, sent_lab, pos_dict, neg_dict)
+        await db.insert_sentiment(text, submit_time, sent_lab, pos_dict, neg_dict)
         
         return {
             "status": "success",
@@ -162,39 +486,55 @@ async def submit_sentiment_text(text: str = Body(...)):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+
+async def sample_wordcloud(db, sentiment, airline_name, limit=10):
+    reviews = await db.get_random_reviews(airline_name, limit=limit)
+    
+    if not reviews:
+        return None
+    
+    combined_pos_dict = {}
+    combined_neg_dict = {}
+    
+    results = await asyncio.gather(*(
+        sentiment.run_score(review.get('content', ''))
+        for review in reviews
+    ))
+    
+    for _, _, pos_dict, neg_dict in results:
+        for word, metrics in pos_dict.items():
+            if word in combined_pos_dict:
+                combined_pos_dict[word]['score'] += metrics['score']
+            else:
+                combined_pos_dict[word] = {'score': metrics['score']}
+        
+        for word, metrics in neg_dict.items():
+            if word in combined_neg_dict:
+                combined_neg_dict[word]['score'] += metrics['score']
+            else:
+                combined_neg_dict[word] = {'score': metrics['score']}
+    
+    return combined_pos_dict, combined_neg_dict, len(reviews)
 
 @app.get("/airlines/{airline_name}/wordcloud-data")
-async def get_airline_wordcloud_data(airline_name: str):
-    """Get wordcloud data from random airline reviews"""
-    db = PostgresClient(POSTGRES_DSN)
+async def get_airline_wordcloud_data(
+    airline_name: str,
+    sample: bool = False,
+    limit: int = Query(50, ge=1, le=WORDCLOUD_MAX_LIMIT),
+    db: AsyncPostgresClient = Depends(get_db),
+    sentiment = Depends(get_sentiment)
+):
+    """Get wordcloud data from precomputed attributions, or live LIME over random reviews with sample=true"""
     try:
-        reviews = db.get_random_reviews(airline_name, limit=10)
-        
-        if not reviews:
-            raise HTTPException(status_code=404, detail="No reviews found for this airline")
+        if sample:
+            result = await sample_wordcloud(db, sentiment, airline_name)
+            if not result:
+                raise HTTPException(status_code=404, detail="No reviews found for this airline")
+        else:
+            # Airlines not scored yet get an empty cloud; run batch_score.py to fill it.
+            result = await db.get_wordcloud_aggregate(airline_name, limit=limit) or ({}, {}, 0)
         
-        sm = sentModel()
-        combined_pos_dict = {}
-        combined_neg_dict = {}
-        
-        for review in reviews:
-            content = review.get('content', '')
-                
-            _, _, pos_dict, neg_dict = sm.run_score(content)
-            
-            for word, metrics in pos_dict.items():
-                if word in combined_pos_dict:
-                    combined_pos_dict[word]['score'] += metrics['score']
-                else:
-                    combined_pos_dict[word] = {'score': metrics['score']}
-            
-            for word, metrics in neg_dict.items():
-                if word in combined_neg_dict:
-                    combined_neg_dict[word]['score'] += metrics['score']
-                else:
-                    combined_neg_dict[word] = {'score': metrics['score']}
+        combined_pos_dict, combined_neg_dict, review_count = result
         
         pos_score = sum(abs(m['score']) for m in combined_pos_dict.values())
         neg_score = sum(abs(m['score']) for m in combined_neg_dict.values())
@@ -214,64 +554,10 @@ async def get_airline_wordcloud_data(airline_name: str):
                 "pos_count": pos_count,
                 "neg_count": neg_count,
                 "overall_count": overall_count,
-                "review_count": len(reviews)
+                "review_count": review_count
             }
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
-
-@app.get("/airlines/{airline_name}/feature-importance")
-async def get_airline_feature_importance(airline_name: str):
-    """Get feature importance from linear regression on airline reviews"""
-    db = PostgresClient(POSTGRES_DSN)
-    try:
-        reviews = db.get_reviews_for_regression(airline_name)
-        
-        if not reviews or len(reviews) < 10:
-            raise HTTPException(status_code=404, detail="Not enough reviews for regression analysis")
-        
-        X = []
-        y = []
-        feature_names = [
-            'seatComfort', 'cabinStaffService', 'foodBeverages',
-            'inflightEntertainment', 'groundService', 'wifiConnectivity', 'valueForMoney'
-        ]
-        
-        for review in reviews:
-            features = [
-                review.get('seatComfort', 0) or 0,
-                review.get('cabinStaffService', 0) or 0,
-                review.get('foodBeverages', 0) or 0,
-                review.get('inflightEntertainment', 0) or 0,
-                review.get('groundService', 0) or 0,
-                review.get('wifiConnectivity', 0) or 0,
-                review.get('valueForMoney', 0) or 0
-            ]
-            X.append(features)
-            y.append(review.get('score', 0) or 0)
-        
-        X = np.array(X)
-        y = np.array(y)
-        
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        coefficients = {
-            feature_names[i]: float(model.coef_[i])
-            for i in range(len(feature_names))
-        }
-        
-        return {
-            "status": "success",
-            "data": coefficients
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,463 @@
+"""Versioned schema migrations for the airline review database.
+
+Applied migrations are recorded in schema_migrations, so ``migrate`` is safe
+to rerun. Run it as a deploy step before starting the API; set
+MIGRATE_ON_STARTUP=1 to have each API process run it instead.
+``check-plans`` EXPLAINs the hot query shapes with sequential scans disabled
+and fails if any of them cannot be served from an index.
+
+    cd backend
+    python migrations.py migrate
+    python migrations.py check-plans
+"""
+import argparse
+import json
+import sys
+
+import psycopg
+
+from postgres_db import (
+    AIRLINE_CHANGED_CHANNEL, AIRLINE_ID_SQL, AIRLINE_INFO_SQL, AIRLINE_KEY_DATA_SQL,
+    DEFAULT_REVIEW_FIELDS, POSTGRES_DSN, RATING_DISTRIBUTION_SQL, REGRESSION_REVIEWS_SQL,
+    ROUTE_COUNTS_SQL, SUB_ITEM_SCORING_SQL, TOP_RATED_AIRLINES_SQL, build_review_search_query, build_reviews_page_query,
+)
+
+MIGRATIONS = [
+    (1, "base_tables", """
+        CREATE TABLE IF NOT EXISTS airlines (
+            name TEXT PRIMARY KEY,
+            image TEXT,
+            reviewCount INTEGER,
+            calculatedReviewCount INTEGER,
+            score DOUBLE PRECISION,
+            seatComfort DOUBLE PRECISION,
+            cabinStaffService DOUBLE PRECISION,
+            foodBeverages DOUBLE PRECISION,
+            inflightEntertainment DOUBLE PRECISION,
+            groundService DOUBLE PRECISION,
+            wifiConnectivity DOUBLE PRECISION,
+            valueForMoney DOUBLE PRECISION
+        );
+
+        CREATE TABLE IF NOT EXISTS reviews (
+            reviewId TEXT PRIMARY KEY,
+            userName TEXT,
+            airlineName TEXT NOT NULL,
+            title TEXT,
+            score INTEGER,
+            content TEXT,
+            verifiedType TEXT,
+            country TEXT,
+            dateReview DATE,
+            aircraft TEXT,
+            typeOfTraveller TEXT,
+            seatType TEXT,
+            route TEXT,
+            dateFlown TEXT,
+            seatComfort INTEGER,
+            cabinStaffService INTEGER,
+            foodBeverages INTEGER,
+            inflightEntertainment INTEGER,
+            groundService INTEGER,
+            wifiConnectivity INTEGER,
+            valueForMoney INTEGER,
+            recommended TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS sentiment (
+            id SERIAL PRIMARY KEY,
+            text TEXT NOT NULL,
+            submit_time TIMESTAMP NOT NULL,
+            sent_lab TEXT NOT NULL,
+            pos_dict JSONB NOT NULL,
+            neg_dict JSONB NOT NULL
+        );
+    """),
+    (2, "airline_ids", """
+        ALTER TABLE airlines ADD COLUMN airline_id INTEGER GENERATED BY DEFAULT AS IDENTITY;
+        ALTER TABLE airlines ADD CONSTRAINT airlines_airline_id_key UNIQUE (airline_id);
+
+        -- Names differing only in case ("EVA Air" / "Eva Air") would break the
+        -- unique index below; keep the row with the most reviews and point its
+        -- reviews at the surviving spelling.
+        DELETE FROM airlines a
+        USING airlines b
+        WHERE LOWER(a.name) = LOWER(b.name)
+        AND (COALESCE(a.reviewCount, -1), a.name) < (COALESCE(b.reviewCount, -1), b.name);
+
+        CREATE UNIQUE INDEX airlines_name_lower_idx ON airlines (LOWER(name));
+
+        UPDATE reviews r
+        SET airlineName = a.name
+        FROM airlines a
+        WHERE LOWER(a.name) = LOWER(r.airlineName)
+        AND r.airlineName != a.name;
+
+        ALTER TABLE reviews ADD COLUMN airline_id INTEGER REFERENCES airlines (airline_id);
+
+        UPDATE reviews r
+        SET airline_id = a.airline_id
+        FROM airlines a
+        WHERE LOWER(a.name) = LOWER(r.airlineName);
+
+        -- Reviews carry only the airline name; resolve the key on the way in.
+        CREATE FUNCTION set_review_airline_id() RETURNS trigger AS $$
+        BEGIN
+            SELECT airline_id INTO NEW.airline_id
+            FROM airlines
+            WHERE LOWER(name) = LOWER(NEW.airlineName);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER reviews_set_airline_id
+        BEFORE INSERT OR UPDATE OF airlineName ON reviews
+        FOR EACH ROW EXECUTE FUNCTION set_review_airline_id();
+
+        -- Reviews scraped before their airline row existed are linked once it arrives.
+        CREATE FUNCTION link_orphan_reviews() RETURNS trigger AS $$
+        BEGIN
+            UPDATE reviews
+            SET airline_id = NEW.airline_id
+            WHERE airline_id IS NULL
+            AND LOWER(airlineName) = LOWER(NEW.name);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER airlines_link_orphan_reviews
+        AFTER INSERT ON airlines
+        FOR EACH ROW EXECUTE FUNCTION link_orphan_reviews();
+    """),
+    (3, "hot_query_indexes", """
+        CREATE INDEX reviews_airline_date_idx ON reviews (airline_id, dateReview DESC, reviewId DESC);
+        CREATE INDEX reviews_airline_route_idx ON reviews (airline_id, route);
+        CREATE INDEX reviews_airline_scores_idx ON reviews (airline_id) INCLUDE (
+            score, seatComfort, cabinStaffService, foodBeverages,
+            inflightEntertainment, groundService, wifiConnectivity, valueForMoney
+        );
+        CREATE INDEX reviews_airline_name_lower_idx ON reviews (LOWER(airlineName));
+        CREATE INDEX airlines_score_idx ON airlines (score DESC);
+    """),
+    (4, "sentiment_tables", """
+        CREATE TABLE IF NOT EXISTS sentiment_cache (
+            cache_key TEXT PRIMARY KEY,
+            model_name TEXT NOT NULL,
+            score DOUBLE PRECISION NOT NULL,
+            sent_lab TEXT NOT NULL,
+            pos_dict JSONB NOT NULL,
+            neg_dict JSONB NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+
+        CREATE TABLE IF NOT EXISTS review_sentiment (
+            reviewId TEXT PRIMARY KEY,
+            airlineName TEXT NOT NULL,
+            model_name TEXT NOT NULL,
+            sent_lab TEXT NOT NULL,
+            score DOUBLE PRECISION NOT NULL,
+            pos_dict JSONB NOT NULL,
+            neg_dict JSONB NOT NULL,
+            scored_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+
+        CREATE TABLE IF NOT EXISTS airline_wordcloud (
+            airline_key TEXT NOT NULL,
+            polarity SMALLINT NOT NULL,
+            token TEXT NOT NULL,
+            score DOUBLE PRECISION NOT NULL,
+            PRIMARY KEY (airline_key, polarity, token)
+        );
+
+        CREATE TABLE IF NOT EXISTS airline_wordcloud_state (
+            airline_key TEXT PRIMARY KEY,
+            review_count INTEGER NOT NULL,
+            last_review_id BIGINT NOT NULL
+        );
+    """),
+    (5, "reviews_keyset_index", """
+        DROP INDEX IF EXISTS reviews_airline_date_idx;
+        CREATE INDEX reviews_airline_date_idx ON reviews (airline_id, dateReview DESC NULLS LAST, reviewId DESC);
+    """),
+    (6, "reviews_full_text_search", """
+        -- Titles weigh more than body text in ts_rank.
+        ALTER TABLE reviews ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+            setweight(to_tsvector('english', COALESCE(content, '')), 'B')
+        ) STORED;
+        CREATE INDEX reviews_search_idx ON reviews USING GIN (search_vector);
+    """),
+    (7, "airline_stats", """
+        CREATE TABLE airline_stats (
+            airline_id INTEGER PRIMARY KEY REFERENCES airlines (airline_id) ON DELETE CASCADE,
+            review_count INTEGER NOT NULL,
+            score DOUBLE PRECISION,
+            seatComfort DOUBLE PRECISION,
+            cabinStaffService DOUBLE PRECISION,
+            foodBeverages DOUBLE PRECISION,
+            inflightEntertainment DOUBLE PRECISION,
+            groundService DOUBLE PRECISION,
+            wifiConnectivity DOUBLE PRECISION,
+            valueForMoney DOUBLE PRECISION,
+            preferred_seat TEXT,
+            preferred_route TEXT,
+            earliest_review DATE,
+            latest_review DATE,
+            earliest_flight DATE,
+            latest_flight DATE,
+            refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+
+        -- Airlines whose reviews changed since their stats were last computed.
+        CREATE TABLE airline_stats_dirty (
+            airline_id INTEGER PRIMARY KEY,
+            marked_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+
+        -- Statement-level, so a COPY or multi-row insert marks each airline once.
+        CREATE FUNCTION mark_airline_stats_dirty() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO airline_stats_dirty (airline_id)
+                SELECT DISTINCT airline_id FROM new_rows WHERE airline_id IS NOT NULL
+                ON CONFLICT DO NOTHING;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO airline_stats_dirty (airline_id)
+                SELECT DISTINCT airline_id FROM old_rows WHERE airline_id IS NOT NULL
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER reviews_stats_dirty_insert
+        AFTER INSERT ON reviews
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION mark_airline_stats_dirty();
+
+        CREATE TRIGGER reviews_stats_dirty_update
+        AFTER UPDATE ON reviews
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION mark_airline_stats_dirty();
+
+        CREATE TRIGGER reviews_stats_dirty_delete
+        AFTER DELETE ON reviews
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION mark_airline_stats_dirty();
+
+        INSERT INTO airline_stats_dirty (airline_id)
+        SELECT airline_id FROM airlines;
+    """),
+    (8, "airline_rankings", """
+        CREATE TABLE airline_rankings (
+            airline_id INTEGER PRIMARY KEY REFERENCES airlines (airline_id) ON DELETE CASCADE,
+            score_rank INTEGER
+        );
+        CREATE INDEX airline_rankings_rank_idx ON airline_rankings (score_rank);
+
+        -- Exactly one row of figures across all airlines.
+        CREATE TABLE airline_global_stats (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            total_airlines INTEGER NOT NULL,
+            median_review_count DOUBLE PRECISION,
+            seatComfort DOUBLE PRECISION,
+            cabinStaffService DOUBLE PRECISION,
+            foodBeverages DOUBLE PRECISION,
+            inflightEntertainment DOUBLE PRECISION,
+            groundService DOUBLE PRECISION,
+            wifiConnectivity DOUBLE PRECISION,
+            valueForMoney DOUBLE PRECISION,
+            refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+
+        -- Force a refresh so the snapshot is built on first start.
+        INSERT INTO airline_stats_dirty (airline_id)
+        SELECT airline_id FROM airlines
+        ON CONFLICT DO NOTHING;
+    """),
+    (9, "wordcloud_by_airline_id", """
+        -- Built by earlier versions of migration 4; the reviewId primary key already indexes it as stored.
+        DROP INDEX IF EXISTS review_sentiment_review_id_num_idx;
+        ALTER TABLE review_sentiment ADD COLUMN aggregated BOOLEAN NOT NULL DEFAULT FALSE;
+        CREATE INDEX review_sentiment_unaggregated_idx ON review_sentiment (reviewId) WHERE NOT aggregated;
+
+        -- Rebuilt from review_sentiment on the next refresh, since every row starts unaggregated.
+        DROP TABLE airline_wordcloud;
+        DROP TABLE airline_wordcloud_state;
+
+        CREATE TABLE airline_wordcloud (
+            airline_id INTEGER NOT NULL REFERENCES airlines (airline_id) ON DELETE CASCADE,
+            polarity SMALLINT NOT NULL,
+            token TEXT NOT NULL,
+            score DOUBLE PRECISION NOT NULL,
+            PRIMARY KEY (airline_id, polarity, token)
+        );
+
+        CREATE TABLE airline_wordcloud_state (
+            airline_id INTEGER PRIMARY KEY REFERENCES airlines (airline_id) ON DELETE CASCADE,
+            review_count INTEGER NOT NULL
+        );
+    """),
+    (10, "notify_airline_changed", f"""
+        -- The info panel shows name and image; tell every API process when
+        -- either changes, whichever client wrote it.
+        CREATE FUNCTION notify_airline_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{AIRLINE_CHANGED_CHANNEL}', NEW.airline_id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER airlines_notify_changed
+        AFTER UPDATE OF name, image ON airlines
+        FOR EACH ROW
+        WHEN (OLD.name IS DISTINCT FROM NEW.name OR OLD.image IS DISTINCT FROM NEW.image)
+        EXECUTE FUNCTION notify_airline_changed();
+    """),
+    (11, "review_sentiment_failures", """
+        -- Reviews batch_score.py could not score; skipped until --retry-failed.
+        CREATE TABLE review_sentiment_failures (
+            reviewId TEXT PRIMARY KEY,
+            error TEXT NOT NULL,
+            failed_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+    """),
+    (12, "airline_stats_dirty_generation", """
+        -- Every mark takes a new generation, so a refresh only clears the marks it saw.
+        CREATE SEQUENCE airline_stats_dirty_generation_seq;
+        ALTER TABLE airline_stats_dirty
+        ADD COLUMN generation BIGINT NOT NULL DEFAULT nextval('airline_stats_dirty_generation_seq');
+
+        CREATE OR REPLACE FUNCTION mark_airline_stats_dirty() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO airline_stats_dirty (airline_id)
+                SELECT DISTINCT airline_id FROM new_rows WHERE airline_id IS NOT NULL
+                ON CONFLICT (airline_id) DO UPDATE
+                SET generation = EXCLUDED.generation, marked_at = EXCLUDED.marked_at;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO airline_stats_dirty (airline_id)
+                SELECT DISTINCT airline_id FROM old_rows WHERE airline_id IS NOT NULL
+                ON CONFLICT (airline_id) DO UPDATE
+                SET generation = EXCLUDED.generation, marked_at = EXCLUDED.marked_at;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """),
+    (13, "airline_crawl_marks", """
+        -- Newest review date of each airline's last completed crawl; the
+        -- incremental spider pages back to it and no further.
+        CREATE TABLE airline_crawl_marks (
+            airline_id INTEGER PRIMARY KEY REFERENCES airlines (airline_id) ON DELETE CASCADE,
+            latest_review DATE NOT NULL,
+            crawled_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+    """),
+]
+
+CREATE_MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+"""
+
+def _by_id(sql):
+    return lambda airline_id, airline_name: (sql, (airline_id,))
+
+# (label, builder) for every hot query shape; builder(airline_id, airline_name) -> (sql, params).
+PLAN_CHECKS = [
+    ("airline id lookup", lambda airline_id, airline_name: (AIRLINE_ID_SQL, (airline_name,))),
+    ("airline info", _by_id(AIRLINE_INFO_SQL)),
+    ("airline key data", _by_id(AIRLINE_KEY_DATA_SQL)),
+    ("sub-item scoring", _by_id(SUB_ITEM_SCORING_SQL)),
+    ("top rated airlines", lambda airline_id, airline_name: (TOP_RATED_AIRLINES_SQL, ())),
+    ("rating distribution", lambda airline_id, airline_name: (RATING_DISTRIBUTION_SQL, ([airline_id],))),
+    ("route counts", _by_id(ROUTE_COUNTS_SQL)),
+    ("reviews page", lambda airline_id, airline_name: build_reviews_page_query(
+        DEFAULT_REVIEW_FIELDS, 100, airline_id=airline_id
+    )),
+    ("regression reviews", _by_id(REGRESSION_REVIEWS_SQL)),
+    ("review search", lambda airline_id, airline_name: build_review_search_query("delayed flight", 20)),
+]
+
+def migrate(dsn=POSTGRES_DSN):
+    """Apply every migration not yet recorded in schema_migrations; return the versions applied."""
+    applied = []
+
+    with psycopg.connect(dsn) as conn:
+        # One transaction under an advisory lock: concurrent callers wait, then find nothing left to apply.
+        conn.execute("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'));")
+        conn.execute(CREATE_MIGRATIONS_TABLE_SQL)
+        done = {row[0] for row in conn.execute("SELECT version FROM schema_migrations;")}
+
+        for version, name, sql in MIGRATIONS:
+            if version in done:
+                continue
+            conn.execute(sql)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                (version, name),
+            )
+            applied.append(version)
+            print(f"Applied migration {version:03d} {name}")
+
+    return applied
+
+def _seq_scanned_tables(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scanned_tables(child))
+    return found
+
+def plan_indexes(plan):
+    found = []
+    if "Index Name" in plan:
+        found.append(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found.extend(plan_indexes(child))
+    return found
+
+def explain(conn, sql, params):
+    """Top plan node of ``sql`` as a dict."""
+    plan = conn.execute("EXPLAIN (FORMAT JSON) " + sql.strip().rstrip(";"), params).fetchone()[0]
+    plan = plan if isinstance(plan, list) else json.loads(plan)
+    return plan[0]["Plan"]
+
+def check_plans(dsn=POSTGRES_DSN):
+    """Return (label, tables) for hot queries that still need a sequential scan of airlines/reviews."""
+    failures = []
+
+    with psycopg.connect(dsn) as conn:
+        conn.execute("SET enable_seqscan = off;")
+        row = conn.execute("SELECT airline_id, name FROM airlines LIMIT 1;").fetchone()
+        if not row:
+            raise RuntimeError("airlines is empty; load data before checking plans")
+        airline_id, airline_name = row
+
+        for label, build in PLAN_CHECKS:
+            plan = explain(conn, *build(airline_id, airline_name))
+            tables = [t for t in _seq_scanned_tables(plan) if t in ("airlines", "reviews")]
+            status = "FAIL" if tables else "ok"
+            print(f"{status:<5} {label}" + (f" (seq scan on {', '.join(tables)})" if tables else ""))
+            if tables:
+                failures.append((label, tables))
+
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["migrate", "check-plans"])
+    parser.add_argument("--dsn", default=POSTGRES_DSN)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate(args.dsn)
+    else:
+        sys.exit(1 if check_plans(args.dsn) else 0)
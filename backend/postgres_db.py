@@ -1,81 +1,882 @@
 from dotenv import load_dotenv, find_dotenv
 import os
 import psycopg
+import base64
 import json
+from datetime import date
 
 load_dotenv(find_dotenv())
 POSTGRES_DSN = os.getenv("POSTGRES_DSN")
 
+REVIEW_REQUIRED_KEYS = [
+    "reviewId", "title", "score", "content", "verifiedType",
+    "airlineName", "userName", "country", "dateReview",
+    "aircraft", "typeOfTraveller", "seatType", "route", "dateFlown",
+    "seatComfort", "cabinStaffService", "foodBeverages",
+    "inflightEntertainment", "groundService", "wifiConnectivity",
+    "valueForMoney", "recommended",
+]
+
+REVIEW_NULLABLE_KEYS = (
+    "score", "seatComfort", "cabinStaffService", "foodBeverages",
+    "inflightEntertainment", "groundService", "wifiConnectivity",
+    "valueForMoney", "dateReview",
+)
+
+INSERT_AIRLINE_SQL = """
+    INSERT INTO airlines (name, image, reviewCount)
+    VALUES (%s, %s, %s)
+    ON CONFLICT ((LOWER(name))) DO UPDATE
+    SET image = EXCLUDED.image,
+        reviewCount = EXCLUDED.reviewCount;
+"""
+
+INSERT_REVIEW_SQL = """
+    INSERT INTO reviews (
+        reviewId, userName, airlineName,
+        title, score, content, verifiedType,
+        country, dateReview,
+        aircraft, typeOfTraveller, seatType, route, dateFlown,
+        seatComfort, cabinStaffService, foodBeverages,
+        inflightEntertainment, groundService, wifiConnectivity,
+        valueForMoney, recommended
+    ) VALUES (
+        %(reviewId)s, %(userName)s, %(airlineName)s,
+        %(title)s, %(score)s, %(content)s, %(verifiedType)s,
+        %(country)s, %(dateReview)s,
+        %(aircraft)s, %(typeOfTraveller)s, %(seatType)s, %(route)s, %(dateFlown)s,
+        %(seatComfort)s, %(cabinStaffService)s, %(foodBeverages)s,
+        %(inflightEntertainment)s, %(groundService)s, %(wifiConnectivity)s,
+        %(valueForMoney)s, %(recommended)s
+    );
+"""
+
+# Airline figures, preferences, rank and global median in one row; all of it
+# is precomputed by the statistics and ranking refresh.
+AIRLINE_KEY_DATA_SQL = """
+    SELECT
+        a.seatComfort,
+        a.cabinStaffService,
+        a.foodBeverages,
+        a.inflightEntertainment,
+        a.groundService,
+        a.wifiConnectivity,
+        a.valueForMoney,
+        a.score,
+        a.calculatedReviewCount,
+        g.median_review_count,
+        k.score_rank,
+        g.total_airlines,
+        s.preferred_seat,
+        s.preferred_route,
+        s.earliest_review,
+        s.latest_review,
+        TO_CHAR(s.earliest_flight, 'YYYY-MM') as earliest_flight,
+        TO_CHAR(s.latest_flight, 'YYYY-MM') as latest_flight
+    FROM airlines a
+    LEFT JOIN airline_stats s ON s.airline_id = a.airline_id
+    LEFT JOIN airline_rankings k ON k.airline_id = a.airline_id
+    LEFT JOIN airline_global_stats g ON TRUE
+    WHERE a.airline_id = %s;
+"""
+
+AIRLINE_ID_SQL = """
+    SELECT airline_id
+    FROM airlines
+    WHERE LOWER(name) = LOWER(%s);
+"""
+
+# (column, label) of every per-review sub-score, in display order.
+SUB_SCORE_COLUMNS = [
+    ("seatComfort", "Seat Comfort"),
+    ("cabinStaffService", "Cabin & Staff Service"),
+    ("foodBeverages", "Food & Beverages"),
+    ("inflightEntertainment", "Inflight Entertainment"),
+    ("groundService", "Ground Service"),
+    ("wifiConnectivity", "Wifi Connectivity"),
+    ("valueForMoney", "Value For Money"),
+]
+RATING_VALUES = range(0, 6)
+
+# dateFlown is free text; only "Month YYYY" values are parsed into dates.
+FLOWN_MONTH_PATTERN = "(january|february|march|april|may|june|july|august|september|october|november|december)"
+
+# One pass over the covering scores index: each review is unnested into
+# (dimension, value) pairs and counted per airline.
+RATING_DISTRIBUTION_SQL = f"""
+    SELECT
+        r.airline_id,
+        s.dimension,
+        s.value,
+        COUNT(*) as review_count
+    FROM reviews r
+    CROSS JOIN LATERAL unnest(
+        ARRAY[{", ".join(f"'{column}'" for column, _ in SUB_SCORE_COLUMNS)}],
+        ARRAY[{", ".join(f"r.{column}" for column, _ in SUB_SCORE_COLUMNS)}]
+    ) AS s(dimension, value)
+    WHERE r.airline_id = ANY(%s)
+    AND s.value BETWEEN {RATING_VALUES[0]} AND {RATING_VALUES[-1]}
+    GROUP BY r.airline_id, s.dimension, s.value;
+"""
+
+# Reads every dirty airline, recomputes its aggregates from reviews and
+# writes them to airline_stats and the airlines summary columns in one
+# statement. Only marks whose generation the statement saw are cleared; an
+# airline marked again while this runs keeps its newer mark for the next
+# refresh. Returns the refreshed airline ids.
+REFRESH_AIRLINE_STATS_SQL = f"""
+    WITH dirty AS (
+        SELECT airline_id, generation FROM airline_stats_dirty
+    ),
+    cleared AS (
+        DELETE FROM airline_stats_dirty m
+        USING dirty d
+        WHERE m.airline_id = d.airline_id AND m.generation <= d.generation
+        RETURNING 1
+    ),
+    computed AS (
+        SELECT
+            r.airline_id,
+            COUNT(*) as review_count,
+            AVG(r.score) as score,
+            {", ".join(f"AVG(r.{column}) as {column}" for column, _ in SUB_SCORE_COLUMNS)},
+            MODE() WITHIN GROUP (ORDER BY r.seatType) FILTER (WHERE r.seatType <> '') as preferred_seat,
+            MODE() WITHIN GROUP (ORDER BY r.route) FILTER (WHERE r.route <> '') as preferred_route,
+            MIN(r.dateReview) as earliest_review,
+            MAX(r.dateReview) as latest_review,
+            MIN(f.flown) as earliest_flight,
+            MAX(f.flown) as latest_flight
+        FROM reviews r
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN r.dateFlown ~* '^{FLOWN_MONTH_PATTERN}\\s+\\d{{4}}$'
+                THEN TO_DATE(r.dateFlown, 'FMMonth YYYY')
+            END as flown
+        ) f
+        WHERE r.airline_id IN (SELECT airline_id FROM dirty)
+        GROUP BY r.airline_id
+    ),
+    stats AS (
+        SELECT d.airline_id, COALESCE(c.review_count, 0) as review_count,
+            c.score, {", ".join(f"c.{column}" for column, _ in SUB_SCORE_COLUMNS)},
+            c.preferred_seat, c.preferred_route, c.earliest_review, c.latest_review,
+            c.earliest_flight, c.latest_flight
+        FROM (SELECT DISTINCT airline_id FROM dirty) d
+        JOIN airlines a ON a.airline_id = d.airline_id
+        LEFT JOIN computed c ON c.airline_id = d.airline_id
+    ),
+    upserted AS (
+        INSERT INTO airline_stats (
+            airline_id, review_count, score, {", ".join(column for column, _ in SUB_SCORE_COLUMNS)},
+            preferred_seat, preferred_route, earliest_review, latest_review,
+            earliest_flight, latest_flight, refreshed_at
+        )
+        SELECT *, NOW() FROM stats
+        ON CONFLICT (airline_id) DO UPDATE
+        SET review_count = EXCLUDED.review_count,
+            score = EXCLUDED.score,
+            {", ".join(f"{column} = EXCLUDED.{column}" for column, _ in SUB_SCORE_COLUMNS)},
+            preferred_seat = EXCLUDED.preferred_seat,
+            preferred_route = EXCLUDED.preferred_route,
+            earliest_review = EXCLUDED.earliest_review,
+            latest_review = EXCLUDED.latest_review,
+            earliest_flight = EXCLUDED.earliest_flight,
+            latest_flight = EXCLUDED.latest_flight,
+            refreshed_at = EXCLUDED.refreshed_at
+        RETURNING 1
+    )
+    UPDATE airlines a
+    SET calculatedReviewCount = s.review_count,
+        score = s.score,
+        {", ".join(f"{column} = s.{column}" for column, _ in SUB_SCORE_COLUMNS)}
+    FROM stats s
+    WHERE a.airline_id = s.airline_id
+    RETURNING a.airline_id;
+"""
+
+# Refreshed airline ids are announced on this channel (delivered on commit)
+# so every API process can drop responses built from the old numbers.
+AIRLINE_STATS_CHANNEL = "airline_stats_refreshed"
+NOTIFY_AIRLINE_STATS_SQL = f"SELECT pg_notify('{AIRLINE_STATS_CHANNEL}', %s);"
+
+# Raised by a trigger on airlines with the airline_id whose name or image changed.
+AIRLINE_CHANGED_CHANNEL = "airline_changed"
+
+# Held for the refresh transaction so only one process refreshes at a time;
+# API workers skip a round when another one holds it, the CLI waits.
+TRY_LOCK_AIRLINE_STATS_SQL = "SELECT pg_try_advisory_xact_lock(hashtext('airline_stats_refresh'));"
+LOCK_AIRLINE_STATS_SQL = "SELECT pg_advisory_xact_lock(hashtext('airline_stats_refresh'));"
+
+MARK_ALL_AIRLINE_STATS_DIRTY_SQL = """
+    INSERT INTO airline_stats_dirty (airline_id)
+    SELECT airline_id FROM airlines
+    ON CONFLICT (airline_id) DO UPDATE
+    SET generation = EXCLUDED.generation, marked_at = EXCLUDED.marked_at;
+"""
+
+# Airlines whose every sub-score is known contribute to the global averages,
+# weighted by their review count.
+COMPLETE_SUB_SCORES = "calculatedReviewCount > 0 AND " + " AND ".join(
+    f"{column} IS NOT NULL" for column, _ in SUB_SCORE_COLUMNS
+)
+
+# Rebuilds the ranking snapshot from the airlines summary columns: dense rank
+# by score for every airline plus one row of global figures.
+REFRESH_AIRLINE_RANKINGS_SQL = f"""
+    WITH ranked AS (
+        SELECT
+            airline_id,
+            CASE WHEN score IS NOT NULL THEN DENSE_RANK() OVER (ORDER BY score DESC NULLS LAST) END as score_rank
+        FROM airlines
+    ),
+    upserted AS (
+        INSERT INTO airline_rankings (airline_id, score_rank)
+        SELECT airline_id, score_rank FROM ranked
+        ON CONFLICT (airline_id) DO UPDATE
+        SET score_rank = EXCLUDED.score_rank
+        RETURNING 1
+    )
+    INSERT INTO airline_global_stats (
+        id, total_airlines, median_review_count,
+        {", ".join(column for column, _ in SUB_SCORE_COLUMNS)}, refreshed_at
+    )
+    SELECT
+        TRUE,
+        COUNT(*),
+        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY calculatedReviewCount),
+        {", ".join(
+            f"SUM({column} * calculatedReviewCount) FILTER (WHERE complete)"
+            f" / NULLIF(SUM(calculatedReviewCount) FILTER (WHERE complete), 0)"
+            for column, _ in SUB_SCORE_COLUMNS
+        )},
+        NOW()
+    FROM (
+        SELECT *, {COMPLETE_SUB_SCORES} as complete
+        FROM airlines
+    ) a
+    ON CONFLICT (id) DO UPDATE
+    SET total_airlines = EXCLUDED.total_airlines,
+        median_review_count = EXCLUDED.median_review_count,
+        {", ".join(f"{column} = EXCLUDED.{column}" for column, _ in SUB_SCORE_COLUMNS)},
+        refreshed_at = EXCLUDED.refreshed_at;
+"""
+
+SUB_ITEM_SCORING_SQL = f"""
+    SELECT
+        {", ".join(f"a.{column}" for column, _ in SUB_SCORE_COLUMNS)},
+        {", ".join(f"g.{column}" for column, _ in SUB_SCORE_COLUMNS)}
+    FROM airlines a
+    LEFT JOIN airline_global_stats g ON TRUE
+    WHERE a.airline_id = %s;
+"""
+
+TOP_RATED_AIRLINES_SQL = """
+    SELECT
+        a.name,
+        a.score,
+        a.calculatedReviewCount
+    FROM airline_rankings k
+    JOIN airlines a ON a.airline_id = k.airline_id
+    WHERE k.score_rank IS NOT NULL
+    AND a.calculatedReviewCount IS NOT NULL
+    ORDER BY k.score_rank, a.name;
+"""
+
+ROUTE_COUNTS_SQL = """
+    SELECT
+        route,
+        COUNT(*) as route_count
+    FROM reviews
+    WHERE airline_id = %s
+    AND route IS NOT NULL
+    AND route != ''
+    AND route LIKE '%%to%%'
+    GROUP BY route;
+"""
+
+AIRLINE_INFO_SQL = """
+    SELECT
+        name,
+        image
+    FROM airlines
+    WHERE airline_id = %s;
+"""
+
+# API field name -> (column, formatter); the order here is the default response order.
+REVIEW_FIELDS = {
+    "airlineName": ("airlineName", lambda v: v or "N/A"),
+    "reviewId": ("reviewId", lambda v: v or "N/A"),
+    "title": ("title", lambda v: v or ""),
+    "score": ("score", lambda v: round(v, 1) if v is not None else 0),
+    "content": ("content", lambda v: v or "N/A"),
+    "verifiedType": ("verifiedType", lambda v: v or "N/A"),
+    "userName": ("userName", lambda v: v or "N/A"),
+    "country": ("country", lambda v: v or "N/A"),
+    "reviewDate": ("dateReview", lambda v: v.strftime("%Y-%m-%d") if v else "N/A"),
+    "aircraft": ("aircraft", lambda v: v or "N/A"),
+    "typeOfTraveller": ("typeOfTraveller", lambda v: v or "N/A"),
+    "seatType": ("seatType", lambda v: v or "N/A"),
+    "flownDate": ("dateFlown", lambda v: v or "N/A"),
+    "recommended": ("recommended", lambda v: v or "N/A"),
+}
+
+DEFAULT_REVIEW_FIELDS = [field for field in REVIEW_FIELDS if field != "airlineName"]
+
+REVIEWS_PAGE_SIZE = 100
+REVIEWS_MAX_LIMIT = 1000
+SEARCH_CONFIG = "english"
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+EXPORT_ITERSIZE = 2000
+
+INSERT_SENTIMENT_SQL = """
+    INSERT INTO sentiment (
+        text, submit_time, sent_lab, pos_dict, neg_dict
+    ) VALUES (
+        %s, %s, %s, %s::jsonb, %s::jsonb
+    );
+"""
+
+SENTIMENT_CACHE_GET_SQL = """
+    SELECT score, sent_lab, pos_dict, neg_dict
+    FROM sentiment_cache
+    WHERE cache_key = %s;
+"""
+
+SENTIMENT_CACHE_PUT_SQL = """
+    INSERT INTO sentiment_cache (
+        cache_key, model_name, score, sent_lab, pos_dict, neg_dict
+    ) VALUES (
+        %s, %s, %s, %s, %s::jsonb, %s::jsonb
+    )
+    ON CONFLICT (cache_key) DO NOTHING;
+"""
+
+UNSCORED_REVIEWS_SQL = """
+    SELECT r.reviewId, r.airlineName, r.content
+    FROM reviews r
+    WHERE r.reviewId > %s
+    AND r.content IS NOT NULL
+    AND r.content != ''
+    AND NOT EXISTS (
+        SELECT 1 FROM review_sentiment s WHERE s.reviewId = r.reviewId
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM review_sentiment_failures f WHERE f.reviewId = r.reviewId
+    )
+    ORDER BY r.reviewId
+    LIMIT %s;
+"""
+
+INSERT_SENTIMENT_FAILURE_SQL = """
+    INSERT INTO review_sentiment_failures (reviewId, error)
+    VALUES (%s, %s)
+    ON CONFLICT (reviewId) DO UPDATE
+    SET error = EXCLUDED.error, failed_at = NOW();
+"""
+
+COPY_REVIEW_SENTIMENT_SQL = """
+    COPY review_sentiment (
+        reviewId, airlineName, model_name, sent_lab, score, pos_dict, neg_dict
+    ) FROM STDIN
+"""
+
+# Folds only rows not yet aggregated, so only airlines with newly scored reviews are touched.
+REFRESH_WORDCLOUD_SQL = """
+    WITH new_reviews AS (
+        UPDATE review_sentiment rs
+        SET aggregated = TRUE
+        FROM reviews r
+        WHERE NOT rs.aggregated
+        AND r.reviewId = rs.reviewId
+        AND r.airline_id IS NOT NULL
+        RETURNING r.airline_id, rs.pos_dict, rs.neg_dict
+    ),
+    tokens AS (
+        SELECT airline_id, 1 AS polarity, t.key AS token, (t.value->>'score')::float AS score
+        FROM new_reviews, jsonb_each(pos_dict) t
+        UNION ALL
+        SELECT airline_id, -1 AS polarity, t.key AS token, (t.value->>'score')::float AS score
+        FROM new_reviews, jsonb_each(neg_dict) t
+    ),
+    upserted AS (
+        INSERT INTO airline_wordcloud (airline_id, polarity, token, score)
+        SELECT airline_id, polarity, token, SUM(score)
+        FROM tokens
+        GROUP BY airline_id, polarity, token
+        ON CONFLICT (airline_id, polarity, token) DO UPDATE
+        SET score = airline_wordcloud.score + EXCLUDED.score
+        RETURNING 1
+    )
+    INSERT INTO airline_wordcloud_state (airline_id, review_count)
+    SELECT airline_id, COUNT(*)
+    FROM new_reviews
+    GROUP BY airline_id
+    ON CONFLICT (airline_id) DO UPDATE
+    SET review_count = airline_wordcloud_state.review_count + EXCLUDED.review_count;
+"""
+
+WORDCLOUD_STATE_SQL = """
+    SELECT review_count
+    FROM airline_wordcloud_state
+    WHERE airline_id = %s;
+"""
+
+WORDCLOUD_TOKENS_SQL = """
+    (SELECT polarity, token, score
+    FROM airline_wordcloud
+    WHERE airline_id = %(airline_id)s AND polarity = 1
+    ORDER BY score DESC
+    LIMIT %(limit)s)
+    UNION ALL
+    (SELECT polarity, token, score
+    FROM airline_wordcloud
+    WHERE airline_id = %(airline_id)s AND polarity = -1
+    ORDER BY score ASC
+    LIMIT %(limit)s);
+"""
+
+WORDCLOUD_MAX_LIMIT = 500
+
+RANDOM_REVIEWS_SQL = """
+    SELECT content
+    FROM reviews
+    WHERE airline_id = %s AND content IS NOT NULL
+    ORDER BY RANDOM()
+    LIMIT %s;
+"""
+
+REGRESSION_REVIEWS_SQL = """
+    SELECT score, seatComfort, cabinStaffService, foodBeverages,
+        inflightEntertainment, groundService, wifiConnectivity, valueForMoney
+    FROM reviews
+    WHERE airline_id = %s
+    AND score IS NOT NULL
+    AND (seatComfort IS NOT NULL OR cabinStaffService IS NOT NULL
+        OR foodBeverages IS NOT NULL OR inflightEntertainment IS NOT NULL
+        OR groundService IS NOT NULL OR wifiConnectivity IS NOT NULL
+        OR valueForMoney IS NOT NULL);
+"""
+
+def review_params(item):
+    data = dict(item)
+
+    for key in REVIEW_REQUIRED_KEYS:
+        if key not in data:
+            if key in REVIEW_NULLABLE_KEYS:
+                data[key] = None
+            else:
+                data[key] = ""
+
+    return data
+
+def format_key_data(airline_row, median_row, rank_row, pref_row):
+    categories = {
+        'Seat Comfort': airline_row[0],
+        'Cabin Staff Service': airline_row[1],
+        'Food & Beverages': airline_row[2],
+        'Inflight Entertainment': airline_row[3],
+        'Ground Service': airline_row[4],
+        'Wifi Connectivity': airline_row[5],
+        'Value For Money': airline_row[6]
+    }
+
+    valid_categories = {k: v for k, v in categories.items() if v is not None}
+
+    if valid_categories:
+        top_category = max(valid_categories, key=valid_categories.get)
+        top_score = valid_categories[top_category]
+        lowest_category = min(valid_categories, key=valid_categories.get)
+        lowest_score = valid_categories[lowest_category]
+
+        top_rated_item = {
+            "score": f"{round(top_score, 1)} / 5",
+            "category": top_category
+        }
+        lowest_rated_item = {
+            "score": f"{round(lowest_score, 1)} / 5",
+            "category": lowest_category
+        }
+    else:
+        top_rated_item = {
+            "score": "N/A",
+            "category": "N/A"
+        }
+        lowest_rated_item = {
+            "score": "N/A",
+            "category": "N/A"
+        }
+
+    median_count = int(median_row[0]) if median_row and median_row[0] else 0
+    rank = rank_row[0] if rank_row and rank_row[0] else "N/A"
+    total_airlines = rank_row[1] if rank_row and rank_row[1] else 0
+
+    return {
+        "top_rated_item": top_rated_item,
+        "total_rated_users": {
+            "count": airline_row[8],
+            "medium_number": median_count
+        },
+        "overall_score": {
+            "score": f"{round(airline_row[7], 1)} / 10" if airline_row[7] else "N/A",
+            "rank": f"{rank} out of {total_airlines} airlines"
+        },
+        "lowest_rated_item": lowest_rated_item,
+        "preferred_seat_type": pref_row[0] if pref_row and pref_row[0] else "N/A",
+        "preferred_route": pref_row[1] if pref_row and pref_row[1] else "N/A",
+        "review_time": {
+            "start": pref_row[2].strftime("%Y-%m-%d") if pref_row and pref_row[2] else "N/A",
+            "end": pref_row[3].strftime("%Y-%m-%d") if pref_row and pref_row[3] else "N/A"
+        },
+        "flown_time": {
+            "start": pref_row[4] if pref_row and pref_row[4] else "N/A",
+            "end": pref_row[5] if pref_row and pref_row[5] else "N/A"
+        }
+    }
+
+def format_rating_distributions(results, airline_ids):
+    """RATING_DISTRIBUTION_SQL rows as {airline_id: {"counts", "fractions"}} by sub-score label, zero-filled."""
+    labels = dict(SUB_SCORE_COLUMNS)
+    counts = {
+        airline_id: {label: [0] * len(RATING_VALUES) for _, label in SUB_SCORE_COLUMNS}
+        for airline_id in airline_ids
+    }
+
+    for airline_id, dimension, value, count in results:
+        counts[airline_id][labels[dimension]][value - RATING_VALUES[0]] = count
+
+    distributions = {}
+    for airline_id, airline_counts in counts.items():
+        fractions = {}
+        for label, values in airline_counts.items():
+            total = sum(values)
+            fractions[label] = [value / total if total > 0 else 0 for value in values]
+        distributions[airline_id] = {"counts": airline_counts, "fractions": fractions}
+
+    return distributions
+
+def format_sub_item_scoring(target_row, avg_row):
+    return {
+        "target_airline": {
+            "Seat Comfort": round(target_row[0], 1) if target_row[0] is not None else 0,
+            "Cabin Staff & Service": round(target_row[1], 1) if target_row[1] is not None else 0,
+            "Food & Beverages": round(target_row[2], 1) if target_row[2] is not None else 0,
+            "Inflight Entertainment": round(target_row[3], 1) if target_row[3] is not None else 0,
+            "Ground Service": round(target_row[4], 1) if target_row[4] is not None else 0,
+            "Wifi Connectivity": round(target_row[5], 1) if target_row[5] is not None else 0,
+            "Value for Money": round(target_row[6], 1) if target_row[6] is not None else 0
+        },
+        "average_score": {
+            "Seat Comfort": round(avg_row[0], 1) if avg_row and avg_row[0] is not None else 0,
+            "Cabin Staff & Service": round(avg_row[1], 1) if avg_row and avg_row[1] is not None else 0,
+            "Food & Beverages": round(avg_row[2], 1) if avg_row and avg_row[2] is not None else 0,
+            "Inflight Entertainment": round(avg_row[3], 1) if avg_row and avg_row[3] is not None else 0,
+            "Ground Service": round(avg_row[4], 1) if avg_row and avg_row[4] is not None else 0,
+            "Wifi Connectivity": round(avg_row[5], 1) if avg_row and avg_row[5] is not None else 0,
+            "Value for Money": round(avg_row[6], 1) if avg_row and avg_row[6] is not None else 0
+        }
+    }
+
+def format_top_rated_airlines(results):
+    colors = ['#0095ff', '#00e096', '#884dff', '#ff8f0d', '#f64e60']
+
+    return [
+        {
+            "rank": str(i + 1).zfill(2),
+            "name": row[0],
+            "rating": round(row[1], 1) if row[1] else 0,
+            "reviewCount": row[2] if row[2] else 0,
+            "color": colors[i % len(colors)]
+        }
+        for i, row in enumerate(results)
+    ]
+
+def format_city_distribution(results, gazetteer):
+    city_counts = {}
+
+    for row in results:
+        route = row[0]
+        count = row[1]
+
+        if ' to ' in route:
+            parts = route.split(' to ')
+            if len(parts) == 2:
+                origin = parts[0].strip()
+                destination = parts[1].strip()
+
+                city_counts[origin] = city_counts.get(origin, 0) + count
+                city_counts[destination] = city_counts.get(destination, 0) + count
+
+    scatter_data = []
+    colors = ['#fbbf24', '#ef4444', '#8b5cf6', '#06b6d4', '#10b981', '#22c55e']
+
+    for i, (city, count) in enumerate(sorted(city_counts.items(), key=lambda x: x[1], reverse=True)):
+        coords = gazetteer.get(city)
+        if coords:
+            scatter_data.append({
+                "name": city,
+                "value": [coords['lng'], coords['lat'], count],
+                "itemStyle": {"color": colors[i % len(colors)]}
+            })
+
+    return scatter_data
+
+def format_airline_info(row):
+    return {
+        "name": row[0],
+        "image": row[1] if row[1] else ""
+    }
+
+def parse_review_fields(fields, default=DEFAULT_REVIEW_FIELDS):
+    """Validate a comma-separated ``fields=`` projection; None/empty selects ``default``."""
+    if not fields:
+        return list(default)
+
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in REVIEW_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown review fields: {', '.join(unknown)}")
+
+    return selected
+
+def encode_review_cursor(date_review, review_id):
+    payload = json.dumps([date_review.isoformat() if date_review else None, review_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_review_cursor(cursor):
+    try:
+        date_review, review_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (date.fromisoformat(date_review) if date_review else None), str(review_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def encode_search_cursor(rank, review_id):
+    payload = json.dumps([rank, review_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_search_cursor(cursor):
+    try:
+        rank, review_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(rank), str(review_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def review_filters(airline_id=None, keyword=None, min_score=None, max_score=None,
+                   seat_type=None, traveller_type=None, date_from=None, date_to=None):
+    """WHERE clauses and params shared by the paginated and streaming review queries."""
+    clauses = []
+    params = []
+
+    if airline_id is not None:
+        clauses.append("airline_id = %s")
+        params.append(airline_id)
+    if keyword:
+        clauses.append(f"search_vector @@ websearch_to_tsquery('{SEARCH_CONFIG}', %s)")
+        params.append(keyword)
+    if min_score is not None:
+        clauses.append("score >= %s")
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append("score <= %s")
+        params.append(max_score)
+    if seat_type:
+        clauses.append("LOWER(seatType) = LOWER(%s)")
+        params.append(seat_type)
+    if traveller_type:
+        clauses.append("LOWER(typeOfTraveller) = LOWER(%s)")
+        params.append(traveller_type)
+    if date_from:
+        clauses.append("dateReview >= %s")
+        params.append(date_from)
+    if date_to:
+        clauses.append("dateReview <= %s")
+        params.append(date_to)
+
+    return clauses, params
+
+def build_reviews_page_query(fields, limit, cursor=None, **filters):
+    """Keyset-paginated review query ordered by (dateReview DESC NULLS LAST, reviewId DESC); limit=None returns all rows."""
+    clauses, params = review_filters(**filters)
+
+    if cursor:
+        date_review, review_id = decode_review_cursor(cursor)
+        if date_review is None:
+            clauses.append("(dateReview IS NULL AND reviewId < %s)")
+            params.append(review_id)
+        else:
+            clauses.append("((dateReview, reviewId) < (%s, %s) OR dateReview IS NULL)")
+            params.extend([date_review, review_id])
+
+    columns = ["dateReview", "reviewId"] + [REVIEW_FIELDS[field][0] for field in fields]
+    where = " AND ".join(clauses) if clauses else "TRUE"
+    params.append(None if limit is None else limit + 1)
+
+    query = f"""
+        SELECT {", ".join(columns)}
+        FROM reviews
+        WHERE {where}
+        ORDER BY dateReview DESC NULLS LAST, reviewId DESC
+        LIMIT %s;
+    """
+    return query, params
+
+def build_reviews_export_query(fields, **filters):
+    """Unpaginated review query for streaming exports; ordered by the index when one airline is selected."""
+    clauses, params = review_filters(**filters)
+
+    columns = [REVIEW_FIELDS[field][0] for field in fields]
+    where = " AND ".join(clauses) if clauses else "TRUE"
+    order = "ORDER BY dateReview DESC NULLS LAST, reviewId DESC" if filters.get("airline_id") is not None else ""
+
+    query = f"""
+        SELECT {", ".join(columns)}
+        FROM reviews
+        WHERE {where}
+        {order};
+    """
+    return query, params
+
+def format_review_fields(row, fields):
+    return {
+        field: REVIEW_FIELDS[field][1](value)
+        for field, value in zip(fields, row)
+    }
+
+def format_reviews_page(results, fields, limit):
+    """Shape rows from build_reviews_page_query into (reviews, next_cursor)."""
+    if limit is None:
+        return [format_review_fields(row[2:], fields) for row in results], None
+
+    page = results[:limit]
+    reviews = [format_review_fields(row[2:], fields) for row in page]
+    next_cursor = encode_review_cursor(page[-1][0], page[-1][1]) if len(results) > limit else None
+    return reviews, next_cursor
+
+def build_review_search_query(text, limit, cursor=None, **filters):
+    """Ranked full-text search ordered by (rank DESC, reviewId DESC)."""
+    clauses, params = review_filters(**filters)
+    clauses.insert(0, "search_vector @@ q.query")
+
+    if cursor:
+        rank, review_id = decode_search_cursor(cursor)
+        clauses.append("(ts_rank(search_vector, q.query)::float8, reviewId) < (%s, %s)")
+        params.extend([rank, review_id])
+
+    # Snippets are built in the outer query so ts_headline only runs on the returned page.
+    query = f"""
+        SELECT
+            p.reviewId, p.airlineName, p.title, p.dateReview, p.score, p.rank,
+            ts_headline('{SEARCH_CONFIG}', COALESCE(p.content, ''), p.query, '{SEARCH_HEADLINE_OPTIONS}')
+        FROM (
+            SELECT
+                reviewId, airlineName, title, dateReview, score, content, q.query,
+                ts_rank(search_vector, q.query)::float8 AS rank
+            FROM reviews, websearch_to_tsquery('{SEARCH_CONFIG}', %s) AS q(query)
+            WHERE {" AND ".join(clauses)}
+            ORDER BY rank DESC, reviewId DESC
+            LIMIT %s
+        ) p
+        ORDER BY p.rank DESC, p.reviewId DESC;
+    """
+    return query, [text, *params, limit + 1]
+
+def format_review_search_page(results, limit):
+    """Shape rows from build_review_search_query into (results, next_cursor)."""
+    page = results[:limit]
+    hits = [
+        {
+            'reviewId': row[0],
+            'airlineName': row[1],
+            'title': row[2] or "N/A",
+            'reviewDate': row[3].strftime('%Y-%m-%d') if row[3] else "N/A",
+            'score': round(row[4], 1) if row[4] is not None else 0,
+            'rank': round(row[5], 6),
+            'snippet': row[6],
+        }
+        for row in page
+    ]
+    next_cursor = encode_search_cursor(page[-1][5], page[-1][0]) if len(results) > limit else None
+    return hits, next_cursor
+
+def airline_stats_payload(airline_ids):
+    """NOTIFY payload for refreshed airlines; "*" (everything) when the ids would not fit in one notification."""
+    payload = ",".join(str(airline_id) for airline_id in airline_ids)
+    return payload if len(payload) < 7000 else "*"
+
+def format_regression_review(row):
+    return {
+        'score': row[0],
+        'seatComfort': row[1],
+        'cabinStaffService': row[2],
+        'foodBeverages': row[3],
+        'inflightEntertainment': row[4],
+        'groundService': row[5],
+        'wifiConnectivity': row[6],
+        'valueForMoney': row[7]
+    }
+
+class AirlineIdCache:
+    """Process-wide airline name -> airline_id map shared by both clients, keyed case-insensitively."""
+
+    def __init__(self):
+        self.ids = {}
+
+    def get(self, airline_name):
+        return self.ids.get(airline_name.lower())
+
+    def put(self, airline_name, airline_id):
+        self.ids[airline_name.lower()] = airline_id
+        return airline_id
+
+    def discard(self, airline_name):
+        self.ids.pop(airline_name.lower(), None)
+
+    def discard_id(self, airline_id):
+        """Forget every name cached for ``airline_id``, e.g. after the airline was renamed."""
+        for name in [name for name, cached_id in self.ids.items() if cached_id == airline_id]:
+            del self.ids[name]
+
+    def clear(self):
+        self.ids.clear()
+
+airline_ids = AirlineIdCache()
+
 class PostgresClient:
     def __init__(self, dsn):
         self.conn = psycopg.connect(dsn)
         self.cur = self.conn.cursor()
 
+    def get_airline_id(self, airline_name):
+        airline_id = airline_ids.get(airline_name)
+        if airline_id is not None:
+            return airline_id
+
+        self.cur.execute(AIRLINE_ID_SQL, (airline_name,))
+        row = self.cur.fetchone()
+
+        if not row:
+            return None
+
+        return airline_ids.put(airline_name, row[0])
+
     def insert_airline(self, item):
         name = item.get("name")
         image = item.get("image")
         review_count = item.get("reviewCount")
 
         try:
-            self.cur.execute(
-                """
-                INSERT INTO airlines (name, image, reviewCount)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (name) DO UPDATE
-                SET image = EXCLUDED.image,
-                    reviewCount = EXCLUDED.reviewCount;
-                """, (name, image, review_count),
-            )
+            self.cur.execute(INSERT_AIRLINE_SQL, (name, image, review_count))
         except Exception as e:
             print(f"Error inserting into airlines: {e}")
             self.conn.rollback()
         else:
             self.conn.commit()
+            airline_ids.discard(name)
 
     def insert_review(self, item):
-        data = dict(item)
-        required_keys = [
-            "reviewId", "title", "score", "content", "verifiedType",
-            "airlineName", "userName", "country", "dateReview",
-            "aircraft", "typeOfTraveller", "seatType", "route", "dateFlown",
-            "seatComfort", "cabinStaffService", "foodBeverages",
-            "inflightEntertainment", "groundService", "wifiConnectivity",
-            "valueForMoney", "recommended",
-        ]
-
-        for key in required_keys:
-            if key not in data:
-                if key in (
-                    "score", "seatComfort", "cabinStaffService", "foodBeverages",
-                    "inflightEntertainment", "groundService", "wifiConnectivity",
-                    "valueForMoney", "dateReview",
-                ):
-                    data[key] = None
-                else:
-                    data[key] = ""
+        data = review_params(item)
 
         try:
-            self.cur.execute(
-                """
-                INSERT INTO reviews (
-                    reviewId, userName, airlineName,
-                    title, score, content, verifiedType, 
-                    country, dateReview,
-                    aircraft, typeOfTraveller, seatType, route, dateFlown,
-                    seatComfort, cabinStaffService, foodBeverages,
-                    inflightEntertainment, groundService, wifiConnectivity,
-                    valueForMoney, recommended
-                ) VALUES (
-                    %(reviewId)s, %(userName)s, %(airlineName)s, 
-                    %(title)s, %(score)s, %(content)s, %(verifiedType)s,
-                    %(country)s, %(dateReview)s,
-                    %(aircraft)s, %(typeOfTraveller)s, %(seatType)s, %(route)s, %(dateFlown)s,
-                    %(seatComfort)s, %(cabinStaffService)s, %(foodBeverages)s,
-                    %(inflightEntertainment)s, %(groundService)s, %(wifiConnectivity)s,
-                    %(valueForMoney)s, %(recommended)s
-                );
-                """, data,
-            )
+            self.cur.execute(INSERT_REVIEW_SQL, data)
         except Exception as e:
             print(f"Error inserting into reviews: {e}")
             self.conn.rollback()
@@ -84,535 +885,231 @@ class PostgresClient:
 
     def get_airline_key_data(self, airline_name):
         try:
-            self.cur.execute(
-                """
-                SELECT 
-                    seatComfort,
-                    cabinStaffService,
-                    foodBeverages,
-                    inflightEntertainment,
-                    groundService,
-                    wifiConnectivity,
-                    valueForMoney,
-                    score,
-                    calculatedReviewCount
-                FROM airlines
-                WHERE LOWER(name) = LOWER(%s);
-                """,
-                (airline_name,)
-            )
-            
-            airline_row = self.cur.fetchone()
-            
-            if not airline_row:
+            airline_id = self.get_airline_id(airline_name)
+            if airline_id is None:
                 return None
-            
-            categories = {
-                'Seat Comfort': airline_row[0],
-                'Cabin Staff Service': airline_row[1],
-                'Food & Beverages': airline_row[2],
-                'Inflight Entertainment': airline_row[3],
-                'Ground Service': airline_row[4],
-                'Wifi Connectivity': airline_row[5],
-                'Value For Money': airline_row[6]
-            }
-            
-            valid_categories = {k: v for k, v in categories.items() if v is not None}
-            
-            if valid_categories:
-                top_category = max(valid_categories, key=valid_categories.get)
-                top_score = valid_categories[top_category]
-                lowest_category = min(valid_categories, key=valid_categories.get)
-                lowest_score = valid_categories[lowest_category]
-                
-                top_rated_item = {
-                    "score": f"{round(top_score, 1)} / 5",
-                    "category": top_category
-                }
-                lowest_rated_item = {
-                    "score": f"{round(lowest_score, 1)} / 5",
-                    "category": lowest_category
-                }
-            else:
-                top_rated_item = {
-                    "score": "N/A",
-                    "category": "N/A"
-                }
-                lowest_rated_item = {
-                    "score": "N/A",
-                    "category": "N/A"
-                }
-            
-            self.cur.execute(
-                """
-                SELECT 
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY calculatedReviewCount) as median_count
-                FROM airlines;
-                """
-            )
-            median_row = self.cur.fetchone()
-            median_count = int(median_row[0]) if median_row and median_row[0] else 0
-            
-            self.cur.execute(
-                """
-                SELECT 
-                    COUNT(*) + 1 as rank,
-                    (SELECT COUNT(*) FROM airlines) as total_airlines
-                FROM airlines
-                WHERE score > (
-                    SELECT score 
-                    FROM airlines 
-                    WHERE LOWER(name) = LOWER(%s)
-                );
-                """,
-                (airline_name,)
-            )
-            rank_row = self.cur.fetchone()
-            rank = rank_row[0] if rank_row else 0
-            total_airlines = rank_row[1] if rank_row else 0
-            
-            self.cur.execute(
-                """
-                SELECT 
-                    MODE() WITHIN GROUP (ORDER BY seatType) as preferred_seat,
-                    MODE() WITHIN GROUP (ORDER BY route) as preferred_route,
-                    MIN(dateReview) as earliest_review,
-                    MAX(dateReview) as latest_review,
-                    TO_CHAR(MIN(
-                        CASE 
-                            WHEN dateFlown ~ '^[A-Za-z]+\s+\d{4}$'
-                            THEN TO_DATE(dateFlown, 'FMMonth YYYY')
-                            ELSE NULL
-                        END
-                    ), 'YYYY-MM') as earliest_flight,
-                    TO_CHAR(MAX(
-                        CASE 
-                            WHEN dateFlown ~ '^[A-Za-z]+\s+\d{4}$'
-                            THEN TO_DATE(dateFlown, 'FMMonth YYYY')
-                            ELSE NULL
-                        END
-                    ), 'YYYY-MM') as latest_flight
-                FROM reviews
-                WHERE LOWER(airlineName) = LOWER(%s)
-                    AND seatType IS NOT NULL 
-                    AND route IS NOT NULL
-                    AND dateReview IS NOT NULL
-                    AND dateFlown IS NOT NULL;
-                """,
-                (airline_name,)
-            )
-            
-            pref_row = self.cur.fetchone()
-            
-            return {
-                "top_rated_item": top_rated_item,
-                "total_rated_users": {
-                    "count": airline_row[8],
-                    "medium_number": median_count
-                },
-                "overall_score": {
-                    "score": f"{round(airline_row[7], 1)} / 10" if airline_row[7] else "N/A",
-                    "rank": f"{rank} out of {total_airlines} airlines"
-                },
-                "lowest_rated_item": lowest_rated_item,
-                "preferred_seat_type": pref_row[0] if pref_row and pref_row[0] else "N/A",
-                "preferred_route": pref_row[1] if pref_row and pref_row[1] else "N/A",
-                "review_time": {
-                    "start": pref_row[2].strftime("%Y-%m-%d") if pref_row and pref_row[2] else "N/A",
-                    "end": pref_row[3].strftime("%Y-%m-%d") if pref_row and pref_row[3] else "N/A"
-                },
-                "flown_time": {
-                    "start": pref_row[4] if pref_row and pref_row[4] else "N/A",
-                    "end": pref_row[5] if pref_row and pref_row[5] else "N/A"
-                }
-            }
-            
+
+            self.cur.execute(AIRLINE_KEY_DATA_SQL, (airline_id,))
+            row = self.cur.fetchone()
+
+            if not row:
+                return None
+
+            return format_key_data(row[:9], row[9:10], row[10:12], row[12:])
+
         except Exception as e:
             print(f"Error getting airline key data: {e}")
             return None
 
     def get_rating_distribution(self, airline_name):
+        distributions = self.get_rating_distributions([airline_name])
+        return distributions.get(airline_name) if distributions else None
+
+    def get_rating_distributions(self, airline_names):
+        """Rating distributions of several airlines in one query, keyed by the given names; unknown names are skipped."""
         try:
-            self.cur.execute(
-                """
-                SELECT 
-                    COUNT(*) FILTER (WHERE seatComfort = 0) as seat_0,
-                    COUNT(*) FILTER (WHERE seatComfort = 1) as seat_1,
-                    COUNT(*) FILTER (WHERE seatComfort = 2) as seat_2,
-                    COUNT(*) FILTER (WHERE seatComfort = 3) as seat_3,
-                    COUNT(*) FILTER (WHERE seatComfort = 4) as seat_4,
-                    COUNT(*) FILTER (WHERE seatComfort = 5) as seat_5,
-                    
-                    COUNT(*) FILTER (WHERE cabinStaffService = 0) as cabin_0,
-                    COUNT(*) FILTER (WHERE cabinStaffService = 1) as cabin_1,
-                    COUNT(*) FILTER (WHERE cabinStaffService = 2) as cabin_2,
-                    COUNT(*) FILTER (WHERE cabinStaffService = 3) as cabin_3,
-                    COUNT(*) FILTER (WHERE cabinStaffService = 4) as cabin_4,
-                    COUNT(*) FILTER (WHERE cabinStaffService = 5) as cabin_5,
-                    
-                    COUNT(*) FILTER (WHERE foodBeverages = 0) as food_0,
-                    COUNT(*) FILTER (WHERE foodBeverages = 1) as food_1,
-                    COUNT(*) FILTER (WHERE foodBeverages = 2) as food_2,
-                    COUNT(*) FILTER (WHERE foodBeverages = 3) as food_3,
-                    COUNT(*) FILTER (WHERE foodBeverages = 4) as food_4,
-                    COUNT(*) FILTER (WHERE foodBeverages = 5) as food_5,
-                    
-                    COUNT(*) FILTER (WHERE inflightEntertainment = 0) as entertainment_0,
-                    COUNT(*) FILTER (WHERE inflightEntertainment = 1) as entertainment_1,
-                    COUNT(*) FILTER (WHERE inflightEntertainment = 2) as entertainment_2,
-                    COUNT(*) FILTER (WHERE inflightEntertainment = 3) as entertainment_3,
-                    COUNT(*) FILTER (WHERE inflightEntertainment = 4) as entertainment_4,
-                    COUNT(*) FILTER (WHERE inflightEntertainment = 5) as entertainment_5,
-                    
-                    COUNT(*) FILTER (WHERE groundService = 0) as ground_0,
-                    COUNT(*) FILTER (WHERE groundService = 1) as ground_1,
-                    COUNT(*) FILTER (WHERE groundService = 2) as ground_2,
-                    COUNT(*) FILTER (WHERE groundService = 3) as ground_3,
-                    COUNT(*) FILTER (WHERE groundService = 4) as ground_4,
-                    COUNT(*) FILTER (WHERE groundService = 5) as ground_5,
-                    
-                    COUNT(*) FILTER (WHERE wifiConnectivity = 0) as wifi_0,
-                    COUNT(*) FILTER (WHERE wifiConnectivity = 1) as wifi_1,
-                    COUNT(*) FILTER (WHERE wifiConnectivity = 2) as wifi_2,
-                    COUNT(*) FILTER (WHERE wifiConnectivity = 3) as wifi_3,
-                    COUNT(*) FILTER (WHERE wifiConnectivity = 4) as wifi_4,
-                    COUNT(*) FILTER (WHERE wifiConnectivity = 5) as wifi_5,
-                    
-                    COUNT(*) FILTER (WHERE valueForMoney = 0) as value_0,
-                    COUNT(*) FILTER (WHERE valueForMoney = 1) as value_1,
-                    COUNT(*) FILTER (WHERE valueForMoney = 2) as value_2,
-                    COUNT(*) FILTER (WHERE valueForMoney = 3) as value_3,
-                    COUNT(*) FILTER (WHERE valueForMoney = 4) as value_4,
-                    COUNT(*) FILTER (WHERE valueForMoney = 5) as value_5
-                FROM reviews
-                WHERE LOWER(airlineName) = LOWER(%s);
-                """,
-                (airline_name,)
-            )
-            
-            row = self.cur.fetchone()
-            
-            if not row:
-                return None
-            
-            total_seat = sum(row[0:6])
-            total_cabin = sum(row[6:12])
-            total_food = sum(row[12:18])
-            total_entertainment = sum(row[18:24])
-            total_ground = sum(row[24:30])
-            total_wifi = sum(row[30:36])
-            total_value = sum(row[36:42])
-            
-            return {
-                "Seat Comfort": [
-                    row[i] / total_seat if total_seat > 0 else 0 
-                    for i in range(0, 6)
-                ],
-                "Cabin & Staff Service": [
-                    row[i] / total_cabin if total_cabin > 0 else 0 
-                    for i in range(6, 12)
-                ],
-                "Food & Beverages": [
-                    row[i] / total_food if total_food > 0 else 0 
-                    for i in range(12, 18)
-                ],
-                "Inflight Entertainment": [
-                    row[i] / total_entertainment if total_entertainment > 0 else 0 
-                    for i in range(18, 24)
-                ],
-                "Ground Service": [
-                    row[i] / total_ground if total_ground > 0 else 0 
-                    for i in range(24, 30)
-                ],
-                "Wifi Connectivity": [
-                    row[i] / total_wifi if total_wifi > 0 else 0 
-                    for i in range(30, 36)
-                ],
-                "Value For Money": [
-                    row[i] / total_value if total_value > 0 else 0 
-                    for i in range(36, 42)
-                ]
-            }
-            
+            airline_ids = {}
+            for airline_name in airline_names:
+                airline_id = self.get_airline_id(airline_name)
+                if airline_id is not None:
+                    airline_ids[airline_name] = airline_id
+
+            if not airline_ids:
+                return {}
+
+            self.cur.execute(RATING_DISTRIBUTION_SQL, (list(airline_ids.values()),))
+            distributions = format_rating_distributions(self.cur.fetchall(), airline_ids.values())
+
+            return {name: distributions[airline_id] for name, airline_id in airline_ids.items()}
+
         except Exception as e:
             print(f"Error getting rating distribution: {e}")
-            return None
+            return {}
 
     def get_sub_item_scoring(self, airline_name):
         try:
-            self.cur.execute(
-                """
-                SELECT 
-                    seatComfort,
-                    cabinStaffService,
-                    foodBeverages,
-                    inflightEntertainment,
-                    groundService,
-                    wifiConnectivity,
-                    valueForMoney
-                FROM airlines
-                WHERE LOWER(name) = LOWER(%s);
-                """,
-                (airline_name,)
-            )
-            
-            target_row = self.cur.fetchone()
-            
-            if not target_row:
+            airline_id = self.get_airline_id(airline_name)
+            if airline_id is None:
                 return None
-            
-            self.cur.execute(
-                """
-                SELECT 
-                    SUM(seatComfort * calculatedReviewCount) / SUM(calculatedReviewCount) as avg_seatComfort,
-                    SUM(cabinStaffService * calculatedReviewCount) / SUM(calculatedReviewCount) as avg_cabinStaffService,
-                    SUM(foodBeverages * calculatedReviewCount) / SUM(calculatedReviewCount) as avg_foodBeverages,
-                    SUM(inflightEntertainment * calculatedReviewCount) / SUM(calculatedReviewCount) as avg_inflightEntertainment,
-                    SUM(groundService * calculatedReviewCount) / SUM(calculatedReviewCount) as avg_groundService,
-                    SUM(wifiConnectivity * calculatedReviewCount) / SUM(calculatedReviewCount) as avg_wifiConnectivity,
-                    SUM(valueForMoney * calculatedReviewCount) / SUM(calculatedReviewCount) as avg_valueForMoney
-                FROM airlines
-                WHERE calculatedReviewCount > 0
-                AND seatComfort IS NOT NULL
-                AND cabinStaffService IS NOT NULL
-                AND foodBeverages IS NOT NULL
-                AND inflightEntertainment IS NOT NULL
-                AND groundService IS NOT NULL
-                AND wifiConnectivity IS NOT NULL
-                AND valueForMoney IS NOT NULL;
-                """
-            )
-            
-            avg_row = self.cur.fetchone()
-            
-            return {
-                "target_airline": {
-                    "Seat Comfort": round(target_row[0], 1) if target_row[0] is not None else 0,
-                    "Cabin Staff & Service": round(target_row[1], 1) if target_row[1] is not None else 0,
-                    "Food & Beverages": round(target_row[2], 1) if target_row[2] is not None else 0,
-                    "Inflight Entertainment": round(target_row[3], 1) if target_row[3] is not None else 0,
-                    "Ground Service": round(target_row[4], 1) if target_row[4] is not None else 0,
-                    "Wifi Connectivity": round(target_row[5], 1) if target_row[5] is not None else 0,
-                    "Value for Money": round(target_row[6], 1) if target_row[6] is not None else 0
-                },
-                "average_score": {
-                    "Seat Comfort": round(avg_row[0], 1) if avg_row and avg_row[0] is not None else 0,
-                    "Cabin Staff & Service": round(avg_row[1], 1) if avg_row and avg_row[1] is not None else 0,
-                    "Food & Beverages": round(avg_row[2], 1) if avg_row and avg_row[2] is not None else 0,
-                    "Inflight Entertainment": round(avg_row[3], 1) if avg_row and avg_row[3] is not None else 0,
-                    "Ground Service": round(avg_row[4], 1) if avg_row and avg_row[4] is not None else 0,
-                    "Wifi Connectivity": round(avg_row[5], 1) if avg_row and avg_row[5] is not None else 0,
-                    "Value for Money": round(avg_row[6], 1) if avg_row and avg_row[6] is not None else 0
-                }
-            }
-            
+
+            self.cur.execute(SUB_ITEM_SCORING_SQL, (airline_id,))
+            row = self.cur.fetchone()
+
+            if not row:
+                return None
+
+            return format_sub_item_scoring(row[:7], row[7:])
+
         except Exception as e:
             print(f"Error getting sub-item scoring: {e}")
             return None
-    
+
     def get_top_rated_airlines(self):
         try:
-            self.cur.execute(
-                """
-                SELECT 
-                    name,
-                    score,
-                    calculatedReviewCount
-                FROM airlines
-                WHERE score IS NOT NULL
-                AND calculatedReviewCount IS NOT NULL
-                ORDER BY score DESC;
-                """
-            )
-            
+            self.cur.execute(TOP_RATED_AIRLINES_SQL)
             results = self.cur.fetchall()
-            
+
             if not results:
                 return []
 
-            colors = ['#0095ff', '#00e096', '#884dff', '#ff8f0d', '#f64e60']
-        
-            return [
-                {
-                    "rank": str(i + 1).zfill(2),
-                    "name": row[0],
-                    "rating": round(row[1], 1) if row[1] else 0,
-                    "reviewCount": row[2] if row[2] else 0,
-                    "color": colors[i % len(colors)]
-                }
-                for i, row in enumerate(results)
-            ]
-            
+            return format_top_rated_airlines(results)
+
         except Exception as e:
             print(f"Error getting top rated airlines: {e}")
             return []
 
-    def get_airline_city_distribution(self, airline_name, cities_csv_path='worldcities.csv'):
+    def get_airline_city_distribution(self, airline_name, gazetteer):
         try:
-            import csv
-            city_coords = {}
-            
-            with open(cities_csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    city_name = row['city']
-                    city_coords[city_name] = {
-                        'lng': float(row['lng']),
-                        'lat': float(row['lat'])
-                    }
-            
-            self.cur.execute(
-                """
-                SELECT 
-                    route,
-                    COUNT(*) as route_count
-                FROM reviews
-                WHERE LOWER(airlineName) = LOWER(%s)
-                AND route IS NOT NULL
-                AND route != ''
-                AND route LIKE '%%to%%'
-                GROUP BY route;
-                """,
-                (airline_name,)
-            )
-            
+            airline_id = self.get_airline_id(airline_name)
+            if airline_id is None:
+                return []
+
+            self.cur.execute(ROUTE_COUNTS_SQL, (airline_id,))
             results = self.cur.fetchall()
 
             if not results:
                 return []
-            
-            city_counts = {}
-            
-            for row in results:
-                route = row[0]
-                count = row[1]
-                
-                if ' to ' in route:
-                    parts = route.split(' to ')
-                    if len(parts) == 2:
-                        origin = parts[0].strip()
-                        destination = parts[1].strip()
-                        
-                        city_counts[origin] = city_counts.get(origin, 0) + count
-                        city_counts[destination] = city_counts.get(destination, 0) + count
-            
-            scatter_data = []
-            colors = ['#fbbf24', '#ef4444', '#8b5cf6', '#06b6d4', '#10b981', '#22c55e']
-            
-            for i, (city, count) in enumerate(sorted(city_counts.items(), key=lambda x: x[1], reverse=True)):
-                coords = city_coords.get(city)
-                if coords:
-                    scatter_data.append({
-                        "name": city,
-                        "value": [coords['lng'], coords['lat'], count],
-                        "itemStyle": {"color": colors[i % len(colors)]}
-                    })
-            
-            return scatter_data
-            
+
+            return format_city_distribution(results, gazetteer)
+
         except Exception as e:
             print(f"Error getting city distribution: {e}")
             return []
 
     def get_airline_info(self, airline_name):
         try:
-            self.cur.execute(
-                """
-                SELECT 
-                    name,
-                    image
-                FROM airlines
-                WHERE LOWER(name) = LOWER(%s);
-                """,
-                (airline_name,)
-            )
-            
+            airline_id = self.get_airline_id(airline_name)
+            if airline_id is None:
+                return None
+
+            self.cur.execute(AIRLINE_INFO_SQL, (airline_id,))
             row = self.cur.fetchone()
-            
+
             if not row:
                 return None
-            
-            return {
-                "name": row[0],
-                "image": row[1] if row[1] else ""
-            }
-            
+
+            return format_airline_info(row)
+
         except Exception as e:
             print(f"Error getting airline info: {e}")
             return None
 
-    def get_reviews_by_airline(self, airline_name, keyword=None):
+    def get_reviews_by_airline(self, airline_name, keyword=None, limit=100, cursor=None, fields=None, **filters):
+        fields = parse_review_fields(fields)
+
         try:
-            self.cur.execute(
-                """
-                SELECT 
-                    reviewId, title, score, content, verifiedType, userName, country,
-                    dateReview, aircraft, typeOfTraveller, seatType, dateFlown, recommended
-                FROM reviews
-                WHERE LOWER(airlineName) = LOWER(%s)
-                ORDER BY dateReview DESC;
-                """,
-                (airline_name,)
+            airline_id = self.get_airline_id(airline_name)
+            if airline_id is None:
+                return [], None
+
+            query, params = build_reviews_page_query(
+                fields, limit, cursor, airline_id=airline_id, keyword=keyword, **filters
             )
-            
+            self.cur.execute(query, params)
             results = self.cur.fetchall()
-            
-            if not results:
-                return []
-            
-            return [
-                {
-                    "reviewId": row[0] or "N/A",
-                    "title": row[1] or "",
-                    "score": round(row[2], 1) if row[2] is not None else 0,
-                    "content": row[3] or "N/A",
-                    "verifiedType": row[4] or "N/A",
-                    "userName": row[5] or "N/A",
-                    "country": row[6] or "N/A",
-                    "reviewDate": row[7].strftime("%Y-%m-%d") if row[7] else "N/A",
-                    "aircraft": row[8] or "N/A",
-                    "typeOfTraveller": row[9] or "N/A",
-                    "seatType": row[10] or "N/A",
-                    "flownDate": row[11] or "N/A",
-                    "recommended": row[12] or "N/A",
-                }
-                for row in results
-            ]
-            
+
+            return format_reviews_page(results, fields, limit)
+
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error getting reviews: {e}")
-            return []
+            return [], None
 
     def insert_sentiment(self, text, submit_time, sent_lab, pos_dict, neg_dict):
         try:
             self.cur.execute(
-                """
-                INSERT INTO sentiment (
-                    text, submit_time, sent_lab, pos_dict, neg_dict
-                ) VALUES (
-                    %s, %s, %s, %s::jsonb, %s::jsonb
-                );
-                """, (text, submit_time, sent_lab, json.dumps(pos_dict), json.dumps(neg_dict))
+                INSERT_SENTIMENT_SQL,
+                (text, submit_time, sent_lab, json.dumps(pos_dict), json.dumps(neg_dict))
             )
-            
+
             self.conn.commit()
-            
+
         except Exception as e:
             print(f"Error inserting sentiment: {e}")
             self.conn.rollback()
 
+    def stream_unscored_reviews(self, page_size=2000):
+        """Yield (reviewId, airlineName, content) for reviews without a review_sentiment row, in reviewId pages."""
+        last_review_id = ""
+        while True:
+            self.cur.execute(UNSCORED_REVIEWS_SQL, (last_review_id, page_size))
+            rows = self.cur.fetchall()
+            self.conn.commit()
+            yield from rows
+
+            if len(rows) < page_size:
+                return
+            last_review_id = rows[-1][0]
+
+    def insert_sentiment_failures(self, failures):
+        """Record (reviewId, error) pairs so later runs skip reviews that cannot be scored."""
+        try:
+            self.cur.executemany(INSERT_SENTIMENT_FAILURE_SQL, [(str(review_id), error) for review_id, error in failures])
+        except Exception as e:
+            print(f"Error recording sentiment failures: {e}")
+            self.conn.rollback()
+        else:
+            self.conn.commit()
+
+    def clear_sentiment_failures(self):
+        self.cur.execute("DELETE FROM review_sentiment_failures;")
+        self.conn.commit()
+
+    def copy_review_sentiment(self, rows):
+        """Bulk load (reviewId, airlineName, model_name, sent_lab, score, pos_dict, neg_dict) rows."""
+        try:
+            with self.cur.copy(COPY_REVIEW_SENTIMENT_SQL) as copy:
+                for review_id, airline_name, name, sent_lab, score, pos_dict, neg_dict in rows:
+                    copy.write_row((
+                        str(review_id), airline_name, name, sent_lab, score,
+                        json.dumps(pos_dict), json.dumps(neg_dict)
+                    ))
+        except Exception as e:
+            print(f"Error copying review sentiment: {e}")
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+
+    def refresh_wordcloud_aggregates(self):
+        """Fold review_sentiment rows not yet aggregated into airline_wordcloud."""
+        try:
+            self.cur.execute(REFRESH_WORDCLOUD_SQL)
+        except Exception as e:
+            print(f"Error refreshing wordcloud aggregates: {e}")
+            self.conn.rollback()
+        else:
+            self.conn.commit()
+
+    def refresh_airline_stats(self):
+        """Recompute airline_stats and the ranking snapshot for airlines marked dirty; return the refreshed ids."""
+        try:
+            self.cur.execute(LOCK_AIRLINE_STATS_SQL)
+            self.cur.execute(REFRESH_AIRLINE_STATS_SQL)
+            refreshed = [row[0] for row in self.cur.fetchall()]
+            if refreshed:
+                self.cur.execute(REFRESH_AIRLINE_RANKINGS_SQL)
+                self.cur.execute(NOTIFY_AIRLINE_STATS_SQL, (airline_stats_payload(refreshed),))
+        except Exception as e:
+            print(f"Error refreshing airline stats: {e}")
+            self.conn.rollback()
+            return []
+        else:
+            self.conn.commit()
+            return refreshed
+
+    def mark_all_airline_stats_dirty(self):
+        self.cur.execute(MARK_ALL_AIRLINE_STATS_DIRTY_SQL)
+        self.conn.commit()
+
     def get_random_reviews(self, airline_name, limit=10):
         try:
-            self.cur.execute(
-                """
-                SELECT content
-                FROM reviews
-                WHERE LOWER(airlineName) = LOWER(%s) AND content IS NOT NULL
-                ORDER BY RANDOM()
-                LIMIT %s;
-                """,
-                (airline_name, limit)
-            )
+            airline_id = self.get_airline_id(airline_name)
+            if airline_id is None:
+                return []
+
+            self.cur.execute(RANDOM_REVIEWS_SQL, (airline_id, limit))
             results = self.cur.fetchall()
             return [{'content': row[0]} for row in results]
         except Exception as e:
@@ -621,39 +1118,352 @@ class PostgresClient:
 
     def get_reviews_for_regression(self, airline_name):
         try:
-            self.cur.execute(
-                """
-                SELECT score, seatComfort, cabinStaffService, foodBeverages,
-                    inflightEntertainment, groundService, wifiConnectivity, valueForMoney
-                FROM reviews
-                WHERE LOWER(airlineName) = LOWER(%s)
-                AND score IS NOT NULL
-                AND (seatComfort IS NOT NULL OR cabinStaffService IS NOT NULL 
-                    OR foodBeverages IS NOT NULL OR inflightEntertainment IS NOT NULL
-                    OR groundService IS NOT NULL OR wifiConnectivity IS NOT NULL
-                    OR valueForMoney IS NOT NULL);
-                """,
-                (airline_name,)
-            )
+            airline_id = self.get_airline_id(airline_name)
+            if airline_id is None:
+                return []
+
+            self.cur.execute(REGRESSION_REVIEWS_SQL, (airline_id,))
             results = self.cur.fetchall()
-            return [
-                {
-                    'score': row[0],
-                    'seatComfort': row[1],
-                    'cabinStaffService': row[2],
-                    'foodBeverages': row[3],
-                    'inflightEntertainment': row[4],
-                    'groundService': row[5],
-                    'wifiConnectivity': row[6],
-                    'valueForMoney': row[7]
-                }
-                for row in results
-            ]
+            return [format_regression_review(row) for row in results]
         except Exception as e:
             print(f"Error getting reviews for regression: {e}")
             return []
-        
+
     def close(self):
         if self.conn:
             self.cur.close()
-            self.conn.close()
\ No newline at end of file
+            self.conn.close()
+
+class AsyncPostgresClient:
+    """Async counterpart of PostgresClient; each method borrows its own connection from ``pool``."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def get_airline_id(self, airline_name):
+        airline_id = airline_ids.get(airline_name)
+        if airline_id is not None:
+            return airline_id
+
+        async with self.pool.connection() as conn, conn.cursor() as cur:
+            await cur.execute(AIRLINE_ID_SQL, (airline_name,))
+            row = await cur.fetchone()
+
+        if not row:
+            return None
+
+        return airline_ids.put(airline_name, row[0])
+
+    async def insert_airline(self, item):
+        name = item.get("name")
+        image = item.get("image")
+        review_count = item.get("reviewCount")
+
+        async with self.pool.connection() as conn:
+            try:
+                await conn.execute(INSERT_AIRLINE_SQL, (name, image, review_count))
+            except Exception as e:
+                print(f"Error inserting into airlines: {e}")
+                await conn.rollback()
+            else:
+                await conn.commit()
+                airline_ids.discard(name)
+
+    async def insert_review(self, item):
+        data = review_params(item)
+
+        async with self.pool.connection() as conn:
+            try:
+                await conn.execute(INSERT_REVIEW_SQL, data)
+            except Exception as e:
+                print(f"Error inserting into reviews: {e}")
+                await conn.rollback()
+            else:
+                await conn.commit()
+
+    async def get_airline_key_data(self, airline_name):
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return None
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(AIRLINE_KEY_DATA_SQL, (airline_id,))
+                row = await cur.fetchone()
+
+            if not row:
+                return None
+
+            return format_key_data(row[:9], row[9:10], row[10:12], row[12:])
+
+        except Exception as e:
+            print(f"Error getting airline key data: {e}")
+            return None
+
+    async def get_rating_distribution(self, airline_name):
+        distributions = await self.get_rating_distributions([airline_name])
+        return distributions.get(airline_name) if distributions else None
+
+    async def get_rating_distributions(self, airline_names):
+        """Rating distributions of several airlines in one query, keyed by the given names; unknown names are skipped."""
+        try:
+            airline_ids = {}
+            for airline_name in airline_names:
+                airline_id = await self.get_airline_id(airline_name)
+                if airline_id is not None:
+                    airline_ids[airline_name] = airline_id
+
+            if not airline_ids:
+                return {}
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(RATING_DISTRIBUTION_SQL, (list(airline_ids.values()),))
+                results = await cur.fetchall()
+
+            distributions = format_rating_distributions(results, airline_ids.values())
+            return {name: distributions[airline_id] for name, airline_id in airline_ids.items()}
+
+        except Exception as e:
+            print(f"Error getting rating distribution: {e}")
+            return {}
+
+    async def get_sub_item_scoring(self, airline_name):
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return None
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(SUB_ITEM_SCORING_SQL, (airline_id,))
+                row = await cur.fetchone()
+
+            if not row:
+                return None
+
+            return format_sub_item_scoring(row[:7], row[7:])
+
+        except Exception as e:
+            print(f"Error getting sub-item scoring: {e}")
+            return None
+
+    async def get_top_rated_airlines(self):
+        try:
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(TOP_RATED_AIRLINES_SQL)
+                results = await cur.fetchall()
+
+            if not results:
+                return []
+
+            return format_top_rated_airlines(results)
+
+        except Exception as e:
+            print(f"Error getting top rated airlines: {e}")
+            return []
+
+    async def get_airline_city_distribution(self, airline_name, gazetteer):
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return []
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(ROUTE_COUNTS_SQL, (airline_id,))
+                results = await cur.fetchall()
+
+            if not results:
+                return []
+
+            return format_city_distribution(results, gazetteer)
+
+        except Exception as e:
+            print(f"Error getting city distribution: {e}")
+            return []
+
+    async def get_airline_info(self, airline_name):
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return None
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(AIRLINE_INFO_SQL, (airline_id,))
+                row = await cur.fetchone()
+
+            if not row:
+                return None
+
+            return format_airline_info(row)
+
+        except Exception as e:
+            print(f"Error getting airline info: {e}")
+            return None
+
+    async def get_reviews_by_airline(self, airline_name, keyword=None, limit=100, cursor=None, fields=None, **filters):
+        fields = parse_review_fields(fields)
+
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return [], None
+
+            query, params = build_reviews_page_query(
+                fields, limit, cursor, airline_id=airline_id, keyword=keyword, **filters
+            )
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(query, params)
+                results = await cur.fetchall()
+
+            return format_reviews_page(results, fields, limit)
+
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error getting reviews: {e}")
+            return [], None
+
+    async def search_reviews(self, text, airline_name=None, limit=20, cursor=None, **filters):
+        try:
+            airline_id = None
+            if airline_name:
+                airline_id = await self.get_airline_id(airline_name)
+                if airline_id is None:
+                    return [], None
+
+            query, params = build_review_search_query(text, limit, cursor, airline_id=airline_id, **filters)
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(query, params)
+                results = await cur.fetchall()
+
+            return format_review_search_page(results, limit)
+
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error searching reviews: {e}")
+            return [], None
+
+    async def stream_reviews(self, fields, airline_id=None, **filters):
+        """Yield formatted reviews through a server-side cursor, EXPORT_ITERSIZE rows at a time."""
+        query, params = build_reviews_export_query(fields, airline_id=airline_id, **filters)
+
+        async with self.pool.connection() as conn:
+            async with conn.cursor(name="reviews_export") as cur:
+                cur.itersize = EXPORT_ITERSIZE
+                await cur.execute(query, params)
+                async for row in cur:
+                    yield format_review_fields(row, fields)
+
+    async def insert_sentiment(self, text, submit_time, sent_lab, pos_dict, neg_dict):
+        async with self.pool.connection() as conn:
+            try:
+                await conn.execute(
+                    INSERT_SENTIMENT_SQL,
+                    (text, submit_time, sent_lab, json.dumps(pos_dict), json.dumps(neg_dict))
+                )
+
+                await conn.commit()
+
+            except Exception as e:
+                print(f"Error inserting sentiment: {e}")
+                await conn.rollback()
+
+    async def get_cached_sentiment(self, cache_key):
+        try:
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(SENTIMENT_CACHE_GET_SQL, (cache_key,))
+                row = await cur.fetchone()
+            return tuple(row) if row else None
+        except Exception as e:
+            print(f"Error getting cached sentiment: {e}")
+            return None
+
+    async def insert_cached_sentiment(self, cache_key, model_name, score, sent_lab, pos_dict, neg_dict):
+        async with self.pool.connection() as conn:
+            try:
+                await conn.execute(
+                    SENTIMENT_CACHE_PUT_SQL,
+                    (cache_key, model_name, score, sent_lab, json.dumps(pos_dict), json.dumps(neg_dict))
+                )
+
+                await conn.commit()
+
+            except Exception as e:
+                print(f"Error inserting cached sentiment: {e}")
+                await conn.rollback()
+
+    async def get_wordcloud_aggregate(self, airline_name, limit=50):
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return None
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(WORDCLOUD_STATE_SQL, (airline_id,))
+                state_row = await cur.fetchone()
+
+                if not state_row:
+                    return None
+
+                await cur.execute(WORDCLOUD_TOKENS_SQL, {"airline_id": airline_id, "limit": limit})
+                results = await cur.fetchall()
+
+            pos_dict = {token: {'score': score} for polarity, token, score in results if polarity > 0}
+            neg_dict = {token: {'score': score} for polarity, token, score in results if polarity < 0}
+            return pos_dict, neg_dict, state_row[0]
+
+        except Exception as e:
+            print(f"Error getting wordcloud aggregate: {e}")
+            return None
+
+    async def refresh_airline_stats(self):
+        """Recompute airline_stats and rankings for dirty airlines; return their ids, or [] while another process refreshes."""
+        async with self.pool.connection() as conn:
+            try:
+                async with conn.cursor() as cur:
+                    await cur.execute(TRY_LOCK_AIRLINE_STATS_SQL)
+                    if not (await cur.fetchone())[0]:
+                        await conn.rollback()
+                        return []
+
+                    await cur.execute(REFRESH_AIRLINE_STATS_SQL)
+                    refreshed = [row[0] for row in await cur.fetchall()]
+                    if refreshed:
+                        await cur.execute(REFRESH_AIRLINE_RANKINGS_SQL)
+                        await cur.execute(NOTIFY_AIRLINE_STATS_SQL, (airline_stats_payload(refreshed),))
+
+                await conn.commit()
+                return refreshed
+
+            except Exception as e:
+                print(f"Error refreshing airline stats: {e}")
+                await conn.rollback()
+                return []
+
+    async def get_random_reviews(self, airline_name, limit=10):
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return []
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(RANDOM_REVIEWS_SQL, (airline_id, limit))
+                results = await cur.fetchall()
+            return [{'content': row[0]} for row in results]
+        except Exception as e:
+            print(f"Error getting random reviews: {e}")
+            return []
+
+    async def get_reviews_for_regression(self, airline_name):
+        try:
+            airline_id = await self.get_airline_id(airline_name)
+            if airline_id is None:
+                return []
+
+            async with self.pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(REGRESSION_REVIEWS_SQL, (airline_id,))
+                results = await cur.fetchall()
+            return [format_regression_review(row) for row in results]
+        except Exception as e:
+            print(f"Error getting reviews for regression: {e}")
+            return []
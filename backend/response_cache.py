@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+import psycopg
+
+from postgres_db import AIRLINE_CHANGED_CHANNEL, AIRLINE_STATS_CHANNEL, airline_ids
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+LISTEN_RETRY_SECONDS = 5
+
+# Scope of entries derived from every airline (rankings, global averages).
+GLOBAL_SCOPE = "*"
+
+ENTITY_TAG_RE = re.compile(r'(?:W/)?("[^"]*")')
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches ``etag``: "*" or any listed tag, compared weakly (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return opaque in ENTITY_TAG_RE.findall(if_none_match)
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "scopes", "expires_at")
+
+    def __init__(self, body, scopes, ttl):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest() + '"'
+        self.scopes = frozenset(scopes)
+        self.expires_at = time.monotonic() + ttl
+
+class ResponseCache:
+    """In-process LRU + TTL cache of endpoint responses, scoped by the airline ids they depend on."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def _get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def _put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_or_compute(self, key, scopes, compute):
+        """Return the CacheEntry for ``key``, running ``compute()`` on a miss; None bodies are not cached."""
+        entry = self._get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        if key in self.inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self.inflight[key][0])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = (future, frozenset(scopes))
+        try:
+            body = await compute()
+            entry = CacheEntry(body, scopes, self.ttl) if body is not None else None
+            # Skip the store if an invalidation removed this key while computing.
+            if entry is not None and self._computing(key, future):
+                self._put(key, entry)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise; mark the exception retrieved for the no-waiter case.
+            future.exception()
+            raise
+        finally:
+            if self._computing(key, future):
+                del self.inflight[key]
+
+    def _computing(self, key, future):
+        inflight = self.inflight.get(key)
+        return inflight is not None and inflight[0] is future
+
+    def invalidate(self, airline_ids, include_global=True):
+        """Drop entries derived from any of ``airline_ids``, and global entries unless ``include_global`` is False."""
+        changed = set(airline_ids) | ({GLOBAL_SCOPE} if include_global else set())
+        stale = [key for key, entry in self.entries.items() if entry.scopes & changed]
+        for key in stale:
+            del self.entries[key]
+        # Computations already running may have read the old data; let them
+        # finish for their waiters but keep their results out of the cache.
+        for key in [key for key, (_, scopes) in self.inflight.items() if scopes & changed]:
+            del self.inflight[key]
+        self.invalidations += 1
+        return len(stale)
+
+    def clear(self):
+        self.entries.clear()
+        self.inflight.clear()
+        self.invalidations += 1
+
+    def metrics(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "inflight": len(self.inflight),
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0,
+        }
+
+class CacheInvalidationListener:
+    """LISTENs for airline stats and airline changes and evicts the affected airlines from a ResponseCache.
+
+    Airline changes also drop the airline from the process's AirlineIdCache,
+    since a rename elsewhere leaves its old name cached here.
+    """
+
+    def __init__(self, dsn, cache, airline_ids=airline_ids):
+        self.dsn = dsn
+        self.cache = cache
+        self.airline_ids = airline_ids
+        self.task = None
+        self.notifications = 0
+
+    async def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def handle(self, channel, payload):
+        self.notifications += 1
+        if channel == AIRLINE_CHANGED_CHANNEL:
+            # Only that airline's own panels show its name and image.
+            self.cache.invalidate([int(payload)], include_global=False)
+            self.airline_ids.discard_id(int(payload))
+        elif payload == GLOBAL_SCOPE:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(int(airline_id) for airline_id in payload.split(",") if airline_id)
+
+    async def _run(self):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {AIRLINE_STATS_CHANNEL};")
+                    await conn.execute(f"LISTEN {AIRLINE_CHANGED_CHANNEL};")
+                    # Notifications sent while disconnected are lost.
+                    self.cache.clear()
+                    self.airline_ids.clear()
+                    async for notify in conn.notifies():
+                        self.handle(notify.channel, notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error listening for cache invalidations: {e}")
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
@@ -1,8 +1,9 @@
 import torch
 import warnings
-warnings.filterwarnings('ignore') 
+warnings.filterwarnings('ignore')
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import re, gc, nltk
+import os, re, time, nltk
+import numpy as np
 from lime.lime_text import LimeTextExplainer
 from nltk.corpus import stopwords
 
@@ -10,64 +11,142 @@ nltk.data.path.append("./nltk_data")
 english_stopwords = set(stopwords.words("english"))
 
 model_name = "cardiffnlp/twitter-roberta-base-sentiment-latest"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=3)
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model.to(device)
+WARMUP_TEXT = "The flight was on time and the cabin crew were friendly."
+MAX_LENGTH = 100
+LIME_NUM_SAMPLES = 100
+BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SORT_BY_LENGTH = os.getenv("SENTIMENT_SORT_BY_LENGTH", "true").lower() in ("1", "true", "yes")
+
+def sentence_cleaner(text):
+    pattern = r'http[s]?://\S+'
+    text = re.sub(pattern, '', text)
+    text = re.sub(r'[\d]+', '', text)
+    text = re.sub(r'\b\w{1,2}\b', '', text)
+    text = re.sub(r'\b(lol|omg|wtf)\b', '', text)
+    text = re.sub(r'\b(Inc|Ltd|Co|Corp|LLC|PLC|AG|GmbH|SA|NV)\b', '', text)
+    text = re.sub(r'[\.\!\?,;:\"\'\-\(\)\[\]\{\}\`\$]', '', text)
+    text = text.lower()
+    text = ' '.join(word for word in text.split() if word not in english_stopwords)
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    return text
 
 class sentModel():
-    def predict_proba(self, text: str):
-        inputs = tokenizer(text, truncation=True, max_length=100, padding='max_length', return_tensors="pt")
-        inputs.to(device)
-        
-        model.eval()
-        with torch.no_grad():
-            outputs = model(**inputs)
-            logits = outputs.logits
-            probabilities = torch.nn.functional.softmax(logits, dim=-1).cpu().numpy()
-
-        del inputs, outputs, logits
-        torch.cuda.empty_cache()
-        gc.collect()
-        
+    """RoBERTa sentiment scorer with LIME explanations; predict_proba runs in length-sorted micro-batches."""
+
+    def __init__(self, name=model_name, batch_size=BATCH_SIZE, sort_by_length=SORT_BY_LENGTH):
+        self.model_name = name
+        self.batch_size = batch_size
+        self.sort_by_length = sort_by_length
+        self.device = device
+        self.tokenizer = None
+        self.model = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.predict_calls = 0
+        self.predict_samples = 0
+
+    def load(self):
+        if self.model is not None:
+            return self
+
+        start = time.perf_counter()
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name, num_labels=3)
+        self.model.to(self.device)
+        self.model.eval()
+        self.load_seconds = time.perf_counter() - start
+
+        return self
+
+    def warm_up(self, text=WARMUP_TEXT):
+        self.load()
+
+        start = time.perf_counter()
+        self.predict_proba(text)
+        self.warmup_seconds = time.perf_counter() - start
+
+        return self
+
+    def metrics(self):
+        return {
+            "model_name": self.model_name,
+            "device": str(self.device),
+            "loaded": self.model is not None,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "predict_calls": self.predict_calls,
+            "predict_samples": self.predict_samples,
+            "batch_size": self.batch_size,
+            "sort_by_length": self.sort_by_length,
+        }
+
+    def predict_proba(self, text):
+        self.load()
+
+        texts = [text] if isinstance(text, str) else list(text)
+        encoded = self.tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+
+        order = list(range(len(texts)))
+        if self.sort_by_length:
+            order.sort(key=lambda i: len(encoded[i]))
+
+        probabilities = np.empty((len(texts), self.model.config.num_labels), dtype=np.float32)
+
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            inputs = self.tokenizer.pad(
+                {"input_ids": [encoded[i] for i in batch]},
+                padding="longest",
+                return_tensors="pt"
+            )
+            inputs.to(self.device)
+
+            with torch.no_grad():
+                logits = self.model(**inputs).logits
+                probabilities[batch] = torch.nn.functional.softmax(logits, dim=-1).cpu().numpy()
+
+        self.predict_calls += 1
+        self.predict_samples += len(texts)
+
         return probabilities
 
     def sentence_cleaner(self, text):
-        pattern = r'http[s]?://\S+'
-        text = re.sub(pattern, '', text)
-        text = re.sub(r'[\d]+', '', text)
-        text = re.sub(r'\b\w{1,2}\b', '', text)
-        text = re.sub(r'\b(lol|omg|wtf)\b', '', text)
-        text = re.sub(r'\b(Inc|Ltd|Co|Corp|LLC|PLC|AG|GmbH|SA|NV)\b', '', text)
-        text = re.sub(r'[\.\!\?,;:\"\'\-\(\)\[\]\{\}\`\$]', '', text)
-        text = text.lower()
-        text = ' '.join(word for word in text.split() if word not in english_stopwords)
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
-
-    def run_score(self, text, num_features=10):
+        return sentence_cleaner(text)
+
+    def run_score(self, text, num_features=10, predict_fn=None):
+        predict_fn = predict_fn or self.predict_proba
         pos_dict = {}
         neg_dict = {}
 
         instance_text = self.sentence_cleaner(text)
-        explainer = LimeTextExplainer(class_names=['Negative', 'Neutral', 'Positive']) 
-        
+        explainer = LimeTextExplainer(class_names=['Negative', 'Neutral', 'Positive'])
+
         exp = explainer.explain_instance(
             text_instance=instance_text,
-            classifier_fn=lambda x: self.predict_proba(x),
-            num_samples=100,
+            classifier_fn=predict_fn,
+            num_samples=LIME_NUM_SAMPLES,
             num_features=num_features
         )
 
-        probabilities = self.predict_proba(instance_text)[0]
+        probabilities = predict_fn([instance_text])[0]
         total_score = probabilities[2] - probabilities[0]
         sent_label = ['Negative', 'Neutral', 'Positive'][probabilities.argmax()]
-    
+
         for word, score in exp.as_list():
             if score > 0:
                 pos_dict[word] = {'score': score}
             elif score < 0:
                 neg_dict[word] = {'score': score}
 
-        return (total_score, sent_label, pos_dict, neg_dict)
\ No newline at end of file
+        return (total_score, sent_label, pos_dict, neg_dict)
+
+_sent_model = None
+
+def get_sent_model():
+    """Return the process-wide sentModel, loading it on first use."""
+    global _sent_model
+    if _sent_model is None:
+        _sent_model = sentModel().load()
+    return _sent_model
@@ -0,0 +1,118 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# "inline" batches concurrent LIME forward passes through InferenceBatcher;
+# "process" trades that for a pool of worker processes with a model each.
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "inline").lower()
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "2"))
+SENTIMENT_TORCH_THREADS = int(os.getenv("SENTIMENT_TORCH_THREADS", "1"))
+
+_worker_model = None
+
+def init_worker(torch_threads):
+    global _worker_model
+    import torch
+    from sentModel import sentModel
+
+    torch.set_num_threads(torch_threads)
+    _worker_model = sentModel().warm_up()
+
+def worker_run_score(text, num_features):
+    score, sent_lab, pos_dict, neg_dict = _worker_model.run_score(text, num_features)
+    return float(score), sent_lab, pos_dict, neg_dict
+
+def _worker_metrics():
+    return os.getpid(), _worker_model.metrics()
+
+class InlineSentimentBackend:
+    """Runs LIME in a thread of the API process, batching forward passes through InferenceBatcher."""
+
+    name = "inline"
+
+    def __init__(self):
+        self.sent_model = None
+        self.batcher = None
+
+    async def start(self):
+        from sentModel import get_sent_model
+        from inference_batcher import InferenceBatcher
+
+        self.sent_model = await asyncio.to_thread(lambda: get_sent_model().warm_up())
+        self.batcher = InferenceBatcher(self.sent_model)
+        await self.batcher.start()
+
+    async def stop(self):
+        if self.batcher:
+            await self.batcher.stop()
+
+    async def run_score(self, text, num_features=10):
+        score, sent_lab, pos_dict, neg_dict = await asyncio.to_thread(
+            self.sent_model.run_score, text, num_features, self.batcher.predict_threadsafe
+        )
+        return float(score), sent_lab, pos_dict, neg_dict
+
+    async def metrics(self):
+        return {
+            "backend": self.name,
+            "model": self.sent_model.metrics(),
+            "batcher": self.batcher.metrics(),
+        }
+
+class ProcessSentimentBackend:
+    """Runs run_score in a pool of worker processes that each load the model once."""
+
+    name = "process"
+
+    def __init__(self, workers=SENTIMENT_WORKERS, torch_threads=SENTIMENT_TORCH_THREADS):
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self.executor = None
+        self.start_seconds = None
+        self.worker_metrics = {}
+
+    async def start(self):
+        start = time.perf_counter()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.torch_threads,),
+        )
+        # Spin every worker up now so model loading happens at startup, not on the first request.
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _worker_metrics)
+            for _ in range(self.workers)
+        ))
+        self.worker_metrics = dict(results)
+        self.start_seconds = time.perf_counter() - start
+
+    async def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def run_score(self, text, num_features=10):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, worker_run_score, text, num_features)
+
+    async def metrics(self):
+        # Workers score one review at a time, so there are no batcher figures here.
+        return {
+            "backend": self.name,
+            "batcher": None,
+            "workers": self.workers,
+            "torch_threads": self.torch_threads,
+            "start_seconds": self.start_seconds,
+            "worker_models": self.worker_metrics,
+        }
+
+def create_sentiment_backend(name=SENTIMENT_BACKEND):
+    if name == "inline":
+        return InlineSentimentBackend()
+    if name == "process":
+        return ProcessSentimentBackend()
+    raise ValueError(f"Unknown sentiment backend: {name}")
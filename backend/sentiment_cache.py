@@ -0,0 +1,90 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+from sentModel import LIME_NUM_SAMPLES, model_name, sentence_cleaner
+
+CACHE_MAX_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "10000"))
+
+def sentiment_cache_key(text, num_features, name=model_name, num_samples=LIME_NUM_SAMPLES):
+    """Content address of a scoring request: cleaned text plus everything that changes the result."""
+    payload = "\x00".join([name, str(num_features), str(num_samples), sentence_cleaner(text)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class SentimentCache:
+    """Two-level cache of run_score results: an in-process LRU in front of the sentiment_cache table."""
+
+    def __init__(self, db, max_entries=CACHE_MAX_ENTRIES):
+        self.db = db
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        row = await self.db.get_cached_sentiment(key)
+        if row:
+            self.db_hits += 1
+            self._remember(key, row)
+            return row
+
+        self.misses += 1
+        return None
+
+    async def put(self, key, result):
+        self._remember(key, result)
+        score, sent_lab, pos_dict, neg_dict = result
+        await self.db.insert_cached_sentiment(key, model_name, score, sent_lab, pos_dict, neg_dict)
+
+    def metrics(self):
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.db_hits) / lookups if lookups else 0,
+        }
+
+class CachedSentimentBackend:
+    """Serves run_score from SentimentCache before falling through to the wrapped backend."""
+
+    def __init__(self, backend, cache):
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name
+
+    async def start(self):
+        await self.backend.start()
+
+    async def stop(self):
+        await self.backend.stop()
+
+    async def run_score(self, text, num_features=10):
+        key = sentiment_cache_key(text, num_features)
+
+        result = await self.cache.get(key)
+        if result is not None:
+            return result
+
+        result = await self.backend.run_score(text, num_features)
+        await self.cache.put(key, result)
+        return result
+
+    async def metrics(self):
+        data = await self.backend.metrics()
+        data["cache"] = self.cache.metrics()
+        return data
@@ -0,0 +1,26 @@
+import asyncio
+
+from airline_stats import AirlineStatsRefresher
+
+class FlakyDB:
+    def __init__(self):
+        self.calls = 0
+
+    async def refresh_airline_stats(self):
+        self.calls += 1
+        if self.calls == 2:
+            raise RuntimeError("connection lost")
+        return [self.calls]
+
+def test_refresh_loop_survives_errors():
+    async def main():
+        db = FlakyDB()
+        refresher = AirlineStatsRefresher(db, interval=0.01)
+        await refresher.start()
+        await asyncio.sleep(0.1)
+        await refresher.stop()
+        return db.calls, refresher.metrics()
+
+    calls, metrics = asyncio.run(main())
+    assert calls > 3
+    assert metrics["refreshes"] == calls - 1
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("lime")
+
+import batch_score
+
+class InlinePool:
+    def map(self, fn, tasks, chunksize=1):
+        return [fn(task) for task in tasks]
+
+def fake_run_score(text, num_features):
+    if not text.strip():
+        raise ValueError("empty text after cleaning")
+    return 0.9, "Positive", {"crew": {"score": 0.3}}, {}
+
+def test_unscorable_review_does_not_sink_its_batch(monkeypatch):
+    monkeypatch.setattr(batch_score, "worker_run_score", fake_run_score)
+    batch = [("1", "Air A", "Friendly crew"), ("2", "Air A", "   "), ("3", "Air B", "On time")]
+
+    rows, failures = batch_score.score_batch(InlinePool(), batch, num_features=10, workers=1)
+
+    assert [row[0] for row in rows] == ["1", "3"]
+    assert rows[0][1:] == ("Air A", batch_score.model_name, "Positive", 0.9, {"crew": {"score": 0.3}}, {})
+    assert failures == [("2", "ValueError: empty text after cleaning")]
@@ -0,0 +1,104 @@
+import asyncio
+import json
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("lime")
+
+import main
+from response_cache import ResponseCache
+
+AIRLINE = "Test Air"
+REVIEWS = [
+    {"score": score, **{name: (score + offset) % 5 + 1 for offset, name in enumerate(main.FEATURE_NAMES)}}
+    for score in range(1, 13)
+]
+
+class FakeDB:
+    def __init__(self):
+        self.calls = Counter()
+
+    async def get_airline_id(self, airline_name):
+        return 7 if airline_name == AIRLINE else None
+
+    async def get_airline_info(self, airline_name):
+        self.calls["info"] += 1
+        return {"name": airline_name, "image": "logo.png"}
+
+    async def get_airline_key_data(self, airline_name):
+        self.calls["key-data"] += 1
+        return {"score": 7.5, "rank": 3}
+
+    async def get_rating_distribution(self, airline_name):
+        self.calls["rating-distribution"] += 1
+        return {"fractions": {"5": 0.5, "1": 0.5}, "counts": {"5": 2, "1": 2}}
+
+    async def get_sub_item_scoring(self, airline_name):
+        self.calls["sub-item-scoring"] += 1
+        return {"seatComfort": {"airline": 3.5, "average": 3.1}}
+
+    async def get_airline_city_distribution(self, airline_name, gazetteer):
+        self.calls["city-distribution"] += 1
+        return [{"city": "London", "count": 4}]
+
+    async def get_reviews_for_regression(self, airline_name):
+        self.calls["feature-importance"] += 1
+        return REVIEWS
+
+def make_request(cache, if_none_match=None):
+    gazetteer = SimpleNamespace(loaded_at=1.0, needs_reload=lambda: False)
+    headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(response_cache=cache, gazetteer=gazetteer)), headers=headers)
+
+def body(response):
+    return json.loads(response.body) if hasattr(response, "body") else json.loads(json.dumps(response))
+
+def test_dashboard_matches_the_panel_endpoints():
+    dashboard = asyncio.run(main.get_airline_dashboard(AIRLINE, make_request(ResponseCache()), None, FakeDB()))
+
+    assert set(dashboard["data"]) == set(main.DASHBOARD_PANELS)
+    for panel, result in dashboard["data"].items():
+        result = dict(result)
+        del result["elapsed_ms"]
+        single = body(asyncio.run(main.panel_response(make_request(ResponseCache()), FakeDB(), panel, AIRLINE)))
+        assert single.pop("status") == "success"
+        assert body(result) == single, panel
+
+def test_dashboard_rejects_unknown_panels_and_airlines():
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.get_airline_dashboard(AIRLINE, make_request(ResponseCache()), "info,bogus", FakeDB()))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.get_airline_dashboard("Nobody Air", make_request(ResponseCache()), None, FakeDB()))
+    assert error.value.status_code == 404
+
+def test_cached_panel_serves_etag_and_304_without_recomputing():
+    cache = ResponseCache()
+    db = FakeDB()
+
+    first = asyncio.run(main.panel_response(make_request(cache), db, "key-data", AIRLINE))
+    etag = first.headers["etag"]
+    again = asyncio.run(main.panel_response(make_request(cache, if_none_match=etag), db, "key-data", AIRLINE))
+    stale = asyncio.run(main.panel_response(make_request(cache, if_none_match='"other"'), db, "key-data", AIRLINE))
+
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert stale.status_code == 200 and body(stale) == body(first)
+    assert db.calls["key-data"] == 1
+
+def test_dashboard_shares_the_panel_cache():
+    cache = ResponseCache()
+    db = FakeDB()
+
+    asyncio.run(main.panel_response(make_request(cache), db, "info", AIRLINE))
+    asyncio.run(main.get_airline_dashboard(AIRLINE, make_request(cache), None, db))
+    asyncio.run(main.get_airline_dashboard(AIRLINE, make_request(cache), None, db))
+
+    # Every cacheable panel is built once; feature importance is never cached.
+    assert db.calls == {panel: 1 for panel in main.DASHBOARD_PANELS} | {"feature-importance": 2}
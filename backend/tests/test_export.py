@@ -0,0 +1,73 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("lime")
+
+import main
+
+ROWS = [
+    {"reviewId": "1", "title": "Great crew", "score": 9},
+    {"reviewId": "2", "title": 'Seats, "cramped"', "score": 3},
+]
+
+class FakeDB:
+    def __init__(self, airline_id=7, error=None):
+        self.airline_id = airline_id
+        self.error = error
+        self.streamed = None
+
+    async def get_airline_id(self, airline_name):
+        if self.error:
+            raise self.error
+        return self.airline_id
+
+    async def stream_reviews(self, fields, airline_id=None, **filters):
+        self.streamed = (fields, airline_id, filters)
+        for row in ROWS:
+            yield {field: row[field] for field in fields}
+
+def export(db, export_format="ndjson", fields="reviewId,title,score"):
+    async def collect():
+        response = await main.export_airline_reviews(
+            "Test Air", format=export_format, fields=fields, filters={"keyword": "crew"}, db=db
+        )
+        body = "".join([chunk async for chunk in response.body_iterator])
+        return response, body
+    return asyncio.run(collect())
+
+def test_ndjson_export_writes_one_review_per_line():
+    db = FakeDB()
+    response, body = export(db)
+
+    assert response.media_type == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="Test_Air_reviews.ndjson"'
+    assert [json.loads(line) for line in body.splitlines()] == ROWS
+    assert db.streamed == (["reviewId", "title", "score"], 7, {"keyword": "crew"})
+
+def test_csv_export_writes_a_header_and_quoted_rows():
+    response, body = export(FakeDB(), "csv")
+
+    assert response.media_type == "text/csv"
+    assert list(csv.DictReader(io.StringIO(body))) == [{k: str(v) for k, v in row.items()} for row in ROWS]
+
+def test_export_rejects_unknown_fields():
+    with pytest.raises(HTTPException) as error:
+        export(FakeDB(), fields="title,password")
+    assert error.value.status_code == 400
+
+def test_export_of_unknown_airline_is_404():
+    with pytest.raises(HTTPException) as error:
+        export(FakeDB(airline_id=None))
+    assert error.value.status_code == 404
+
+def test_export_reports_lookup_errors_as_500():
+    with pytest.raises(HTTPException) as error:
+        export(FakeDB(error=RuntimeError("connection lost")))
+    assert (error.value.status_code, error.value.detail) == (500, "connection lost")
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import gazetteer
+from gazetteer import Gazetteer, get_gazetteer
+
+HEADER = "city,city_ascii,lat,lng,population\n"
+
+def write_cities(path, rows, mtime=None):
+    path.write_text(HEADER + "".join(f"{row}\n" for row in rows), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def cities(tmp_path):
+    path = tmp_path / "worldcities.csv"
+    write_cities(path, [
+        "São Paulo,Sao Paulo,-23.55,-46.63,22046000",
+        "London,London,51.5072,-0.1275,11262000",
+        "London,London,42.9836,-81.2497,422324",
+        "Nowhere,Nowhere,,,",
+    ], mtime=1_000_000)
+    return path
+
+def test_load_indexes_names_case_and_accent_insensitively(cities):
+    gaz = Gazetteer(str(cities)).load()
+
+    assert gaz.get("sao paulo") == {"lng": -46.63, "lat": -23.55}
+    assert gaz.get("SÃO PAULO") == gaz.get("São Paulo")
+    assert gaz.get("Nowhere") is None
+    assert gaz.metrics()["cities"] == 3
+
+def test_ambiguous_names_resolve_to_the_most_populous_city(cities):
+    assert Gazetteer(str(cities)).load().get("London") == {"lng": -0.1275, "lat": 51.5072}
+
+def test_reload_after_the_file_changes(cities):
+    gaz = Gazetteer(str(cities), reload_check_seconds=0).load()
+    assert not gaz.needs_reload()
+
+    write_cities(cities, ["Lisbon,Lisbon,38.7223,-9.1393,2956879"], mtime=2_000_000)
+    assert gaz.needs_reload()
+    gaz.try_load()
+
+    assert gaz.get("Lisbon") == {"lng": -9.1393, "lat": 38.7223}
+    assert gaz.get("London") is None
+    assert gaz.metrics()["reloads"] == 1
+
+def test_missing_file_starts_empty_and_loads_once_it_appears(tmp_path, monkeypatch):
+    path = tmp_path / "worldcities.csv"
+    monkeypatch.setattr(gazetteer, "_gazetteer", None)
+
+    gaz = get_gazetteer(str(path))
+    gaz.reload_check_seconds = 0
+
+    assert gaz.get("London") is None
+    assert gaz.metrics()["cities"] == 0
+    assert not gaz.needs_reload()
+
+    write_cities(path, ["London,London,51.5072,-0.1275,11262000"])
+    assert gaz.needs_reload()
+    gaz.try_load()
+
+    assert gaz.get("London") == {"lng": -0.1275, "lat": 51.5072}
+    assert get_gazetteer() is gaz
+
+def test_failed_reload_keeps_the_current_table(cities):
+    gaz = Gazetteer(str(cities)).load()
+    os.remove(cities)
+
+    gaz.try_load()
+
+    assert gaz.get("London") == {"lng": -0.1275, "lat": 51.5072}
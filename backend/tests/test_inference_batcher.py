@@ -0,0 +1,48 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from inference_batcher import InferenceBatcher
+
+class StubModel:
+    def predict_proba(self, texts):
+        time.sleep(0.01)
+        return [[0.1, 0.2, 0.7] for _ in texts]
+
+    def run_score(self, text, predict_fn):
+        # LIME calls the classifier from its own (default-executor) thread.
+        return predict_fn([text] * 5)
+
+def test_lime_threads_cannot_starve_batches():
+    async def main():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=4))
+        model = StubModel()
+        batcher = InferenceBatcher(model)
+        await batcher.start()
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*(
+                asyncio.to_thread(model.run_score, f"text {i}", batcher.predict_threadsafe)
+                for i in range(10)
+            )), timeout=10)
+        finally:
+            await batcher.stop()
+        return results, batcher.metrics()
+
+    results, metrics = asyncio.run(main())
+    assert [len(result) for result in results] == [5] * 10
+    assert metrics["items"] == 50
+
+def test_stop_fails_queued_requests():
+    async def main():
+        batcher = InferenceBatcher(StubModel())
+        await batcher.start()
+        batcher.task.cancel()
+        pending = asyncio.ensure_future(batcher.predict(["queued"]))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(pending, timeout=1)
+
+    asyncio.run(main())
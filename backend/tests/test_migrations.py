@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+
+import psycopg
+import pytest
+
+from migrations import PLAN_CHECKS, _seq_scanned_tables, check_plans, explain, migrate, plan_indexes
+from postgres_db import INSERT_REVIEW_SQL, PostgresClient, airline_ids, review_params
+
+# Point at a disposable database; the tests migrate it and add rows to it.
+TEST_DSN = os.getenv("TEST_POSTGRES_DSN")
+
+pytestmark = pytest.mark.skipif(not TEST_DSN, reason="TEST_POSTGRES_DSN is not set")
+
+AIRLINES = ["Plan Check Air", "Plan Check Express", "Plan Check Cargo"]
+
+EXPECTED_INDEXES = {
+    "airline id lookup": "airlines_name_lower_idx",
+    "reviews page": "reviews_airline_date_idx",
+    "review search": "reviews_search_idx",
+}
+
+@pytest.fixture(scope="module")
+def db():
+    migrate(TEST_DSN)
+    client = PostgresClient(TEST_DSN)
+
+    for number, name in enumerate(AIRLINES):
+        client.insert_airline({"name": name, "image": "", "reviewCount": 10})
+        for review in range(10):
+            client.insert_review({
+                "reviewId": f"99{number}{review:03d}",
+                "airlineName": name,
+                "title": "Delayed flight" if review % 2 else "Great crew",
+                "content": "The flight was delayed by two hours but the crew were friendly.",
+                "score": review,
+                "dateReview": f"2024-01-{review + 1:02d}",
+                "route": "London to Paris",
+            })
+
+    yield client
+
+    client.cur.execute("DELETE FROM reviews WHERE airlineName = ANY(%s);", (AIRLINES,))
+    client.cur.execute("DELETE FROM airlines WHERE name = ANY(%s);", (AIRLINES,))
+    client.conn.commit()
+    client.close()
+
+def test_hot_queries_use_their_indexes(db):
+    airline_id = db.get_airline_id(AIRLINES[0])
+
+    with psycopg.connect(TEST_DSN) as conn:
+        conn.execute("SET enable_seqscan = off;")
+        for label, build in PLAN_CHECKS:
+            plan = explain(conn, *build(airline_id, AIRLINES[0]))
+            assert not [t for t in _seq_scanned_tables(plan) if t in ("airlines", "reviews")], label
+            if label in EXPECTED_INDEXES:
+                assert EXPECTED_INDEXES[label] in plan_indexes(plan), label
+
+def test_check_plans_passes(db):
+    assert check_plans(TEST_DSN) == []
+
+def test_insert_airline_matches_names_case_insensitively(db):
+    airline_id = db.get_airline_id(AIRLINES[0])
+
+    db.insert_airline({"name": AIRLINES[0].upper(), "image": "logo.png", "reviewCount": 11})
+
+    db.cur.execute("SELECT name, image FROM airlines WHERE LOWER(name) = LOWER(%s);", (AIRLINES[0],))
+    assert db.cur.fetchall() == [(AIRLINES[0], "logo.png")]
+    assert airline_ids.get(AIRLINES[0]) is None
+    assert db.get_airline_id(AIRLINES[0].upper()) == airline_id
+
+def test_refresh_keeps_marks_made_while_it_runs(db):
+    airline_id = db.get_airline_id(AIRLINES[1])
+    db.refresh_airline_stats()
+    db.mark_all_airline_stats_dirty()
+
+    # The writer re-marks the airline and holds its dirty row until it commits,
+    # after the refresh has already read the old mark.
+    writer = psycopg.connect(TEST_DSN)
+    writer.execute(INSERT_REVIEW_SQL, review_params({
+        "reviewId": "991999",
+        "airlineName": AIRLINES[1],
+        "title": "Late review",
+        "content": "Landed while the stats were being refreshed.",
+        "score": 5,
+        "dateReview": "2024-02-01",
+    }))
+
+    refresher = PostgresClient(TEST_DSN)
+    thread = threading.Thread(target=refresher.refresh_airline_stats)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        db.cur.execute("SELECT EXISTS (SELECT 1 FROM pg_locks WHERE NOT granted);")
+        waiting = db.cur.fetchone()[0]
+        db.conn.commit()
+        if waiting:
+            break
+        time.sleep(0.05)
+    writer.commit()
+    writer.close()
+    thread.join()
+    refresher.close()
+
+    db.cur.execute("SELECT calculatedReviewCount FROM airlines WHERE airline_id = %s;", (airline_id,))
+    assert db.cur.fetchone()[0] == 10
+    db.cur.execute("SELECT airline_id FROM airline_stats_dirty;")
+    assert db.cur.fetchall() == [(airline_id,)]
+    db.conn.commit()
+
+    assert db.refresh_airline_stats() == [airline_id]
+    db.cur.execute("SELECT calculatedReviewCount FROM airlines WHERE airline_id = %s;", (airline_id,))
+    assert db.cur.fetchone()[0] == 11
+    db.conn.commit()
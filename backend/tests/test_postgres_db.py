@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from postgres_db import (
+    DEFAULT_REVIEW_FIELDS, RATING_VALUES, SUB_SCORE_COLUMNS, decode_review_cursor, decode_search_cursor,
+    build_review_search_query, encode_review_cursor, encode_search_cursor, format_rating_distributions,
+    format_reviews_page, parse_review_fields,
+)
+
+@pytest.mark.parametrize("date_review, review_id", [
+    (date(2024, 3, 9), "812345"),
+    (None, "17"),
+])
+def test_review_cursor_round_trip(date_review, review_id):
+    assert decode_review_cursor(encode_review_cursor(date_review, review_id)) == (date_review, review_id)
+
+def test_search_cursor_round_trip():
+    assert decode_search_cursor(encode_search_cursor(0.0607927, 99)) == (0.0607927, "99")
+
+@pytest.mark.parametrize("decode, cursor", [
+    (decode_review_cursor, ""),
+    (decode_review_cursor, "not base64!"),
+    (decode_review_cursor, encode_search_cursor(0.5, 1)),
+    (decode_search_cursor, encode_search_cursor("high", 1)),
+    (decode_search_cursor, "WzFd"),
+])
+def test_bad_cursors_raise_value_error(decode, cursor):
+    with pytest.raises(ValueError):
+        decode(cursor)
+
+def test_reviews_page_cursor_points_at_last_returned_row():
+    rows = [(date(2024, 1, 3), "3", "c"), (date(2024, 1, 2), "2", "b"), (None, "1", "a")]
+
+    reviews, next_cursor = format_reviews_page(rows, ["title"], 2)
+
+    assert reviews == [{"title": "c"}, {"title": "b"}]
+    assert decode_review_cursor(next_cursor) == (date(2024, 1, 2), "2")
+    assert format_reviews_page(rows, ["title"], 3)[1] is None
+
+def test_rating_distributions_fill_missing_airlines_and_ratings():
+    rows = [
+        (1, "seatComfort", 5, 3),
+        (1, "seatComfort", 1, 1),
+        (1, "valueForMoney", 0, 2),
+    ]
+
+    distributions = format_rating_distributions(rows, [1, 2])
+
+    assert set(distributions) == {1, 2}
+    airline = distributions[1]
+    assert set(airline["counts"]) == {label for _, label in SUB_SCORE_COLUMNS}
+    assert airline["counts"]["Seat Comfort"] == [0, 1, 0, 0, 0, 3]
+    assert airline["fractions"]["Seat Comfort"] == [0, 0.25, 0, 0, 0, 0.75]
+    assert airline["fractions"]["Value For Money"] == [1, 0, 0, 0, 0, 0]
+    assert airline["fractions"]["Wifi Connectivity"] == [0] * len(RATING_VALUES)
+    assert distributions[2]["counts"]["Seat Comfort"] == [0] * len(RATING_VALUES)
+
+@pytest.mark.parametrize("fields, expected", [
+    (None, DEFAULT_REVIEW_FIELDS),
+    ("", DEFAULT_REVIEW_FIELDS),
+    ("title, score,,", ["title", "score"]),
+    ("airlineName,reviewId", ["airlineName", "reviewId"]),
+])
+def test_parse_review_fields(fields, expected):
+    assert parse_review_fields(fields) == expected
+
+def test_parse_review_fields_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="password, secret"):
+        parse_review_fields("title,password,secret")
+
+def where_clause(query):
+    return " ".join(query.split("WHERE", 1)[1].split("ORDER BY", 1)[0].split())
+
+@pytest.mark.parametrize("text", ['"lost luggage" -refund', "delayed OR cancelled", "crew"])
+def test_search_query_hands_phrases_and_negation_to_websearch_to_tsquery(text):
+    query, params = build_review_search_query(text, 20)
+
+    assert "websearch_to_tsquery('english', %s) AS q(query)" in query
+    assert where_clause(query) == "search_vector @@ q.query"
+    assert params == [text, 21]
+    assert query.count("%s") == len(params)
+
+def test_search_query_filters_by_airline_and_pages_by_rank():
+    query, params = build_review_search_query(
+        '"seat comfort" -wifi', 10, cursor=encode_search_cursor(0.25, "812345"), airline_id=7, min_score=3,
+    )
+
+    assert where_clause(query) == (
+        "search_vector @@ q.query AND airline_id = %s AND score >= %s"
+        " AND (ts_rank(search_vector, q.query)::float8, reviewId) < (%s, %s)"
+    )
+    assert params == ['"seat comfort" -wifi', 7, 3, 0.25, "812345", 11]
+    assert query.count("%s") == len(params)
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from postgres_db import AIRLINE_CHANGED_CHANNEL, AIRLINE_STATS_CHANNEL, AirlineIdCache
+from response_cache import GLOBAL_SCOPE, CacheInvalidationListener, ResponseCache, etag_matches
+
+ETAG = '"abc123"'
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"other", W/"abc123"', True),
+    ('"other",W/"nope"', False),
+    ("*", True),
+    (' * ', True),
+    ('"abc"', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+def fill(cache):
+    async def main():
+        for key, scopes in [(("info", 1), {1}), (("info", 2), {2}), (("key-data", 1), {1, GLOBAL_SCOPE})]:
+            await cache.get_or_compute(key, scopes, lambda: asyncio.sleep(0, result={"data": key}))
+    asyncio.run(main())
+
+def test_airline_change_drops_only_that_airline():
+    cache = ResponseCache()
+    fill(cache)
+
+    CacheInvalidationListener("", cache).handle(AIRLINE_CHANGED_CHANNEL, "2")
+
+    assert set(cache.entries) == {("info", 1), ("key-data", 1)}
+
+def test_airline_change_forgets_its_cached_id():
+    ids = AirlineIdCache()
+    ids.put("Old Name Air", 2)
+    ids.put("Other Air", 3)
+
+    CacheInvalidationListener("", ResponseCache(), ids).handle(AIRLINE_CHANGED_CHANNEL, "2")
+
+    assert ids.get("Old Name Air") is None
+    assert ids.get("Other Air") == 3
+
+def test_stats_refresh_drops_airline_and_global_entries():
+    cache = ResponseCache()
+    fill(cache)
+
+    CacheInvalidationListener("", cache).handle(AIRLINE_STATS_CHANNEL, "2")
+
+    assert set(cache.entries) == {("info", 1)}
@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("lime")
+
+from sentModel import sentModel
+
+class Inputs(dict):
+    def to(self, device):
+        return self
+
+class StubTokenizer:
+    """Encodes text number i (its first word) as i repeated once per word."""
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        return {"input_ids": [[int(text.split()[0])] * len(text.split()) for text in texts]}
+
+    def pad(self, encoded, padding="longest", return_tensors="pt"):
+        width = max(len(ids) for ids in encoded["input_ids"])
+        return Inputs(input_ids=torch.tensor([ids + [0] * (width - len(ids)) for ids in encoded["input_ids"]]))
+
+class StubModel:
+    class config:
+        num_labels = 3
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, input_ids):
+        self.batches.append(input_ids[:, 0].tolist())
+        first = input_ids[:, :1].float()
+        return type("Output", (), {"logits": torch.cat([first, torch.zeros_like(first), -first], dim=1)})
+
+def stub_model(batch_size, sort_by_length):
+    model = sentModel(batch_size=batch_size, sort_by_length=sort_by_length)
+    model.tokenizer = StubTokenizer()
+    model.model = StubModel()
+    return model
+
+def expected(numbers):
+    logits = torch.tensor([[n, 0.0, -n] for n in numbers])
+    return torch.nn.functional.softmax(logits, dim=-1).numpy()
+
+TEXTS = [
+    "0 a b c d e f",
+    "1 a",
+    "2 a b c d",
+    "3",
+    "4 a b c d e f g",
+    "5 a b",
+]
+
+def test_batches_group_texts_by_length():
+    model = stub_model(batch_size=2, sort_by_length=True)
+
+    model.predict_proba(TEXTS)
+
+    assert model.model.batches == [[3, 1], [5, 2], [0, 4]]
+
+def test_probabilities_come_back_in_input_order():
+    model = stub_model(batch_size=4, sort_by_length=True)
+
+    probabilities = model.predict_proba(TEXTS)
+
+    assert probabilities.shape == (6, 3)
+    np.testing.assert_allclose(probabilities, expected(range(6)), rtol=1e-6)
+    assert (model.predict_calls, model.predict_samples) == (1, 6)
+
+def test_unsorted_batches_keep_input_order():
+    model = stub_model(batch_size=4, sort_by_length=False)
+
+    probabilities = model.predict_proba(TEXTS)
+
+    assert model.model.batches == [[0, 1, 2, 3], [4, 5]]
+    np.testing.assert_allclose(probabilities, expected(range(6)), rtol=1e-6)
+
+def test_single_string_is_one_sample():
+    model = stub_model(batch_size=4, sort_by_length=True)
+
+    assert model.predict_proba("7 a b").shape == (1, 3)
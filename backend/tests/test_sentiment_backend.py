@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("lime")
+
+import sentModel
+import sentiment_backend
+from sentiment_backend import InlineSentimentBackend, create_sentiment_backend
+
+class StubModel:
+    def warm_up(self):
+        return self
+
+    def predict_proba(self, texts):
+        return [[0.1, 0.2, 0.7] for _ in texts]
+
+    def run_score(self, text, num_features, predict_fn):
+        predict_fn([text] * 4)
+        return 0.7, "Positive", {}, {}
+
+    def metrics(self):
+        return {}
+
+def test_default_backend_reports_batcher_metrics(monkeypatch):
+    monkeypatch.setattr(sentModel, "get_sent_model", StubModel)
+
+    async def main():
+        backend = create_sentiment_backend()
+        await backend.start()
+        try:
+            await asyncio.gather(*(backend.run_score(f"review {i}") for i in range(3)))
+            return backend, await backend.metrics()
+        finally:
+            await backend.stop()
+
+    backend, metrics = asyncio.run(main())
+    assert sentiment_backend.SENTIMENT_BACKEND == "inline"
+    assert isinstance(backend, InlineSentimentBackend)
+    assert metrics["batcher"]["items"] == 12
+    assert metrics["batcher"]["batches"] >= 1
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("lime")
+
+from sentiment_cache import CachedSentimentBackend, SentimentCache, sentiment_cache_key
+
+RESULT = (0.9, "Positive", {"crew": {"score": 0.4}}, {})
+
+class FakeClient:
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.reads = 0
+
+    async def get_cached_sentiment(self, cache_key):
+        self.reads += 1
+        return self.rows.get(cache_key)
+
+    async def insert_cached_sentiment(self, cache_key, model_name, score, sent_lab, pos_dict, neg_dict):
+        self.rows[cache_key] = (score, sent_lab, pos_dict, neg_dict)
+
+class CountingBackend:
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run_score(self, text, num_features=10):
+        self.calls += 1
+        return RESULT
+
+    async def metrics(self):
+        return {"backend": self.name}
+
+def test_key_ignores_what_the_cleaner_drops():
+    key = sentiment_cache_key("The crew were friendly!", 10)
+
+    assert sentiment_cache_key("the CREW were friendly, https://example.com 2024", 10) == key
+    assert len(key) == 64
+
+@pytest.mark.parametrize("text, num_features, name", [
+    ("The crew were rude!", 10, "model"),
+    ("The crew were friendly!", 50, "model"),
+    ("The crew were friendly!", 10, "other-model"),
+])
+def test_key_changes_with_text_features_and_model(text, num_features, name):
+    assert sentiment_cache_key(text, num_features, name) != sentiment_cache_key("The crew were friendly!", 10, "model")
+
+def test_lru_evicts_the_least_recently_used_entry():
+    async def main():
+        cache = SentimentCache(FakeClient(), max_entries=2)
+        await cache.put("a", RESULT)
+        await cache.put("b", RESULT)
+        await cache.get("a")
+        await cache.put("c", RESULT)
+        return cache
+
+    cache = asyncio.run(main())
+    assert list(cache.entries) == ["a", "c"]
+
+def test_reads_fall_through_to_the_table_and_are_kept_in_memory():
+    db = FakeClient({"stored": RESULT})
+
+    async def main():
+        cache = SentimentCache(db)
+        return cache, [await cache.get("stored"), await cache.get("stored"), await cache.get("missing")]
+
+    cache, results = asyncio.run(main())
+    assert results == [RESULT, RESULT, None]
+    assert db.reads == 2
+    metrics = cache.metrics()
+    assert (metrics["entries"], metrics["hits"], metrics["db_hits"], metrics["misses"]) == (1, 1, 1, 1)
+
+def test_backend_scores_once_and_writes_through():
+    db = FakeClient()
+    backend = CountingBackend()
+    cached = CachedSentimentBackend(backend, SentimentCache(db))
+
+    async def main():
+        return [await cached.run_score("The crew were friendly!") for _ in range(3)]
+
+    assert asyncio.run(main()) == [RESULT] * 3
+    assert backend.calls == 1
+    assert db.rows == {sentiment_cache_key("The crew were friendly!", 10): RESULT}
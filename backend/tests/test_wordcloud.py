@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("lime")
+
+import main
+
+SCORES = {
+    "Friendly crew": (0.9, "Positive", {"crew": {"score": 0.5}, "friendly": {"score": 0.25}}, {}),
+    "Crew but late": (0.4, "Neutral", {"crew": {"score": 0.25}}, {"late": {"score": -0.5}}),
+    "Late again": (0.1, "Negative", {}, {"late": {"score": -0.25}, "again": {"score": -0.125}}),
+}
+
+class FakeDB:
+    def __init__(self, reviews=(), aggregate=None):
+        self.reviews = [{"content": text} for text in reviews]
+        self.aggregate = aggregate
+
+    async def get_random_reviews(self, airline_name, limit=10):
+        return self.reviews[:limit]
+
+    async def get_wordcloud_aggregate(self, airline_name, limit=50):
+        return self.aggregate
+
+class FakeSentiment:
+    async def run_score(self, text, num_features=10):
+        return SCORES[text]
+
+def wordcloud(db, sample=False):
+    return asyncio.run(main.get_airline_wordcloud_data("Test Air", sample=sample, limit=50, db=db, sentiment=FakeSentiment()))
+
+def test_sample_merges_attributions_across_reviews():
+    pos_dict, neg_dict, count = asyncio.run(main.sample_wordcloud(FakeDB(SCORES), FakeSentiment(), "Test Air"))
+
+    assert pos_dict == {"crew": {"score": 0.75}, "friendly": {"score": 0.25}}
+    assert neg_dict == {"late": {"score": -0.75}, "again": {"score": -0.125}}
+    assert count == 3
+
+def test_sample_without_reviews_is_404():
+    with pytest.raises(HTTPException) as error:
+        wordcloud(FakeDB(), sample=True)
+    assert error.value.status_code == 404
+
+def test_sampled_cloud_totals():
+    data = wordcloud(FakeDB(SCORES), sample=True)["data"]
+
+    assert (data["pos_score"], data["neg_score"], data["overall_score"]) == (1.0, -0.875, 0.125)
+    assert (data["pos_count"], data["neg_count"], data["overall_count"], data["review_count"]) == (2, 2, 4, 3)
+
+def test_airline_without_aggregate_gets_an_empty_cloud():
+    data = wordcloud(FakeDB(aggregate=None))["data"]
+
+    assert data == {
+        "pos_dict": {}, "neg_dict": {}, "pos_score": 0.0, "neg_score": 0.0, "overall_score": 0.0,
+        "pos_count": 0, "neg_count": 0, "overall_count": 0, "review_count": 0,
+    }